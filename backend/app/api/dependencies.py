@@ -5,14 +5,25 @@ from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import bindparam, func, or_, select
 
-from app.core.security import decode_token
+from app.core.security import decode_token, hash_api_key
 from app.db.session import get_db
-from app.models.user import User, UserRole
+from app.models.user import User, UserRole, APIKey
 
 security = HTTPBearer()
 
+# Per-request lookups, built once; their compiled form stays in the engine cache
+_USER_BY_USERNAME = select(User).where(User.username == bindparam("username"))
+# Only usable keys match, and only the owner id is fetched; the index on
+# active keys keeps revoked ones out of the lookup entirely
+_API_KEY_OWNER = (
+    select(APIKey.user_id)
+    .where(APIKey.key_hash == bindparam("key_hash"))
+    .where(APIKey.is_active == True)
+    .where(or_(APIKey.expires_at.is_(None), APIKey.expires_at > func.now()))
+)
+
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
@@ -26,18 +37,23 @@ async def get_current_user(
     )
 
     token = credentials.credentials
-    payload = decode_token(token)
 
-    if payload is None:
-        raise credentials_exception
+    # JWTs have three dot-separated parts; anything else is tried as an API key
+    if token.count(".") != 2:
+        user = await _get_api_key_user(token, db)
+    else:
+        payload = decode_token(token)
 
-    username: str = payload.get("sub")
-    if username is None:
-        raise credentials_exception
+        if payload is None:
+            raise credentials_exception
+
+        username: str = payload.get("sub")
+        if username is None:
+            raise credentials_exception
 
-    # Get user from database
-    result = await db.execute(select(User).where(User.username == username))
-    user = result.scalar_one_or_none()
+        # Get user from database
+        result = await db.execute(_USER_BY_USERNAME, {"username": username})
+        user = result.scalar_one_or_none()
 
     if user is None:
         raise credentials_exception
@@ -51,6 +67,17 @@ async def get_current_user(
     return user
 
 
+async def _get_api_key_user(token: str, db: AsyncSession) -> Optional[User]:
+    """Resolve the owner of an active, unexpired API key"""
+    result = await db.execute(_API_KEY_OWNER, {"key_hash": hash_api_key(token)})
+    user_id = result.scalar_one_or_none()
+
+    if user_id is None:
+        return None
+
+    return await db.get(User, user_id)
+
+
 async def require_admin(
     current_user: User = Depends(get_current_user),
 ) -> User:
@@ -2,27 +2,47 @@
 Authentication endpoints
 """
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import bindparam, select
 
 from app.core.security import verify_password, get_password_hash, create_access_token, create_refresh_token
 from app.db.session import get_db
+from app.models.audit import AuditAction, ResourceType
 from app.models.user import User
 from app.schemas.auth import UserLogin, Token, UserCreate, UserResponse
 from app.api.dependencies import get_current_user
+from app.services.audit import audit_service
 
 router = APIRouter()
 
+# Login lookup, built once; its compiled form stays in the engine cache
+_USER_BY_USERNAME = select(User).where(User.username == bindparam("username"))
+
+
+def _user_response(user: User, status_code: int = status.HTTP_200_OK) -> Response:
+    """
+    Serialize a user in one pydantic-core pass. Returning a Response skips
+    FastAPI's dump/re-validate/encode of the response_model, which stays
+    declared on the route for the OpenAPI schema.
+    """
+    return Response(
+        UserResponse.model_validate(user).model_dump_json(),
+        status_code=status_code,
+        media_type="application/json"
+    )
+
 
 @router.post("/login", response_model=Token)
 async def login(
     credentials: UserLogin,
+    request: Request,
     db: AsyncSession = Depends(get_db)
 ):
     """Login endpoint"""
     # Get user
-    result = await db.execute(select(User).where(User.username == credentials.username))
+    result = await db.execute(_USER_BY_USERNAME, {"username": credentials.username})
     user = result.scalar_one_or_none()
 
     if not user or not verify_password(credentials.password, user.password_hash):
@@ -42,14 +62,26 @@ async def login(
     user.last_login = datetime.utcnow()
     await db.commit()
 
+    # Buffered for the background writer, off the response path
+    await audit_service.log(
+        action=AuditAction.USER_LOGIN,
+        resource_type=ResourceType.USER,
+        resource_id=user.id,
+        user_id=user.id,
+        username=user.username,
+        ip_address=request.client.host if request.client else None,
+        user_agent=request.headers.get("user-agent", "")[:255] or None,
+    )
+
     # Create tokens
     access_token = create_access_token(data={"sub": user.username})
     refresh_token = create_refresh_token(data={"sub": user.username})
 
-    return Token(
-        access_token=access_token,
-        refresh_token=refresh_token
-    )
+    return ORJSONResponse({
+        "access_token": access_token,
+        "refresh_token": refresh_token,
+        "token_type": "bearer"
+    })
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
@@ -87,7 +119,7 @@ async def register(
     await db.commit()
     await db.refresh(user)
 
-    return user
+    return _user_response(user, status.HTTP_201_CREATED)
 
 
 @router.get("/me", response_model=UserResponse)
@@ -95,4 +127,4 @@ async def get_current_user_info(
     current_user: User = Depends(get_current_user)
 ):
     """Get current user information"""
-    return current_user
+    return _user_response(current_user)
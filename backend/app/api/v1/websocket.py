@@ -2,10 +2,11 @@
 WebSocket endpoints
 """
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
-from app.services.websocket import manager
+from app.services.websocket import manager, send_json
 from app.api.dependencies import get_current_user
 from app.models.user import User
 import logging
+import orjson
 
 logger = logging.getLogger(__name__)
 
@@ -28,32 +29,35 @@ async def websocket_endpoint(websocket: WebSocket):
     try:
         while True:
             # Keep connection alive and handle incoming messages
-            data = await websocket.receive_text()
+            try:
+                message = orjson.loads(await websocket.receive_text())
+            except orjson.JSONDecodeError:
+                continue
+
+            if not isinstance(message, dict):
+                continue
 
             # Handle channel subscription changes
-            import json
-            try:
-                message = json.loads(data)
-                if message.get("action") == "subscribe":
-                    channel = message.get("channel", "all")
-                    await manager.connect(websocket, channel=channel)
-                    await websocket.send_json({
-                        "type": "subscribed",
-                        "channel": channel
-                    })
-                elif message.get("action") == "unsubscribe":
-                    channel = message.get("channel", "all")
-                    manager.disconnect(websocket, channel=channel)
-                    await websocket.send_json({
-                        "type": "unsubscribed",
-                        "channel": channel
-                    })
-            except json.JSONDecodeError:
-                pass
+            action = message.get("action")
+            if action == "subscribe":
+                channel = message.get("channel", "all")
+                manager.subscribe(websocket, channel)
+                await send_json(websocket, {
+                    "type": "subscribed",
+                    "channel": channel
+                })
+            elif action == "unsubscribe":
+                channel = message.get("channel", "all")
+                manager.disconnect(websocket, channel=channel)
+                await send_json(websocket, {
+                    "type": "unsubscribed",
+                    "channel": channel
+                })
 
     except WebSocketDisconnect:
-        manager.disconnect(websocket, channel="all")
         logger.info("WebSocket client disconnected")
+    finally:
+        manager.remove(websocket)
 
 
 @router.websocket("/ws/backups/{backup_id}")
@@ -62,7 +66,7 @@ async def backup_websocket(websocket: WebSocket, backup_id: int):
     await websocket.accept()
 
     # Send initial connection confirmation
-    await websocket.send_json({
+    await send_json(websocket, {
         "type": "connected",
         "backup_id": backup_id
     })
@@ -84,8 +88,9 @@ async def logs_websocket(websocket: WebSocket):
         while True:
             await websocket.receive_text()
     except WebSocketDisconnect:
-        manager.disconnect(websocket, channel="logs")
         logger.info("Logs WebSocket disconnected")
+    finally:
+        manager.remove(websocket)
 
 
 @router.websocket("/ws/servers")
@@ -97,5 +102,6 @@ async def servers_websocket(websocket: WebSocket):
         while True:
             await websocket.receive_text()
     except WebSocketDisconnect:
-        manager.disconnect(websocket, channel="servers")
         logger.info("Servers WebSocket disconnected")
+    finally:
+        manager.remove(websocket)
@@ -1,8 +1,25 @@
 """
 Celery application configuration
 """
+import asyncio
+
+import orjson
 from celery import Celery
+from celery.signals import beat_init
+from kombu.serialization import register
 from app.core.config import settings
+from app.db.session import engine
+from app.services.notification import NotificationService
+from app.services.storage import get_storage
+
+# orjson-backed message serializer (plain json is still accepted)
+register(
+    "orjson",
+    lambda obj: orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS),
+    orjson.loads,
+    content_type="application/x-orjson",
+    content_encoding="binary",
+)
 
 celery_app = Celery(
     "dbbackup",
@@ -20,11 +37,19 @@ celery_app.conf.update(
     task_track_started=settings.CELERY_TASK_TRACK_STARTED,
     task_time_limit=settings.CELERY_TASK_TIME_LIMIT,
     result_expires=3600,
-    task_serializer="json",
-    accept_content=["json"],
-    result_serializer="json",
+    task_serializer="orjson",
+    accept_content=["orjson", "json"],
+    result_serializer="orjson",
+    result_accept_content=["orjson", "json"],
     timezone="UTC",
     enable_utc=True,
+    # Backups run for minutes to hours - don't let a busy worker hoard
+    # short tasks behind them, and re-deliver if a worker dies mid-task
+    worker_prefetch_multiplier=settings.CELERY_WORKER_PREFETCH_MULTIPLIER,
+    task_acks_late=True,
+    worker_max_tasks_per_child=settings.CELERY_WORKER_MAX_TASKS_PER_CHILD,
+    # Per-worker queues, so backup steps can follow their local artifacts
+    worker_direct=True,
 )
 
 # Celery beat schedule (for periodic tasks)
@@ -41,4 +66,34 @@ celery_app.conf.beat_schedule = {
         "task": "app.celery.tasks.schedule_tasks.check_server_health",
         "schedule": 60.0,  # Every minute
     },
+    "maintain-log-partitions": {
+        "task": "app.celery.tasks.schedule_tasks.maintain_log_partitions",
+        "schedule": 86400.0,  # Every day
+    },
+    "dispatch-notifications": {
+        "task": "app.celery.tasks.notification_tasks.dispatch_notifications",
+        "schedule": settings.SLACK_BATCH_INTERVAL,
+    },
 }
+
+
+@beat_init.connect
+def _maintain_log_partitions_on_start(sender=None, **kwargs):
+    """The daily partition job also runs as soon as beat starts, not a day later"""
+    celery_app.send_task("app.celery.tasks.schedule_tasks.maintain_log_partitions")
+
+
+def run_async(coro):
+    """Run a coroutine to completion from a synchronous Celery task"""
+    async def _runner():
+        try:
+            return await coro
+        finally:
+            # Pooled asyncpg connections (and the notification and S3 clients)
+            # are bound to the loop that opened them, and every task
+            # invocation gets a fresh loop
+            await engine.dispose()
+            await NotificationService.close_connections()
+            await get_storage().close()
+
+    return asyncio.run(_runner())
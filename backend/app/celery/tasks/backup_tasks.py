@@ -4,22 +4,30 @@ Celery tasks for backup operations
 import logging
 import os
 import tempfile
-from datetime import datetime
+import time
+from datetime import datetime, timezone
 from pathlib import Path
 
-from celery import Task
+from celery import Task, chain
+from celery.signals import worker_process_shutdown
+from celery.utils import worker_direct
 from sqlalchemy import select
+from sqlalchemy.orm import undefer
 
-from app.celery.celery_app import celery_app
+from app.celery.celery_app import celery_app, run_async
+from app.core.config import settings
+from app.core.security import decrypt_credentials
 from app.db.session import AsyncSessionLocal
-from app.models.backup import Backup, BackupStatus, BackupType, CompressionType
+from app.models.backup import Backup, BackupStatus, BackupType, CompressionType, DatabaseType
 from app.models.server import Server
 from app.services.executor import ExecutorFactory
 from app.services.backup_engines import BackupEngineFactory
-from app.services.encryption import EncryptionService, CompressionService, ChecksumService
+from app.services.encryption import EncryptionService, CompressionService, ChecksumService, BackupPipeline
 from app.services.storage import get_storage
 from app.services.notification import NotificationService
-from app.models.audit import AuditLog, AuditAction, ResourceType
+from app.services.websocket import WebSocketService
+from app.models.audit import AuditAction, ResourceType
+from app.services.audit import AuditService, audit_entry
 
 logger = logging.getLogger(__name__)
 
@@ -32,8 +40,50 @@ class BackupTask(Task):
         logger.error(f"Task {task_id} failed: {exc}")
 
 
+class BackupStepTask(BackupTask):
+    """
+    Base for the steps chained after the dump.
+    Each step receives the backup state from the previous one; once a step
+    has exhausted its retries the backup is marked failed.
+    """
+
+    def on_failure(self, exc, task_id, args, kwargs, einfo):
+        """Mark the backup failed and drop its local artifact"""
+        super().on_failure(exc, task_id, args, kwargs, einfo)
+
+        state = args[0] if args else kwargs.get("state")
+        if not state:
+            return
+
+        if os.path.exists(state["path"]):
+            os.remove(state["path"])
+
+        run_async(_fail_backup(
+            state["backup_id"], state["database_name"], exc, state.get("started_mono")
+        ))
+
+
+def _temp_file_path() -> str:
+    """
+    Reserve a scratch file for a dump or download under BACKUP_TEMP_DIR.
+    Point BACKUP_TEMP_DIR at a tmpfs mount (e.g. /dev/shm/backups) to keep
+    intermediate artifacts off disk.
+    """
+    os.makedirs(settings.BACKUP_TEMP_DIR, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        dir=settings.BACKUP_TEMP_DIR, delete=False, suffix='.backup'
+    ) as tmp_file:
+        return tmp_file.name
+
+
+@worker_process_shutdown.connect
+def close_executors(**kwargs):
+    """Close pooled server connections when a worker process exits"""
+    ExecutorFactory.close_all()
+
+
 @celery_app.task(base=BackupTask, bind=True)
-async def create_backup_task(
+def create_backup_task(
     self,
     backup_id: int,
     server_id: int,
@@ -41,13 +91,18 @@ async def create_backup_task(
     db_type: str,
     backup_type: str,
     compress: bool = True,
-    compression_type: str = "gzip",
+    compression_type: str = "zstd",
     encrypt: bool = True,
     user_id: int = None
 ):
     """
     Create backup task
 
+    Dumps the database, then chains the processing and upload steps. The
+    follow-up steps are routed to this worker's direct queue because they
+    work on the dump's local file, and each can be retried on its own
+    without redoing the dump.
+
     Args:
         backup_id: Backup record ID
         server_id: Server ID
@@ -59,18 +114,70 @@ async def create_backup_task(
         encrypt: Whether to encrypt
         user_id: User who initiated the backup
     """
+    state = run_async(_dump_backup_async(
+        backup_id,
+        server_id,
+        database_name,
+        db_type,
+        backup_type,
+        user_id,
+        compress,
+        compression_type,
+        encrypt
+    ))
+    state.update(
+        compress=compress,
+        compression_type=compression_type,
+        encrypt=encrypt
+    )
+    if state["pre_compressed"]:
+        # The engine already gzipped the dump; record that instead
+        state.update(compress=True, compression_type=CompressionType.GZIP.value)
+
+    queue = worker_direct(self.request.hostname)
+    chain(
+        process_backup_task.s(state).set(queue=queue),
+        upload_backup_task.s().set(queue=queue)
+    ).apply_async()
+
+    return state
+
+
+async def _dump_backup_async(
+    backup_id: int,
+    server_id: int,
+    database_name: str,
+    db_type: str,
+    backup_type: str,
+    user_id: int = None,
+    compress: bool = True,
+    compression_type: str = "zstd",
+    encrypt: bool = True
+) -> dict:
+    """
+    Dump the database to a local file (runs on the task's event loop).
+    When the engine can stream, the dump goes straight through the
+    compress/encrypt pipeline and the state already carries the checksum.
+    """
+    started_mono = time.monotonic()
+
     async with AsyncSessionLocal() as db:
         try:
             # Update backup status
             result = await db.execute(select(Backup).where(Backup.id == backup_id))
             backup = result.scalar_one()
             backup.status = BackupStatus.IN_PROGRESS
-            backup.started_at = datetime.utcnow()
+            backup.started_at = datetime.now(timezone.utc)
             await db.commit()
 
+            await WebSocketService.send_backup_progress(
+                backup_id, 0, BackupStatus.IN_PROGRESS.value, f"Backup started for {database_name}"
+            )
+
             # Get server info
-            result = await db.execute(select(Server).where(Server.id == server_id))
-            server = result.scalar_one()
+            server = await db.get(Server, server_id, options=[undefer(Server.credentials_encrypted)])
+            if server is None:
+                raise Exception(f"Server {server_id} not found")
 
             # Create executor
             executor = await ExecutorFactory.create_executor(
@@ -81,151 +188,225 @@ async def create_backup_task(
             )
 
             # Create backup engine
-            from app.core.security import decrypt_dict
-            import json
-            db_credentials = decrypt_dict(json.loads(server.credentials_encrypted))
+            db_credentials = decrypt_credentials(server.credentials_encrypted)
 
             engine = BackupEngineFactory.create_engine(
-                getattr(BackupType, db_type.upper()),
+                DatabaseType(db_type),
                 executor,
                 database_name,
                 db_credentials
             )
 
             # Create temporary file for backup
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.backup') as tmp_file:
-                temp_backup_path = tmp_file.name
+            temp_backup_path = _temp_file_path()
+            backup_type_enum = getattr(BackupType, backup_type.upper())
+            processed = {}
 
             # Execute backup
             logger.info(f"Starting backup for {database_name} on server {server.name}")
-            result = await engine.create_backup(
-                getattr(BackupType, backup_type.upper()),
-                temp_backup_path
-            )
+            if (
+                settings.BACKUP_STREAMING
+                and hasattr(executor, "stream")
+                and engine.supports_streaming(backup_type_enum)
+            ):
+                writer = BackupPipeline(
+                    getattr(CompressionType, compression_type.upper()) if compress else CompressionType.NONE,
+                    encrypt,
+                    checksum_algorithm=settings.BACKUP_CHECKSUM_ALGORITHM
+                ).open(temp_backup_path)
+                try:
+                    result = await engine.create_backup_streaming(backup_type_enum, writer)
+                finally:
+                    checksum, file_size = writer.close()
+                processed = {
+                    "checksum": checksum,
+                    "checksum_algorithm": settings.BACKUP_CHECKSUM_ALGORITHM,
+                    "size_bytes": file_size,
+                }
+            else:
+                result = await engine.create_backup(backup_type_enum, temp_backup_path)
 
             if not result.success:
+                if os.path.exists(temp_backup_path):
+                    os.remove(temp_backup_path)
                 raise Exception(f"Backup failed: {result.stderr}")
 
             # Get file size
             file_size = os.path.getsize(temp_backup_path)
             logger.info(f"Backup created: {file_size} bytes")
 
-            # Compress if requested
-            if compress:
-                compressed_path = f"{temp_backup_path}.compressed"
-                compression_service = CompressionService()
+            # Fix the storage key now so upload retries reuse it
+            timestamp = datetime.now(timezone.utc).strftime("%Y/%m/%d")
+
+            return {
+                "backup_id": backup_id,
+                "database_name": database_name,
+                "server_name": server.name,
+                "user_id": user_id,
+                "path": temp_backup_path,
+                "pre_compressed": result.pre_compressed,
+                "started_mono": started_mono,
+                "storage_path": f"backups/{timestamp}/backup_{backup_id}.dat",
+                **processed,
+            }
 
-                success = await compression_service.compress_file(
-                    temp_backup_path,
-                    compressed_path,
-                    getattr(CompressionType, compression_type.upper())
-                )
+        except Exception as e:
+            logger.error(f"Backup task failed: {e}", exc_info=True)
+            await _fail_backup(backup_id, database_name, e, started_mono)
+            raise
 
-                if not success:
-                    raise Exception("Compression failed")
 
-                os.remove(temp_backup_path)
-                temp_backup_path = compressed_path
-                file_size = os.path.getsize(temp_backup_path)
-                logger.info(f"Backup compressed: {file_size} bytes")
+@celery_app.task(base=BackupStepTask)
+def process_backup_task(state: dict) -> dict:
+    """Compress, encrypt and checksum the dump in a single pass"""
+    if "checksum" in state:
+        # Streamed through the pipeline while dumping
+        return state
 
-            # Encrypt if requested
-            if encrypt:
-                encrypted_path = f"{temp_backup_path}.enc"
-                encryption_service = EncryptionService()
+    temp_backup_path = state["path"]
+    checksum_algorithm = settings.BACKUP_CHECKSUM_ALGORITHM
 
-                success = await encryption_service.encrypt_file(
-                    temp_backup_path,
-                    encrypted_path
-                )
+    compress = state["compress"] and not state["pre_compressed"]
 
-                if not success:
-                    raise Exception("Encryption failed")
+    if compress or state["encrypt"]:
+        processed_path = f"{temp_backup_path}.dat"
+        pipeline = BackupPipeline(
+            getattr(CompressionType, state["compression_type"].upper()) if compress else CompressionType.NONE,
+            state["encrypt"],
+            checksum_algorithm=checksum_algorithm
+        )
 
-                os.remove(temp_backup_path)
-                temp_backup_path = encrypted_path
-                file_size = os.path.getsize(temp_backup_path)
-                logger.info(f"Backup encrypted: {file_size} bytes")
+        checksum, file_size = pipeline.process_file(temp_backup_path, processed_path)
 
-            # Calculate checksum
-            checksum = ChecksumService.calculate_checksum(temp_backup_path)
+        os.remove(temp_backup_path)
+        temp_backup_path = processed_path
+        logger.info(f"Backup processed: {file_size} bytes")
+    else:
+        checksum = ChecksumService.calculate_checksum(temp_backup_path, checksum_algorithm)
+        file_size = os.path.getsize(temp_backup_path)
 
-            # Upload to storage
-            timestamp = datetime.utcnow().strftime("%Y/%m/%d")
-            storage_path = f"backups/{timestamp}/backup_{backup_id}.dat"
+    return {
+        **state,
+        "path": temp_backup_path,
+        "checksum": checksum,
+        "checksum_algorithm": checksum_algorithm,
+        "size_bytes": file_size,
+    }
 
-            storage = get_storage()
-            success = await storage.upload(temp_backup_path, storage_path)
 
-            if not success:
-                raise Exception("Upload to storage failed")
+@celery_app.task(
+    base=BackupStepTask,
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    max_retries=3
+)
+def upload_backup_task(state: dict) -> dict:
+    """Upload the processed backup and mark it completed"""
+    return run_async(_upload_backup_async(state))
 
-            logger.info(f"Backup uploaded to: {storage_path}")
 
-            # Update backup record
-            backup.status = BackupStatus.COMPLETED
-            backup.completed_at = datetime.utcnow()
-            backup.duration_seconds = (backup.completed_at - backup.started_at).seconds
-            backup.size_bytes = file_size
-            backup.storage_path = storage_path
-            backup.checksum = f"sha256:{checksum}"
-            backup.is_compressed = compress
-            backup.compression_type = getattr(CompressionType, compression_type.upper()) if compress else CompressionType.NONE
-            backup.is_encrypted = encrypt
+async def _upload_backup_async(state: dict) -> dict:
+    """Upload backup and record completion (runs on the task's event loop)"""
+    backup_id = state["backup_id"]
+    database_name = state["database_name"]
+    storage_path = state["storage_path"]
 
-            # Create audit log
-            audit = AuditLog(
-                user_id=user_id,
-                action=AuditAction.BACKUP_CREATE,
-                resource_type=ResourceType.BACKUP,
-                resource_id=backup_id,
-                details={
-                    "database": database_name,
-                    "server": server.name,
-                    "size_bytes": file_size,
-                    "duration_seconds": backup.duration_seconds
-                }
-            )
-            db.add(audit)
-
-            await db.commit()
-
-            # Send success notification
-            await NotificationService.send_backup_notification(
-                backup_id=backup_id,
-                success=True,
-                message=f"Backup completed for {database_name}"
-            )
+    # Upload to storage
+    storage = get_storage()
+    success = await storage.upload(state["path"], storage_path)
 
-            # Cleanup temp file
-            if os.path.exists(temp_backup_path):
-                os.remove(temp_backup_path)
+    if not success:
+        raise Exception("Upload to storage failed")
 
-            logger.info(f"Backup task completed successfully: {backup_id}")
+    logger.info(f"Backup uploaded to: {storage_path}")
 
-        except Exception as e:
-            logger.error(f"Backup task failed: {e}", exc_info=True)
+    async with AsyncSessionLocal() as db:
+        backup = await db.get(Backup, backup_id)
+
+        # Update backup record
+        backup.status = BackupStatus.COMPLETED
+        backup.completed_at = datetime.now(timezone.utc)
+        backup.duration_seconds = int(time.monotonic() - state["started_mono"])
+        backup.size_bytes = state["size_bytes"]
+        backup.storage_path = storage_path
+        backup.checksum = f"{state['checksum_algorithm']}:{state['checksum']}"
+        backup.is_compressed = state["compress"]
+        backup.compression_type = getattr(CompressionType, state["compression_type"].upper()) if state["compress"] else CompressionType.NONE
+        backup.is_encrypted = state["encrypt"]
+
+        # Create audit log
+        await AuditService.write(db, [audit_entry(
+            user_id=state["user_id"],
+            action=AuditAction.BACKUP_CREATE,
+            resource_type=ResourceType.BACKUP,
+            resource_id=backup_id,
+            details={
+                "database": database_name,
+                "server": state["server_name"],
+                "size_bytes": state["size_bytes"],
+                "duration_seconds": backup.duration_seconds
+            }
+        )])
+
+        await db.commit()
+
+    await WebSocketService.send_backup_progress(
+        backup_id, 100, BackupStatus.COMPLETED.value, f"Backup completed for {database_name}"
+    )
+
+    # Send success notification
+    await NotificationService.send_backup_notification(
+        backup_id=backup_id,
+        success=True,
+        message=f"Backup completed for {database_name}"
+    )
+
+    # Cleanup temp file
+    if os.path.exists(state["path"]):
+        os.remove(state["path"])
+
+    logger.info(f"Backup task completed successfully: {backup_id}")
+    return state
+
+
+async def _fail_backup(
+    backup_id: int,
+    database_name: str,
+    error: Exception,
+    started_mono: float = None
+):
+    """
+    Mark a backup failed and notify
 
-            # Update backup status
+    The duration is measured against the monotonic clock captured when the
+    dump started, since wall-clock time can step while a backup runs.
+    """
+    async with AsyncSessionLocal() as db:
+        backup = await db.get(Backup, backup_id)
+        if backup is not None:
             backup.status = BackupStatus.FAILED
-            backup.completed_at = datetime.utcnow()
-            if backup.started_at:
-                backup.duration_seconds = (backup.completed_at - backup.started_at).seconds
-            backup.error_message = str(e)
+            backup.completed_at = datetime.now(timezone.utc)
+            if started_mono is not None:
+                backup.duration_seconds = int(time.monotonic() - started_mono)
+            elif backup.started_at:
+                backup.duration_seconds = int((backup.completed_at - backup.started_at).total_seconds())
+            backup.error_message = str(error)
             await db.commit()
 
-            # Send failure notification
-            await NotificationService.send_backup_notification(
-                backup_id=backup_id,
-                success=False,
-                message=f"Backup failed for {database_name}: {str(e)}"
-            )
+    await WebSocketService.send_backup_progress(
+        backup_id, 100, BackupStatus.FAILED.value, str(error)
+    )
 
-            raise
+    # Send failure notification
+    await NotificationService.send_backup_notification(
+        backup_id=backup_id,
+        success=False,
+        message=f"Backup failed for {database_name}: {str(error)}"
+    )
 
 
 @celery_app.task(base=BackupTask)
-async def restore_backup_task(
+def restore_backup_task(
     backup_id: int,
     target_server_id: int,
     target_database: str,
@@ -242,6 +423,23 @@ async def restore_backup_task(
         mask_data: Whether to mask sensitive data
         user_id: User who initiated the restore
     """
+    return run_async(_restore_backup_async(
+        backup_id,
+        target_server_id,
+        target_database,
+        mask_data,
+        user_id
+    ))
+
+
+async def _restore_backup_async(
+    backup_id: int,
+    target_server_id: int,
+    target_database: str,
+    mask_data: bool = False,
+    user_id: int = None
+):
+    """Restore backup (runs on the task's event loop)"""
     async with AsyncSessionLocal() as db:
         try:
             # Get backup info
@@ -249,12 +447,14 @@ async def restore_backup_task(
             backup = result.scalar_one()
 
             # Get target server
-            result = await db.execute(select(Server).where(Server.id == target_server_id))
-            target_server = result.scalar_one()
+            target_server = await db.get(
+                Server, target_server_id, options=[undefer(Server.credentials_encrypted)]
+            )
+            if target_server is None:
+                raise Exception(f"Server {target_server_id} not found")
 
             # Download backup from storage
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.backup') as tmp_file:
-                temp_restore_path = tmp_file.name
+            temp_restore_path = _temp_file_path()
 
             storage = get_storage()
             success = await storage.download(backup.storage_path, temp_restore_path)
@@ -262,6 +462,12 @@ async def restore_backup_task(
             if not success:
                 raise Exception("Failed to download backup from storage")
 
+            # Verify checksum (it covers the stored file, before decryption)
+            if backup.checksum:
+                algorithm, expected_checksum = backup.checksum.split(':', 1)
+                if not ChecksumService.verify_checksum(temp_restore_path, expected_checksum, algorithm):
+                    raise Exception("Checksum verification failed")
+
             # Decrypt if needed
             if backup.is_encrypted:
                 decrypted_path = f"{temp_restore_path}.dec"
@@ -295,12 +501,6 @@ async def restore_backup_task(
                 os.remove(temp_restore_path)
                 temp_restore_path = decompressed_path
 
-            # Verify checksum
-            if backup.checksum:
-                expected_checksum = backup.checksum.split(':')[1]
-                if not ChecksumService.verify_checksum(temp_restore_path, expected_checksum):
-                    raise Exception("Checksum verification failed")
-
             # Create executor for target server
             executor = await ExecutorFactory.create_executor(
                 target_server.type,
@@ -310,9 +510,7 @@ async def restore_backup_task(
             )
 
             # Create restore engine
-            from app.core.security import decrypt_dict
-            import json
-            db_credentials = decrypt_dict(json.loads(target_server.credentials_encrypted))
+            db_credentials = decrypt_credentials(target_server.credentials_encrypted)
 
             engine = BackupEngineFactory.create_engine(
                 backup.db_type,
@@ -329,7 +527,7 @@ async def restore_backup_task(
                 raise Exception(f"Restore failed: {result.stderr}")
 
             # Create audit log
-            audit = AuditLog(
+            await AuditService.write(db, [audit_entry(
                 user_id=user_id,
                 action=AuditAction.BACKUP_RESTORE,
                 resource_type=ResourceType.BACKUP,
@@ -339,8 +537,7 @@ async def restore_backup_task(
                     "target_server": target_server.name,
                     "masked": mask_data
                 }
-            )
-            db.add(audit)
+            )])
             await db.commit()
 
             # Send success notification
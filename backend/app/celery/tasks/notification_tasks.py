@@ -0,0 +1,69 @@
+"""
+Notification dispatch tasks
+"""
+import asyncio
+import logging
+
+import orjson
+import redis.asyncio as aioredis
+
+from app.celery.celery_app import celery_app, run_async
+from app.core.config import settings
+from app.services.notification import NotificationService, SLACK_QUEUE_KEY
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task
+def dispatch_notifications():
+    """Send queued Slack notifications in batches"""
+    return run_async(_dispatch_notifications_async())
+
+
+async def _dispatch_notifications_async():
+    """
+    Drain the Slack queue, posting up to SLACK_DISPATCH_CONCURRENCY batches of
+    SLACK_BATCH_SIZE messages at a time
+    """
+    if not settings.SLACK_WEBHOOK_URL:
+        return
+
+    batch_size = settings.SLACK_BATCH_SIZE
+    take = batch_size * settings.SLACK_DISPATCH_CONCURRENCY
+
+    client = aioredis.from_url(settings.REDIS_URL)
+    try:
+        while True:
+            # Take the messages atomically, so concurrent dispatchers never share them
+            async with client.pipeline(transaction=True) as pipe:
+                pipe.lrange(SLACK_QUEUE_KEY, 0, take - 1)
+                pipe.ltrim(SLACK_QUEUE_KEY, take, -1)
+                raw, _ = await pipe.execute()
+
+            if not raw:
+                return
+
+            notifications = [orjson.loads(item) for item in raw]
+            batches = [notifications[i:i + batch_size] for i in range(0, len(notifications), batch_size)]
+            results = await asyncio.gather(
+                *[NotificationService.send_slack_batch(settings.SLACK_WEBHOOK_URL, batch) for batch in batches],
+                return_exceptions=True
+            )
+
+            failed = sum(len(batch) for batch, ok in zip(batches, results) if ok is not True)
+            if failed:
+                # Same as a failed direct send: the messages are dropped
+                logger.error(f"Dropped {failed} Slack notifications")
+
+            if len(raw) < take:
+                return
+
+            # Slack is down or rate limiting us; leave the rest queued for the next run
+            if len(notifications) >= 30 and failed * 3 > len(notifications):
+                logger.warning("Too many Slack failures, postponing the rest of the queue")
+                return
+
+    except Exception as e:
+        logger.error(f"Error dispatching notifications: {e}", exc_info=True)
+    finally:
+        await client.aclose()
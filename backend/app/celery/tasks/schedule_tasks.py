@@ -1,13 +1,22 @@
 """
 Celery tasks for schedule management and server health monitoring
 """
+import asyncio
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+from celery import group
 from croniter import croniter
-from sqlalchemy import select
+from sqlalchemy import select, update
+from sqlalchemy.orm import selectinload, undefer
 
-from app.celery.celery_app import celery_app
+from app.celery.celery_app import celery_app, run_async
+from app.core.config import settings
+from app.db.partitions import create_monthly_partitions, drop_partitions_before
 from app.db.session import AsyncSessionLocal
+from app.models.command import CommandExecution
+from app.models.notification import Notification
 from app.models.schedule import Schedule
 from app.models.server import Server, HealthStatus
 from app.models.backup import Backup, BackupStatus
@@ -18,65 +27,98 @@ from app.celery.tasks.backup_tasks import create_backup_task
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1024)
+def _parse_cron(cron_expression: str, tz: str) -> croniter:
+    """Parse a cron expression once per worker process"""
+    return croniter(cron_expression, datetime.now(ZoneInfo(tz)))
+
+
+def _next_run(cron_expression: str, tz: str, now: datetime) -> datetime:
+    """Next fire time (UTC) of a cron expression in the given timezone after now"""
+    local_now = now.astimezone(ZoneInfo(tz))
+    next_local = _parse_cron(cron_expression, tz).get_next(datetime, start_time=local_now)
+    return next_local.astimezone(timezone.utc)
+
+
 @celery_app.task
-async def check_scheduled_backups():
+def check_scheduled_backups():
     """Check and trigger scheduled backups"""
+    return run_async(_check_scheduled_backups_async())
+
+
+async def _check_scheduled_backups_async():
+    """Trigger due scheduled backups"""
     async with AsyncSessionLocal() as db:
         try:
-            # Get all enabled schedules
+            now = datetime.now(timezone.utc)
+
+            # Get enabled schedules that are due to run
             result = await db.execute(
-                select(Schedule).where(Schedule.enabled == True)
+                select(Schedule)
+                .where(Schedule.enabled == True)
+                .where(Schedule.next_run.isnot(None))
+                .where(Schedule.next_run <= now)
+                .order_by(Schedule.next_run)
             )
-            schedules = result.scalars().all()
-
-            now = datetime.utcnow()
-
-            for schedule in schedules:
-                # Check if it's time to run
-                if schedule.next_run and schedule.next_run <= now:
-                    logger.info(f"Triggering scheduled backup: {schedule.name}")
-
-                    # Create backup record
-                    backup = Backup(
-                        server_id=schedule.server_id,
-                        database_name=schedule.database_name,
-                        db_type=schedule.database_name,  # This should come from server
-                        backup_type=schedule.backup_type,
-                        status=BackupStatus.PENDING
-                    )
-                    db.add(backup)
-                    await db.flush()
-
-                    # Queue backup task
-                    create_backup_task.delay(
-                        backup_id=backup.id,
-                        server_id=schedule.server_id,
-                        database_name=schedule.database_name,
-                        db_type="postgresql",  # Should be determined from server
-                        backup_type=schedule.backup_type.value,
-                        compress=True,
-                        encrypt=True
-                    )
-
-                    # Update schedule
-                    schedule.last_run = now
-                    cron = croniter(schedule.cron_expression, now)
-                    schedule.next_run = cron.get_next(datetime)
-
-                    await db.commit()
+            due = result.scalars().all()
+            if not due:
+                return
+
+            # Create all backup records and get their IDs in one flush
+            backups = [
+                Backup(
+                    server_id=schedule.server_id,
+                    database_name=schedule.database_name,
+                    db_type=schedule.db_type,
+                    backup_type=schedule.backup_type,
+                    status=BackupStatus.PENDING
+                )
+                for schedule in due
+            ]
+            db.add_all(backups)
+            await db.flush()
+
+            # Update schedules
+            for schedule in due:
+                logger.info(f"Triggering scheduled backup: {schedule.name}")
+                schedule.last_run = now
+                schedule.next_run = _next_run(schedule.cron_expression, schedule.timezone or "UTC", now)
+
+            await db.commit()
+
+            # Queue all backup tasks in a single pipelined broker send
+            group(
+                create_backup_task.s(
+                    backup_id=backup.id,
+                    server_id=schedule.server_id,
+                    database_name=schedule.database_name,
+                    db_type=schedule.db_type.value,
+                    backup_type=schedule.backup_type.value,
+                    compress=True,
+                    encrypt=True
+                )
+                for schedule, backup in zip(due, backups)
+            ).apply_async()
 
         except Exception as e:
             logger.error(f"Error checking scheduled backups: {e}", exc_info=True)
 
 
 @celery_app.task
-async def cleanup_old_backups():
+def cleanup_old_backups():
     """Clean up old backups based on retention policies"""
+    return run_async(_cleanup_old_backups_async())
+
+
+async def _cleanup_old_backups_async():
+    """Apply retention policies to completed backups"""
     async with AsyncSessionLocal() as db:
         try:
             # Get all schedules with retention policies
             result = await db.execute(
-                select(Schedule).where(Schedule.retention_policy_id.isnot(None))
+                select(Schedule)
+                .where(Schedule.retention_policy_id.isnot(None))
+                .options(selectinload(Schedule.retention_policy))
             )
             schedules = result.scalars().all()
 
@@ -87,14 +129,15 @@ async def cleanup_old_backups():
                 policy = schedule.retention_policy
 
                 # Get backups for this schedule's server and database
+                # (only the columns the policy needs, no ORM objects)
                 result = await db.execute(
-                    select(Backup)
+                    select(Backup.id, Backup.created_at)
                     .where(Backup.server_id == schedule.server_id)
                     .where(Backup.database_name == schedule.database_name)
                     .where(Backup.status == BackupStatus.COMPLETED)
                     .order_by(Backup.created_at.desc())
                 )
-                backups = result.scalars().all()
+                backups = result.all()
 
                 backups_to_keep = set()
 
@@ -105,7 +148,7 @@ async def cleanup_old_backups():
 
                 # Keep backups for N days
                 if policy.keep_days:
-                    cutoff_date = datetime.utcnow() - timedelta(days=policy.keep_days)
+                    cutoff_date = datetime.now(timezone.utc) - timedelta(days=policy.keep_days)
                     for backup in backups:
                         if backup.created_at >= cutoff_date:
                             backups_to_keep.add(backup.id)
@@ -122,72 +165,124 @@ async def cleanup_old_backups():
                             break
 
                 # Delete old backups
-                for backup in backups:
-                    if backup.id not in backups_to_keep:
-                        logger.info(f"Deleting old backup: {backup.id}")
-                        backup.status = BackupStatus.DELETED
-                        backup.deleted_at = datetime.utcnow()
+                to_delete_ids = [
+                    backup.id for backup in backups
+                    if backup.id not in backups_to_keep
+                ]
+                if to_delete_ids:
+                    logger.info(f"Deleting old backups: {to_delete_ids}")
+                    await db.execute(
+                        update(Backup)
+                        .where(Backup.id.in_(to_delete_ids))
+                        .values(status=BackupStatus.DELETED, deleted_at=datetime.now(timezone.utc))
+                        .execution_options(synchronize_session=False)
+                    )
 
-                await db.commit()
+            await db.commit()
 
         except Exception as e:
             logger.error(f"Error cleaning up old backups: {e}", exc_info=True)
 
 
 @celery_app.task
-async def check_server_health():
+def maintain_log_partitions():
+    """Create upcoming monthly log partitions and drop expired ones"""
+    return run_async(_maintain_log_partitions_async())
+
+
+async def _maintain_log_partitions_async():
+    """Keep this and next month's partitions ready; drop months past retention"""
+    async with AsyncSessionLocal() as db:
+        try:
+            today = datetime.now(timezone.utc).date()
+            cutoff = today - timedelta(days=settings.LOG_RETENTION_DAYS)
+
+            for table in (Notification.__tablename__, CommandExecution.__tablename__):
+                await create_monthly_partitions(db, table, today, months=2)
+                dropped = await drop_partitions_before(db, table, cutoff)
+                if dropped:
+                    logger.info(f"Dropped expired partitions: {dropped}")
+
+            await db.commit()
+
+        except Exception as e:
+            logger.error(f"Error maintaining log partitions: {e}", exc_info=True)
+
+
+@celery_app.task
+def check_server_health():
     """Check health of all servers"""
+    return run_async(_check_server_health_async())
+
+
+async def _check_server_health_async():
+    """Probe all active servers and record their health"""
     async with AsyncSessionLocal() as db:
         try:
-            result = await db.execute(select(Server).where(Server.is_active == True))
+            result = await db.execute(
+                select(Server)
+                .where(Server.is_active == True)
+                .options(undefer(Server.credentials_encrypted))
+            )
             servers = result.scalars().all()
 
-            now = datetime.utcnow()
+            now = datetime.now(timezone.utc)
 
-            for server in servers:
-                try:
-                    # Create executor
-                    executor = await ExecutorFactory.create_executor(
-                        server.type,
-                        server.host,
-                        server.port,
-                        server.credentials_encrypted
-                    )
+            # Probes are pure network I/O - run them concurrently, bounded
+            semaphore = asyncio.Semaphore(settings.HEALTH_CHECK_CONCURRENCY)
+
+            async def probe(server: Server):
+                async with semaphore:
+                    await _probe_server(server, now)
+
+            await asyncio.gather(*(probe(server) for server in servers), return_exceptions=True)
 
-                    # Test connection
-                    result = await executor.execute("echo 'ping'")
-
-                    if result.success:
-                        # Server is healthy
-                        previous_status = server.health_status
-                        server.health_status = HealthStatus.HEALTHY
-                        server.last_heartbeat = now
-
-                        # Send alert if server recovered
-                        if previous_status == HealthStatus.UNHEALTHY:
-                            await NotificationService.send_server_health_alert(
-                                server.name,
-                                "HEALTHY",
-                                "Server has recovered and is now healthy"
-                            )
-                    else:
-                        # Server is unhealthy
-                        previous_status = server.health_status
-                        server.health_status = HealthStatus.UNHEALTHY
-
-                        # Send alert if server just became unhealthy
-                        if previous_status != HealthStatus.UNHEALTHY:
-                            await NotificationService.send_server_health_alert(
-                                server.name,
-                                "UNHEALTHY",
-                                f"Server is not responding: {result.stderr}"
-                            )
-
-                except Exception as e:
-                    logger.error(f"Health check failed for server {server.name}: {e}")
-                    server.health_status = HealthStatus.UNKNOWN
-
-                await db.commit()
+            await db.commit()
 
         except Exception as e:
             logger.error(f"Error checking server health: {e}", exc_info=True)
+
+
+async def _probe_server(server: Server, now: datetime):
+    """Check a single server and update its health status in place"""
+    try:
+        # Create executor
+        executor = await ExecutorFactory.create_executor(
+            server.type,
+            server.host,
+            server.port,
+            server.credentials_encrypted
+        )
+
+        # Test connection
+        result = await executor.execute("echo 'ping'")
+
+        if result.success:
+            # Server is healthy
+            previous_status = server.health_status
+            server.health_status = HealthStatus.HEALTHY
+            server.last_heartbeat = now
+
+            # Send alert if server recovered
+            if previous_status == HealthStatus.UNHEALTHY:
+                await NotificationService.send_server_health_alert(
+                    server.name,
+                    "HEALTHY",
+                    "Server has recovered and is now healthy"
+                )
+        else:
+            # Server is unhealthy
+            previous_status = server.health_status
+            server.health_status = HealthStatus.UNHEALTHY
+
+            # Send alert if server just became unhealthy
+            if previous_status != HealthStatus.UNHEALTHY:
+                await NotificationService.send_server_health_alert(
+                    server.name,
+                    "UNHEALTHY",
+                    f"Server is not responding: {result.stderr}"
+                )
+
+    except Exception as e:
+        logger.error(f"Health check failed for server {server.name}: {e}")
+        server.health_status = HealthStatus.UNKNOWN
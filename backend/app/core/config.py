@@ -1,7 +1,7 @@
 """
 Application configuration using Pydantic Settings
 """
-from typing import List
+from typing import List, Optional
 from pydantic_settings import BaseSettings
 from pydantic import validator, Field, field_validator
 import os
@@ -27,6 +27,9 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     DATABASE_POOL_SIZE: int = 20
     DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_RECYCLE: int = 1800
+    DATABASE_QUERY_CACHE_SIZE: int = 1200  # Compiled SQL statements kept per engine
+    AUTO_CREATE_TABLES: bool = False
 
     # Redis
     REDIS_URL: str
@@ -39,6 +42,8 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRE_MINUTES: int = 30
     JWT_REFRESH_EXPIRE_DAYS: int = 7
+    BCRYPT_ROUNDS: int = 12
+    API_KEY_PEPPER: Optional[str] = None  # Defaults to SECRET_KEY
 
     @validator("SECRET_KEY")
     def validate_secret_key(cls, v):
@@ -88,12 +93,17 @@ class Settings(BaseSettings):
     S3_BUCKET: str = "db-backups"
     S3_REGION: str = "us-east-1"
     S3_USE_SSL: bool = False
+    S3_MULTIPART_THRESHOLD_MB: int = 8
+    S3_MULTIPART_CHUNKSIZE_MB: int = 16
+    S3_MAX_CONCURRENCY: int = 16  # parts in flight per transfer
 
     # Celery
     CELERY_BROKER_URL: str
     CELERY_RESULT_BACKEND: str
     CELERY_TASK_TRACK_STARTED: bool = True
     CELERY_TASK_TIME_LIMIT: int = 3600
+    CELERY_WORKER_PREFETCH_MULTIPLIER: int = 1
+    CELERY_WORKER_MAX_TASKS_PER_CHILD: int = 100
 
     # Email
     SMTP_HOST: str = ""
@@ -102,18 +112,40 @@ class Settings(BaseSettings):
     SMTP_PASSWORD: str = ""
     SMTP_FROM: str = ""
     SMTP_USE_TLS: bool = True
+    SMTP_POOL_SIZE: int = 5  # open SMTP connections per process
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = 100
 
     # Slack
     SLACK_WEBHOOK_URL: str = ""
+    SLACK_BATCH_INTERVAL: float = 10.0  # seconds between queue drains
+    SLACK_BATCH_SIZE: int = 50  # messages per Slack post (Slack allows 50 blocks)
+    SLACK_DISPATCH_CONCURRENCY: int = 4  # Slack posts in flight per dispatch round
 
     # Backup Settings
     BACKUP_TEMP_DIR: str = "/tmp/backups"
     BACKUP_RETENTION_DAYS: int = 30
     MAX_CONCURRENT_BACKUPS: int = 5
+    EXECUTOR_POOL_SIZE: int = 64
+    SSH_THREAD_POOL_SIZE: int = 64  # threads for blocking SSH/SFTP work
+    SSH_COMPRESSION: bool = True  # zlib on SSH transports; ssh_compression credential overrides
+    BACKUP_PARALLEL_JOBS: Optional[int] = None  # pg_dump/pg_restore -j; defaults to CPU count
+    BACKUP_STREAMING: bool = True  # dump straight into compress/encrypt (single pg_dump worker)
+    BACKUP_CHECKSUM_ALGORITHM: str = "blake3"  # blake3, sha256 or md5; stored with each backup
+    PG_RESTORE_MAINTENANCE_WORK_MEM: str = "1GB"  # per pg_restore connection
+    PG_RESTORE_MAX_WAL_SIZE: str = "16GB"  # fast_restore_mode servers only
+    SFTP_PARALLEL_STREAMS: int = 4  # concurrent SFTP channels per large download
+    SFTP_PARALLEL_MIN_SIZE: int = 64 * 1024 * 1024  # bytes; smaller files use one stream
 
     # Monitoring
     LOG_LEVEL: str = "INFO"
     LOG_FORMAT: str = "json"
+    HEALTH_CHECK_CONCURRENCY: int = 32
+    LOG_RETENTION_DAYS: int = 90  # Notification and command execution history
+
+    # WebSocket
+    WEBSOCKET_MAX_QUEUE: int = 100
+    WEBSOCKET_SEND_TIMEOUT: float = 5.0
+    WEBSOCKET_COALESCE_INTERVAL: float = 0.1  # seconds; 0 sends every progress update
 
     # Rate Limiting
     RATE_LIMIT_ENABLED: bool = True
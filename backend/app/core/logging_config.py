@@ -1,17 +1,72 @@
 """
 Logging configuration
 """
+import atexit
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
+
+import orjson
 from pythonjsonlogger import jsonlogger
 
 from app.core.config import settings
 
 
+class OrjsonFormatter(jsonlogger.JsonFormatter):
+    """JSON log formatter that serializes records with orjson"""
+
+    _fallback = jsonlogger.JsonEncoder().default
+
+    def jsonify_log_record(self, log_record):
+        return orjson.dumps(log_record, default=self._fallback).decode()
+
+
+class _LogQueueHandler(QueueHandler):
+    """
+    Queue handler that leaves formatting to the listener thread.
+
+    The stock handler renders the whole record (traceback included) into the
+    message before queueing it; this only resolves the arguments and the
+    exception text, so the JSON formatter still sees them as separate fields.
+    """
+
+    def prepare(self, record):
+        if not isinstance(record.msg, dict):
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listener = None
+
+
+def _stop_listener():
+    """Flush queued records and stop the logging thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(_stop_listener)
+
+
 def setup_logging():
     """Setup application logging"""
+    global _listener
+
     log_level = getattr(logging, settings.LOG_LEVEL.upper())
 
+    # Skip per-record thread/process lookups nobody reads
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    logging.raiseExceptions = False
+
     # Create root logger
     root_logger = logging.getLogger()
     root_logger.setLevel(log_level)
@@ -25,7 +80,7 @@ def setup_logging():
 
     # Set formatter based on configuration
     if settings.LOG_FORMAT == "json":
-        formatter = jsonlogger.JsonFormatter(
+        formatter = OrjsonFormatter(
             "%(asctime)s %(name)s %(levelname)s %(message)s"
         )
     else:
@@ -34,7 +89,14 @@ def setup_logging():
         )
 
     console_handler.setFormatter(formatter)
-    root_logger.addHandler(console_handler)
+
+    # Format and write records on a background thread
+    _stop_listener()
+    log_queue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, console_handler, respect_handler_level=True)
+    _listener.start()
+
+    root_logger.addHandler(_LogQueueHandler(log_queue))
 
     # Set specific loggers
     logging.getLogger("uvicorn").setLevel(log_level)
@@ -1,81 +1,147 @@
 """
 Security utilities for authentication and encryption
 """
-from datetime import datetime, timedelta
+import base64
+import hashlib
+import hmac
+import os
+import time
+from datetime import timedelta
+from functools import lru_cache
 from typing import Optional, Dict, Any
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+import bcrypt
+import orjson
+import jwt
+from jwt import InvalidTokenError
 from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 
 from app.core.config import settings
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing work factor
+_bcrypt_rounds = settings.BCRYPT_ROUNDS
 
-# Fernet encryption for sensitive data
+# Keyed hash for API key lookups; copying a prepared HMAC skips re-deriving
+# the key pads on every request
+_api_key_hmac = hmac.new(
+    (settings.API_KEY_PEPPER or settings.SECRET_KEY).encode(),
+    digestmod=hashlib.sha256
+)
+
+# JWT parameters, read from settings once
+_jwt_key = settings.SECRET_KEY.encode()
+_jwt_algorithm = settings.JWT_ALGORITHM
+_jwt_algorithms = [settings.JWT_ALGORITHM]
+_access_token_ttl = settings.JWT_EXPIRE_MINUTES * 60
+_refresh_token_ttl = settings.JWT_REFRESH_EXPIRE_DAYS * 86400
+
+# Fernet encryption for sensitive data (still used to read older tokens)
 fernet = Fernet(settings.ENCRYPTION_KEY.encode())
 
+# AES-256-GCM for new tokens, keyed from ENCRYPTION_KEY.
+# Tokens are urlsafe base64 of: version byte || nonce || ciphertext+tag.
+# Fernet tokens always start with 0x80, so the first byte tells them apart.
+_AEAD_VERSION = b"\x01"
+_aead = AESGCM(HKDF(
+    algorithm=hashes.SHA256(),
+    length=32,
+    salt=None,
+    info=b"db-backup-ui data encryption",
+).derive(base64.urlsafe_b64decode(settings.ENCRYPTION_KEY)))
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    """Verify a password against its bcrypt hash"""
+    try:
+        return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
+    except ValueError:
+        # Malformed or non-bcrypt hash
+        return False
 
 
 def get_password_hash(password: str) -> str:
-    """Hash a password"""
-    return pwd_context.hash(password)
+    """Hash a password with bcrypt at the configured work factor"""
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=_bcrypt_rounds)).decode()
+
+
+def hash_api_key(api_key: str) -> str:
+    """
+    Hash an API key for storage and lookup.
+    Keys are long random tokens, so a single HMAC-SHA256 is enough; unlike
+    passwords they do not need a slow hash. The pepper keeps a leaked
+    key_hash column from being checked offline without the server secret.
+    """
+    mac = _api_key_hmac.copy()
+    mac.update(api_key.encode())
+    return mac.hexdigest()
 
 
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token"""
-    to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.JWT_EXPIRE_MINUTES)
-
-    to_encode.update({"exp": expire, "type": "access"})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
-    return encoded_jwt
+    ttl = int(expires_delta.total_seconds()) if expires_delta else _access_token_ttl
+    expire = int(time.time()) + ttl
+    return jwt.encode({**data, "exp": expire, "type": "access"}, _jwt_key, algorithm=_jwt_algorithm)
 
 
 def create_refresh_token(data: Dict[str, Any]) -> str:
     """Create JWT refresh token"""
-    to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(days=settings.JWT_REFRESH_EXPIRE_DAYS)
-    to_encode.update({"exp": expire, "type": "refresh"})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
-    return encoded_jwt
+    expire = int(time.time()) + _refresh_token_ttl
+    return jwt.encode({**data, "exp": expire, "type": "refresh"}, _jwt_key, algorithm=_jwt_algorithm)
 
 
 def decode_token(token: str) -> Dict[str, Any]:
     """Decode and validate JWT token"""
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+        payload = jwt.decode(token, _jwt_key, algorithms=_jwt_algorithms)
         return payload
-    except JWTError:
+    except InvalidTokenError:
         return None
 
 
+def encrypt_bytes(data: bytes) -> bytes:
+    """Encrypt bytes using AES-256-GCM, returning the base64 token"""
+    nonce = os.urandom(12)
+    return base64.urlsafe_b64encode(_AEAD_VERSION + nonce + _aead.encrypt(nonce, data, None))
+
+
+def decrypt_bytes(token: bytes) -> bytes:
+    """Decrypt a base64 token (AES-256-GCM, or Fernet for older tokens)"""
+    raw = base64.urlsafe_b64decode(token)
+    if raw[:1] == _AEAD_VERSION:
+        return _aead.decrypt(raw[1:13], raw[13:], None)
+    return fernet.decrypt(token)
+
+
 def encrypt_data(data: str) -> str:
-    """Encrypt sensitive data using Fernet"""
-    return fernet.encrypt(data.encode()).decode()
+    """Encrypt sensitive data using AES-256-GCM"""
+    return encrypt_bytes(data.encode()).decode("ascii")
 
 
 def decrypt_data(encrypted_data: str) -> str:
-    """Decrypt sensitive data using Fernet"""
-    return fernet.decrypt(encrypted_data.encode()).decode()
+    """Decrypt sensitive data"""
+    return decrypt_bytes(encrypted_data.encode("ascii")).decode()
 
 
 def encrypt_dict(data: Dict[str, Any]) -> Dict[str, str]:
     """Encrypt dictionary values"""
-    import json
-    json_str = json.dumps(data)
-    return {"encrypted": encrypt_data(json_str)}
+    return {"encrypted": encrypt_bytes(orjson.dumps(data)).decode("ascii")}
 
 
 def decrypt_dict(encrypted: Dict[str, str]) -> Dict[str, Any]:
     """Decrypt dictionary values"""
-    import json
-    json_str = decrypt_data(encrypted["encrypted"])
-    return json.loads(json_str)
+    return orjson.loads(decrypt_bytes(encrypted["encrypted"].encode("ascii")))
+
+
+@lru_cache(maxsize=256)
+def _decrypt_credentials_cached(credentials_encrypted: str) -> Dict[str, Any]:
+    return decrypt_dict(orjson.loads(credentials_encrypted))
+
+
+def decrypt_credentials(credentials_encrypted: str) -> Dict[str, Any]:
+    """
+    Decrypt a server's stored credentials JSON.
+    Cached by ciphertext, so updated credentials are decrypted afresh.
+    """
+    return dict(_decrypt_credentials_cached(credentials_encrypted))
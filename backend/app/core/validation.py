@@ -2,37 +2,61 @@
 Input validation and sanitization utilities.
 Prevents injection attacks and ensures data integrity.
 """
+import os
 import re
+import string
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
 
+# Patterns are compiled once at import; validators run on every request field.
+# Each one checks length and charset in a single anchored pass (\Z, unlike $,
+# does not accept a trailing newline).
+_HOSTNAME_RE = re.compile(r'\A(?=.{1,253}\Z)[a-zA-Z0-9](?:[a-zA-Z0-9\-\.]{0,251}[a-zA-Z0-9])?\Z')
+_DB_NAME_RE = re.compile(r'\A[a-zA-Z0-9_\-]{1,63}\Z')
+_USERNAME_RE = re.compile(r'\A[a-zA-Z0-9_\-]{1,32}\Z')
+_CONTAINER_RE = re.compile(r'\A[a-zA-Z0-9][a-zA-Z0-9_\.\-]{0,254}\Z')
+_NAMESPACE_RE = re.compile(r'\A(?=.{1,63}\Z)[a-z0-9](?:[\-a-z0-9]*[a-z0-9])?\Z')
+_EMAIL_RE = re.compile(r'\A(?=.{1,254}\Z)[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\Z')
+
+# Password character classes and blocklist (lowercase, one per line)
+_PW_UPPER = frozenset(string.ascii_uppercase)
+_PW_LOWER = frozenset(string.ascii_lowercase)
+_PW_DIGIT = frozenset(string.digits)
+_PW_SPECIAL = frozenset('!@#$%^&*(),.?":{}|<>')
+_COMMON_PASSWORDS = frozenset(
+    line.strip()
+    for line in Path(__file__).with_name("common_passwords.txt").read_text().splitlines()
+    if line.strip()
+)
+
+# Translation table that deletes shell metacharacters in a single pass
+_SHELL_BAD_TT = str.maketrans('', '', ";|&$`\n\r><(){}")
+
+
 class ValidationError(Exception):
     """Raised when validation fails"""
     pass
 
 
+def _apply(pattern: re.Pattern, value: str, max_length: int, length_error: str, format_error: str) -> str:
+    """Match value against pattern; only on failure work out which error to report"""
+    if value and pattern.match(value):
+        return value
+    if not value or len(value) > max_length:
+        raise ValidationError(length_error)
+    raise ValidationError(format_error)
+
+
 def validate_hostname(hostname: str) -> str:
     """
     Validate hostname/IP address.
     Prevents command injection in SSH/network operations.
     """
-    # Allow: alphanumeric, dots, hyphens, and underscores
-    # Length: 1-253 characters
-    if not hostname or len(hostname) > 253:
-        raise ValidationError("Invalid hostname length")
-
-    # Pattern for valid hostname/IP
-    pattern = r'^[a-zA-Z0-9]([a-zA-Z0-9\-\.]{0,251}[a-zA-Z0-9])?$'
-    if not re.match(pattern, hostname):
-        raise ValidationError("Invalid hostname format")
-
-    # Prevent command injection characters
-    dangerous_chars = [';', '|', '&', '$', '`', '\n', '\r', '>', '<']
-    if any(char in hostname for char in dangerous_chars):
-        raise ValidationError("Hostname contains invalid characters")
-
-    return hostname
+    # Allow: alphanumeric, dots and hyphens, 1-253 characters. Shell
+    # metacharacters are outside the character class.
+    return _apply(_HOSTNAME_RE, hostname, 253, "Invalid hostname length", "Invalid hostname format")
 
 
 def validate_port(port: int) -> int:
@@ -51,13 +75,12 @@ def validate_database_name(name: str) -> str:
     Validate database name.
     Prevents SQL injection and command injection.
     """
-    if not name or len(name) > 63:
-        raise ValidationError("Invalid database name length")
-
     # Allow only alphanumeric, underscore, and hyphen
-    pattern = r'^[a-zA-Z0-9_\-]+$'
-    if not re.match(pattern, name):
-        raise ValidationError("Database name can only contain alphanumeric, underscore, and hyphen")
+    _apply(
+        _DB_NAME_RE, name, 63,
+        "Invalid database name length",
+        "Database name can only contain alphanumeric, underscore, and hyphen"
+    )
 
     # Prevent SQL injection keywords as database names
     sql_keywords = ['DROP', 'DELETE', 'INSERT', 'UPDATE', 'SELECT', 'EXEC', 'EXECUTE']
@@ -69,15 +92,18 @@ def validate_database_name(name: str) -> str:
 
 def validate_username(username: str) -> str:
     """Validate username for SSH/database connections"""
-    if not username or len(username) > 32:
-        raise ValidationError("Invalid username length")
-
     # Allow alphanumeric, underscore, and hyphen
-    pattern = r'^[a-zA-Z0-9_\-]+$'
-    if not re.match(pattern, username):
-        raise ValidationError("Username can only contain alphanumeric, underscore, and hyphen")
+    return _apply(
+        _USERNAME_RE, username, 32,
+        "Invalid username length",
+        "Username can only contain alphanumeric, underscore, and hyphen"
+    )
+
 
-    return username
+@lru_cache(maxsize=32)
+def _resolved_base(allowed_base: str) -> Path:
+    """Resolve a base directory once; callers use a handful of fixed bases"""
+    return Path(allowed_base).resolve()
 
 
 def validate_file_path(file_path: str, allowed_base: Optional[str] = None) -> str:
@@ -101,52 +127,43 @@ def validate_file_path(file_path: str, allowed_base: Optional[str] = None) -> st
     if '\0' in file_path:
         raise ValidationError("File path contains null bytes")
 
+    # Check for directory traversal attempts on the raw string
+    if '..' in file_path.replace('\\', '/').split('/'):
+        raise ValidationError("Directory traversal not allowed")
+
+    # Without a base there is nothing to contain, so skip resolving symlinks
+    if not allowed_base:
+        return os.path.abspath(file_path)
+
     # Resolve to absolute path and normalize
     try:
         path = Path(file_path).resolve()
     except (ValueError, OSError) as e:
         raise ValidationError(f"Invalid file path: {e}")
 
-    # Check for directory traversal attempts
-    if '..' in Path(file_path).parts:
-        raise ValidationError("Directory traversal not allowed")
-
-    # If base directory specified, ensure path is within it
-    if allowed_base:
-        try:
-            base = Path(allowed_base).resolve()
-            # Check if path is relative to base
-            path.relative_to(base)
-        except ValueError:
-            raise ValidationError(f"Path must be within {allowed_base}")
+    # Ensure path is within the base directory
+    try:
+        path.relative_to(_resolved_base(allowed_base))
+    except ValueError:
+        raise ValidationError(f"Path must be within {allowed_base}")
 
     return str(path)
 
 
 def validate_container_name(name: str) -> str:
     """Validate Docker container name"""
-    if not name or len(name) > 255:
-        raise ValidationError("Invalid container name length")
-
     # Docker naming: alphanumeric, underscore, period, hyphen
-    pattern = r'^[a-zA-Z0-9][a-zA-Z0-9_\.\-]*$'
-    if not re.match(pattern, name):
-        raise ValidationError("Invalid container name format")
-
-    return name
+    return _apply(_CONTAINER_RE, name, 255, "Invalid container name length", "Invalid container name format")
 
 
 def validate_namespace(namespace: str) -> str:
     """Validate Kubernetes namespace"""
-    if not namespace or len(namespace) > 63:
-        raise ValidationError("Invalid namespace length")
-
     # K8s naming: lowercase alphanumeric and hyphen
-    pattern = r'^[a-z0-9]([\-a-z0-9]*[a-z0-9])?$'
-    if not re.match(pattern, namespace):
-        raise ValidationError("Invalid namespace format (must be lowercase alphanumeric with hyphens)")
-
-    return namespace
+    return _apply(
+        _NAMESPACE_RE, namespace, 63,
+        "Invalid namespace length",
+        "Invalid namespace format (must be lowercase alphanumeric with hyphens)"
+    )
 
 
 def sanitize_shell_arg(arg: str) -> str:
@@ -158,10 +175,7 @@ def sanitize_shell_arg(arg: str) -> str:
         return ""
 
     # Remove dangerous characters
-    dangerous_chars = [';', '|', '&', '$', '`', '\n', '\r', '>', '<', '(', ')', '{', '}']
-    sanitized = arg
-    for char in dangerous_chars:
-        sanitized = sanitized.replace(char, '')
+    sanitized = arg.translate(_SHELL_BAD_TT)
 
     # Escape single quotes
     sanitized = sanitized.replace("'", "'\\''")
@@ -188,15 +202,8 @@ def validate_cron_expression(expression: str) -> str:
 
 def validate_email(email: str) -> str:
     """Basic email validation"""
-    if not email or len(email) > 254:
-        raise ValidationError("Invalid email length")
-
     # Simple email pattern
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    if not re.match(pattern, email):
-        raise ValidationError("Invalid email format")
-
-    return email.lower()
+    return _apply(_EMAIL_RE, email, 254, "Invalid email length", "Invalid email format").lower()
 
 
 def validate_password_strength(password: str) -> str:
@@ -219,21 +226,34 @@ def validate_password_strength(password: str) -> str:
     if len(password) > 128:
         raise ValidationError("Password too long (max 128 characters)")
 
-    if not re.search(r'[A-Z]', password):
+    # Single pass over the password for the required character classes
+    has_upper = has_lower = has_digit = has_special = False
+    for char in password:
+        if char in _PW_UPPER:
+            has_upper = True
+        elif char in _PW_LOWER:
+            has_lower = True
+        elif char in _PW_DIGIT:
+            has_digit = True
+        elif char in _PW_SPECIAL:
+            has_special = True
+        if has_upper and has_lower and has_digit and has_special:
+            break
+
+    if not has_upper:
         raise ValidationError("Password must contain at least one uppercase letter")
 
-    if not re.search(r'[a-z]', password):
+    if not has_lower:
         raise ValidationError("Password must contain at least one lowercase letter")
 
-    if not re.search(r'\d', password):
+    if not has_digit:
         raise ValidationError("Password must contain at least one digit")
 
-    if not re.search(r'[!@#$%^&*(),.?":{}|<>]', password):
+    if not has_special:
         raise ValidationError("Password must contain at least one special character")
 
-    # Check for common passwords (basic check)
-    common_passwords = ['password', '12345678', 'qwerty', 'admin123']
-    if password.lower() in common_passwords:
+    # Check for common passwords
+    if password.lower() in _COMMON_PASSWORDS:
         raise ValidationError("Password is too common")
 
     return password
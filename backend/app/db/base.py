@@ -1,6 +1,7 @@
 """
 Base class for all SQLAlchemy models
 """
+from datetime import datetime, timezone
 from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy import MetaData
 
@@ -16,6 +17,11 @@ convention = {
 metadata = MetaData(naming_convention=convention)
 
 
+def utcnow() -> datetime:
+    """Python-side timestamp default for high-volume insert tables"""
+    return datetime.now(timezone.utc)
+
+
 class Base(DeclarativeBase):
     """Base class for all models"""
     metadata = metadata
@@ -0,0 +1,161 @@
+"""
+In-place upgrades for tables created by earlier releases
+
+create_all only creates missing tables, so changes to existing ones are
+applied here at startup. Every step checks the catalog first and is a
+no-op once applied.
+"""
+import logging
+from datetime import timezone
+from typing import Set
+
+from sqlalchemy import Table, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.schema import AddConstraint
+
+from app.db.base import Base
+from app.db.partitions import PARTITION_COLUMN, create_partitions_since
+from app.db.types import EnumString
+
+logger = logging.getLogger(__name__)
+
+_COLUMN_TYPE = text(
+    "SELECT data_type, udt_name FROM information_schema.columns "
+    "WHERE table_schema = current_schema() "
+    "AND table_name = :table AND column_name = :column"
+)
+
+# Columns added to existing tables, as (table, column)
+_ADDED_COLUMNS = (
+    ("schedules", "db_type"),
+)
+
+# pg_advisory_xact_lock key, so concurrently starting processes upgrade one
+# at a time and the later ones find nothing left to do
+_UPGRADE_LOCK = 0x64627570
+
+
+async def upgrade_schema(conn: AsyncConnection):
+    """Apply every pending upgrade step (in the caller's transaction)"""
+    if conn.dialect.name != "postgresql":
+        return
+    await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _UPGRADE_LOCK})
+    await conn.run_sync(_enum_columns_to_varchar)
+    await conn.run_sync(_add_columns)
+    await conn.run_sync(_partition_log_tables)
+
+
+def _enum_columns_to_varchar(conn: Connection):
+    """
+    Native ENUM columns (which stored member names, e.g. IN_PROGRESS) become
+    EnumString VARCHARs holding member values (in_progress) with their
+    CHECK constraint; the ENUM types are dropped once no column uses them
+    """
+    native_types: Set[str] = set()
+    for table in Base.metadata.sorted_tables:
+        for column in table.columns:
+            if not isinstance(column.type, EnumString):
+                continue
+            row = conn.execute(_COLUMN_TYPE, {"table": table.name, "column": column.name}).first()
+            if row is None or row.data_type != "USER-DEFINED":
+                continue
+
+            logger.info(f"Converting {table.name}.{column.name} from ENUM {row.udt_name} to VARCHAR")
+            # Every member value is its name in lower case
+            conn.execute(text(
+                f"ALTER TABLE {table.name} ALTER COLUMN {column.name} "
+                f"TYPE VARCHAR({column.type.impl.length}) USING lower({column.name}::text)"
+            ))
+            for constraint in table.constraints:
+                if constraint.info.get("enum_column") == column.name:
+                    conn.execute(AddConstraint(constraint))
+            native_types.add(row.udt_name)
+
+    for type_name in native_types:
+        conn.execute(text(f"DROP TYPE IF EXISTS {type_name}"))
+
+
+def _add_columns(conn: Connection):
+    """Add the _ADDED_COLUMNS an existing table lacks, with their CHECK constraint"""
+    compiler = conn.dialect.ddl_compiler(conn.dialect, None)
+    for table_name, column_name in _ADDED_COLUMNS:
+        exists = conn.execute(text("SELECT to_regclass(:table) IS NOT NULL"), {"table": table_name}).scalar()
+        if not exists:
+            continue
+        if conn.execute(_COLUMN_TYPE, {"table": table_name, "column": column_name}).first() is not None:
+            continue
+
+        table = Base.metadata.tables[table_name]
+        logger.info(f"Adding column {table_name}.{column_name}")
+        conn.execute(text(
+            f"ALTER TABLE {table_name} ADD COLUMN {compiler.get_column_specification(table.c[column_name])}"
+        ))
+        for constraint in table.constraints:
+            if constraint.info.get("enum_column") == column_name:
+                conn.execute(AddConstraint(constraint))
+
+
+def _partition_log_tables(conn: Connection):
+    """Rebuild plain tables whose model is now partitioned by month"""
+    for table in Base.metadata.sorted_tables:
+        if not table.dialect_options["postgresql"]["partition_by"]:
+            continue
+        kind = conn.execute(
+            text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"), {"table": table.name}
+        ).scalar()
+        # 'p' is already partitioned; None means create_all has not run
+        if kind == "r":
+            _partition_table(conn, table)
+
+
+def _partition_table(conn: Connection, table: Table):
+    """
+    Move the plain table aside, create the partitioned one with a partition
+    for every month it has rows for, copy the rows over and drop the old one
+    """
+    legacy = f"{table.name}_unpartitioned"
+    logger.info(f"Partitioning {table.name} by month")
+    conn.execute(text(f"ALTER TABLE {table.name} RENAME TO {legacy}"))
+
+    # Indexes (with the primary key) and the id sequence keep their names
+    # through the rename; free those names for the new table
+    indexes = conn.execute(
+        text("SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND tablename = :table"),
+        {"table": legacy}
+    ).scalars().all()
+    for index in indexes:
+        conn.execute(text(f"ALTER INDEX {index} RENAME TO {index}_unpartitioned"))
+    sequence = conn.execute(text("SELECT pg_get_serial_sequence(:table, 'id')"), {"table": legacy}).scalar()
+    if sequence:
+        conn.execute(text(f"ALTER SEQUENCE {sequence} RENAME TO {sequence.split('.')[-1]}_unpartitioned"))
+
+    # Fires partition_by_month's DEFAULT and current partitions
+    table.create(conn)
+
+    oldest = conn.execute(text(f"SELECT min({PARTITION_COLUMN}) FROM {legacy}")).scalar()
+    if oldest is not None:
+        create_partitions_since(conn, table.name, oldest.astimezone(timezone.utc).date())
+
+    # Columns both versions have; rows without a timestamp get the copy time
+    # (the partition key is part of the primary key, so it cannot be NULL)
+    existing = set(conn.execute(
+        text(
+            "SELECT column_name FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND table_name = :table"
+        ),
+        {"table": legacy}
+    ).scalars())
+    columns = [column.name for column in table.columns if column.name in existing]
+    values = [
+        f"coalesce({name}, now())" if name == PARTITION_COLUMN else name
+        for name in columns
+    ]
+    conn.execute(text(
+        f"INSERT INTO {table.name} ({', '.join(columns)}) SELECT {', '.join(values)} FROM {legacy}"
+    ))
+    if "id" in columns:
+        conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), max(id)) FROM {table.name}"
+        ))
+    conn.execute(text(f"DROP TABLE {legacy}"))
@@ -0,0 +1,127 @@
+"""
+Monthly range partitions for append-only log tables
+"""
+import re
+from datetime import date, datetime, timedelta, timezone
+from typing import List
+
+from sqlalchemy import Table, event, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Partition names are <table>_yYYYYmMM, covering one calendar month (UTC)
+_PARTITION_SUFFIX = re.compile(r"_y(\d{4})m(\d{2})$")
+
+# Range partition key of every monthly-partitioned table
+PARTITION_COLUMN = "created_at"
+
+
+def _next_month(month: date) -> date:
+    return (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _month_start(month: date) -> datetime:
+    return datetime(month.year, month.month, 1, tzinfo=timezone.utc)
+
+
+def _partition_name(table: str, month: date) -> str:
+    return f"{table}_y{month:%Y}m{month:%m}"
+
+
+def _month_partition_ddl(table: str, month: date) -> str:
+    """CREATE TABLE for the partition of the month containing month"""
+    month = month.replace(day=1)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {_partition_name(table, month)} "
+        f"PARTITION OF {table} "
+        f"FOR VALUES FROM ('{month} 00:00:00+00') TO ('{_next_month(month)} 00:00:00+00')"
+    )
+
+
+def create_partitions_since(connection: Connection, table: str, start: date):
+    """Create the partitions from the month containing start through next month"""
+    last = _next_month(datetime.now(timezone.utc).date().replace(day=1))
+    month = start.replace(day=1)
+    while month <= last:
+        connection.execute(text(_month_partition_ddl(table, month)))
+        month = _next_month(month)
+
+
+def _create_partitions(target: Table, connection: Connection, **kw):
+    """DEFAULT partition plus this and next month's, before any row arrives"""
+    if connection.dialect.name != "postgresql":
+        return
+    connection.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {target.name}_default PARTITION OF {target.name} DEFAULT"
+    ))
+    create_partitions_since(connection, target.name, datetime.now(timezone.utc).date())
+
+
+def partition_by_month(table: Table):
+    """
+    Create the DEFAULT partition and this and next month's partitions with
+    the table, so rows land in their month's partition from the first insert
+    (the DEFAULT one only catches months not created yet). The table itself
+    must declare postgresql_partition_by RANGE (created_at).
+    """
+    event.listen(table, "after_create", _create_partitions)
+
+
+async def create_monthly_partitions(db: AsyncSession, table: str, start: date, months: int):
+    """Create the partitions for the month containing start and the following months"""
+    month = start.replace(day=1)
+    for _ in range(months):
+        await _create_month_partition(db, table, month)
+        month = _next_month(month)
+
+
+async def _create_month_partition(db: AsyncSession, table: str, month: date):
+    """
+    PostgreSQL refuses to create a partition whose range already has rows in
+    the DEFAULT partition, so those rows are moved into the new one, with
+    the DEFAULT partition detached for the move
+    """
+    name = _partition_name(table, month)
+    exists = await db.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name})
+    if exists.scalar():
+        return
+
+    in_range = f"{PARTITION_COLUMN} >= :lower AND {PARTITION_COLUMN} < :upper"
+    bounds = {"lower": _month_start(month), "upper": _month_start(_next_month(month))}
+    stranded = await db.execute(
+        text(f"SELECT EXISTS (SELECT 1 FROM {table}_default WHERE {in_range})"), bounds
+    )
+    if not stranded.scalar():
+        await db.execute(text(_month_partition_ddl(table, month)))
+        return
+
+    await db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {table}_default"))
+    await db.execute(text(_month_partition_ddl(table, month)))
+    await db.execute(text(f"INSERT INTO {name} SELECT * FROM {table}_default WHERE {in_range}"), bounds)
+    await db.execute(text(f"DELETE FROM {table}_default WHERE {in_range}"), bounds)
+    await db.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {table}_default DEFAULT"))
+
+
+async def drop_partitions_before(db: AsyncSession, table: str, cutoff: date) -> List[str]:
+    """Drop monthly partitions that end on or before cutoff; returns their names"""
+    result = await db.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :table"
+        ),
+        {"table": table}
+    )
+
+    dropped = []
+    for name in result.scalars():
+        match = _PARTITION_SUFFIX.search(name)
+        if not match:
+            continue
+        month = date(int(match.group(1)), int(match.group(2)), 1)
+        if _next_month(month) <= cutoff:
+            await db.execute(text(f"DROP TABLE IF EXISTS {name}"))
+            dropped.append(name)
+
+    return dropped
@@ -1,18 +1,32 @@
 """
 Database session management
 """
+import orjson
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.pool import NullPool
 
 from app.core.config import settings
 
 # Create async engine
+# Connections are recycled rather than pinged on every checkout, and asyncpg
+# keeps prepared statements per connection so repeated queries skip parsing.
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,
     pool_size=settings.DATABASE_POOL_SIZE,
     max_overflow=settings.DATABASE_MAX_OVERFLOW,
-    pool_pre_ping=True,
+    pool_pre_ping=False,
+    pool_recycle=settings.DATABASE_POOL_RECYCLE,
+    # Room for every distinct statement shape, so none is recompiled
+    query_cache_size=settings.DATABASE_QUERY_CACHE_SIZE,
+    # JSON columns (e.g. audit details) are encoded with orjson
+    json_serializer=lambda obj: orjson.dumps(obj).decode(),
+    json_deserializer=orjson.loads,
+    connect_args={
+        "prepared_statement_cache_size": 256,
+        "statement_cache_size": 256,
+        # Short OLTP queries; JIT compilation only adds latency
+        "server_settings": {"jit": "off"},
+    },
 )
 
 # Create session factory
@@ -0,0 +1,46 @@
+"""
+Custom column types
+"""
+from enum import Enum
+from typing import Optional, Type
+
+from sqlalchemy import CheckConstraint, String
+from sqlalchemy.types import TypeDecorator
+
+
+class EnumString(TypeDecorator):
+    """
+    Store a str Enum as its value in a VARCHAR column.
+
+    Unlike a native ENUM, new members need no ALTER TYPE; pair the column
+    with enum_check() to keep the database-side validation.
+    """
+
+    impl = String
+    cache_ok = True
+
+    def __init__(self, enum_class: Type[Enum], length: int = 20):
+        super().__init__(length)
+        self.enum_class = enum_class
+        # value -> member, so loading a row is a dict lookup rather than Enum()
+        self._members = {member.value: member for member in enum_class}
+
+    def process_bind_param(self, value, dialect) -> Optional[str]:
+        if value is None:
+            return None
+        if isinstance(value, self.enum_class):
+            return value.value
+        if value not in self._members:
+            raise ValueError(f"{value!r} is not a valid {self.enum_class.__name__}")
+        return value
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return self._members[value]
+
+
+def enum_check(column: str, enum_class: Type[Enum]) -> CheckConstraint:
+    """CHECK constraint restricting an EnumString column to the enum's values"""
+    values = ", ".join(f"'{member.value}'" for member in enum_class)
+    return CheckConstraint(f"{column} IN ({values})", name=column, info={"enum_column": column})
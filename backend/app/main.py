@@ -6,13 +6,18 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 
 from app.core.config import settings
 from app.core.logging_config import setup_logging
 from app.api.v1.router import api_router
 from app.db.session import engine
 from app.db.base import Base
+from app.db.migrations import upgrade_schema
+from app.services.websocket import manager
+from app.services.audit import audit_service
+from app.services.notification import NotificationService
+from app.services.storage import get_storage
 from app.middleware.security import (
     SecurityHeadersMiddleware,
     RateLimitMiddleware,
@@ -29,14 +34,29 @@ async def lifespan(app: FastAPI):
     """Application lifespan manager"""
     logger.info("Starting application...")
 
-    # Create database tables
+    # Create database tables (development only; checks every table on start)
+    if settings.AUTO_CREATE_TABLES:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    # Upgrade tables created by earlier releases
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        await upgrade_schema(conn)
+
+    # Relay WebSocket broadcasts between workers
+    await manager.start()
+
+    # Batch audit log writes in the background
+    await audit_service.start()
 
     logger.info("Application started successfully")
     yield
 
     logger.info("Shutting down application...")
+    await manager.stop()
+    await audit_service.stop()
+    await NotificationService.close_connections()
+    await get_storage().close()
     await engine.dispose()
     logger.info("Application shutdown complete")
 
@@ -49,6 +69,7 @@ app = FastAPI(
     docs_url=f"{settings.API_PREFIX}/docs",
     redoc_url=f"{settings.API_PREFIX}/redoc",
     openapi_url=f"{settings.API_PREFIX}/openapi.json",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan,
 )
 
@@ -60,14 +81,16 @@ app.add_middleware(SecurityHeadersMiddleware)
 app.add_middleware(
     AuthRateLimitMiddleware,
     max_attempts=5,          # Max 5 login attempts
-    window_minutes=15        # Within 15 minutes
+    window_minutes=15,       # Within 15 minutes
+    redis_url=settings.REDIS_URL
 )
 
 # General rate limiting - prevents abuse
 app.add_middleware(
     RateLimitMiddleware,
     requests_per_minute=60,  # 60 requests per minute per IP
-    burst=10                 # Allow burst of 10 requests
+    burst=10,                # Allow burst of 10 requests
+    redis_url=settings.REDIS_URL  # Shared across workers
 )
 
 # CORS - allow cross-origin requests from frontend
@@ -79,30 +102,36 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# GZip compression - reduce response sizes
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+# GZip compression - reduce response sizes (responses under one MTU are
+# sent as is, compressing them costs more than it saves)
+app.add_middleware(GZipMiddleware, minimum_size=1500)
+
+
+# Static endpoint bodies, built once from settings
+_HEALTH_BODY = {
+    "status": "healthy",
+    "version": settings.APP_VERSION,
+    "environment": settings.ENVIRONMENT,
+}
+_ROOT_BODY = {
+    "message": "DB Backup & Restore Platform API",
+    "version": settings.APP_VERSION,
+    "docs": f"{settings.API_PREFIX}/docs",
+}
 
 
 # Health check endpoint
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "version": settings.APP_VERSION,
-        "environment": settings.ENVIRONMENT,
-    }
+    return _HEALTH_BODY
 
 
 # Root endpoint
 @app.get("/")
 async def root():
     """Root endpoint"""
-    return {
-        "message": "DB Backup & Restore Platform API",
-        "version": settings.APP_VERSION,
-        "docs": f"{settings.API_PREFIX}/docs",
-    }
+    return _ROOT_BODY
 
 
 # Exception handlers
@@ -110,7 +139,7 @@ async def root():
 async def global_exception_handler(request, exc):
     """Global exception handler"""
     logger.error(f"Unhandled exception: {exc}", exc_info=True)
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={"detail": "Internal server error"},
     )
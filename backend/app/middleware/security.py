@@ -2,239 +2,397 @@
 Security middleware for FastAPI application.
 Implements security headers, rate limiting, and request validation.
 """
-from fastapi import Request, HTTPException, status
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
-from collections import defaultdict
-from datetime import datetime, timedelta
+from fastapi import status
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from collections import OrderedDict
+import logging
+import math
 import time
-from typing import Dict, Tuple
+from typing import Optional, Tuple
+
+import orjson
+import redis.asyncio as aioredis
+
+logger = logging.getLogger(__name__)
+
+# Token bucket kept in a Redis hash; time comes from the Redis server so every
+# worker refills against the same clock. Tokens are returned as a string
+# because Redis truncates Lua numbers to integers.
+_TOKEN_BUCKET_LUA = """
+local burst = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or burst
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + (now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+# Fixed window counter: the first hit in a window starts its expiry
+_WINDOW_COUNTER_LUA = """
+local count = redis.call('INCR', KEYS[1])
+if count == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+return count
+"""
 
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
+# Built once; the CSP is restrictive since this is an API
+_SECURITY_HEADERS = [
+    # Prevent clickjacking
+    (b"x-frame-options", b"DENY"),
+    # Enable XSS protection
+    (b"x-content-type-options", b"nosniff"),
+    (b"x-xss-protection", b"1; mode=block"),
+    # Content Security Policy
+    (
+        b"content-security-policy",
+        b"default-src 'self'; "
+        b"script-src 'self'; "
+        b"style-src 'self' 'unsafe-inline'; "
+        b"img-src 'self' data:; "
+        b"font-src 'self' data:; "
+        b"connect-src 'self'; "
+        b"frame-ancestors 'none'"
+    ),
+    # Referrer Policy
+    (b"referrer-policy", b"strict-origin-when-cross-origin"),
+    # Permissions Policy (formerly Feature Policy)
+    (b"permissions-policy", b"camera=(), microphone=(), geolocation=(), payment=()"),
+    # HSTS (Strict-Transport-Security) - only in production with HTTPS
+    # Uncomment when using HTTPS in production
+    # (b"strict-transport-security", b"max-age=31536000; includeSubDomains"),
+]
+
+
+class SecurityHeadersMiddleware:
     """
     Add security headers to all responses.
     Helps prevent XSS, clickjacking, and other common attacks.
-    """
-
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
 
-        # Prevent clickjacking
-        response.headers["X-Frame-Options"] = "DENY"
+    Plain ASGI middleware: the prebuilt raw headers are appended to the
+    response start message instead of going through a Response object.
+    """
 
-        # Enable XSS protection
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
-        # Content Security Policy (restrictive for API)
-        response.headers["Content-Security-Policy"] = (
-            "default-src 'self'; "
-            "script-src 'self'; "
-            "style-src 'self' 'unsafe-inline'; "
-            "img-src 'self' data:; "
-            "font-src 'self' data:; "
-            "connect-src 'self'; "
-            "frame-ancestors 'none'"
-        )
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        # Referrer Policy
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+        async def send_with_headers(message: Message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), *_SECURITY_HEADERS]
+            await send(message)
 
-        # Permissions Policy (formerly Feature Policy)
-        response.headers["Permissions-Policy"] = (
-            "camera=(), microphone=(), geolocation=(), payment=()"
-        )
+        await self.app(scope, receive, send_with_headers)
 
-        # HSTS (Strict-Transport-Security) - only in production with HTTPS
-        # Uncomment when using HTTPS in production
-        # response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
 
-        return response
+class _ClientStore:
+    """
+    Per-client state split across shards of least-recently-used entries.
 
+    Each shard evicts its own oldest client once it is full, so memory stays
+    bounded under IP churn and no eviction walks the whole store. Reads never
+    create entries. No locks: the middlewares read and write an entry
+    without awaiting in between, so event-loop callers cannot interleave.
+    """
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
+    SHARDS = 16
+
+    def __init__(self, max_entries: int):
+        self._shards = [OrderedDict() for _ in range(self.SHARDS)]
+        self._shard_limit = max(1, max_entries // self.SHARDS)
+
+    def _shard(self, key: str) -> OrderedDict:
+        return self._shards[hash(key) & (self.SHARDS - 1)]
+
+    def get(self, key: str, default=None):
+        """Get a client's entry, marking it most recently used"""
+        shard = self._shard(key)
+        value = shard.get(key, default)
+        if key in shard:
+            shard.move_to_end(key)
+        return value
+
+    def set(self, key: str, value):
+        """Store a client's entry, evicting the shard's oldest if full"""
+        shard = self._shard(key)
+        shard[key] = value
+        shard.move_to_end(key)
+        if len(shard) > self._shard_limit:
+            shard.popitem(last=False)
+
+    def discard(self, key: str):
+        self._shard(key).pop(key, None)
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+
+def _client_ip(scope: Scope, use_real_ip: bool = True) -> str:
+    """Get client IP address from the ASGI scope"""
+    forwarded = real_ip = None
+    for name, value in scope["headers"]:
+        if name == b"x-forwarded-for":
+            forwarded = value
+        elif name == b"x-real-ip":
+            real_ip = value
+
+    # Check X-Forwarded-For header (for proxies)
+    if forwarded:
+        return forwarded.decode("latin-1").split(",")[0].strip()
+
+    # Check X-Real-IP header
+    if use_real_ip and real_ip:
+        return real_ip.decode("latin-1")
+
+    # Fall back to client host
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+async def _send_json(send: Send, status_code: int, content: dict, headers: list):
+    """Send a complete JSON response straight over ASGI"""
+    body = orjson.dumps(content)
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            *headers,
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class RateLimitMiddleware:
     """
-    Simple in-memory rate limiting middleware.
-    For production, consider using Redis-based rate limiting.
+    Rate limiting middleware.
+
+    Token bucket per client IP: the bucket holds up to ``burst`` requests and
+    refills at ``requests_per_minute``. With ``redis_url`` the buckets live in
+    Redis, so the limit holds across all workers; otherwise (or while Redis
+    is unreachable) each process keeps its own buckets in memory.
     """
 
+    # Least recently seen clients are evicted past this many entries
+    max_tracked_clients = 100_000
+
     def __init__(
         self,
         app: ASGIApp,
         requests_per_minute: int = 60,
-        burst: int = 10
+        burst: int = 10,
+        redis_url: Optional[str] = None
     ):
-        super().__init__(app)
+        self.app = app
         self.requests_per_minute = requests_per_minute
         self.burst = burst
-        # Store: {ip: [(timestamp, count)]}
-        self.rate_limit_store: Dict[str, list] = defaultdict(list)
-        self.cleanup_interval = 60  # Cleanup old entries every 60 seconds
-        self.last_cleanup = time.time()
-
-    def _get_client_ip(self, request: Request) -> str:
-        """Get client IP address from request"""
-        # Check X-Forwarded-For header (for proxies)
-        forwarded = request.headers.get("X-Forwarded-For")
-        if forwarded:
-            return forwarded.split(",")[0].strip()
-
-        # Check X-Real-IP header
-        real_ip = request.headers.get("X-Real-IP")
-        if real_ip:
-            return real_ip
-
-        # Fall back to client host
-        return request.client.host if request.client else "unknown"
-
-    def _cleanup_old_entries(self):
-        """Remove entries older than 1 minute"""
-        if time.time() - self.last_cleanup < self.cleanup_interval:
-            return
-
-        cutoff = datetime.now() - timedelta(minutes=1)
-        for ip in list(self.rate_limit_store.keys()):
-            self.rate_limit_store[ip] = [
-                (ts, count) for ts, count in self.rate_limit_store[ip]
-                if ts > cutoff
-            ]
-            if not self.rate_limit_store[ip]:
-                del self.rate_limit_store[ip]
-
-        self.last_cleanup = time.time()
-
-    def _is_rate_limited(self, ip: str) -> Tuple[bool, int, int]:
+        self.refill_rate = requests_per_minute / 60.0
+        # Store: {ip: (tokens, last_refill)}
+        self.rate_limit_store = _ClientStore(self.max_tracked_clients)
+        self._script = None
+        if redis_url:
+            self._script = aioredis.from_url(redis_url).register_script(_TOKEN_BUCKET_LUA)
+
+    def _take_token(self, ip: str) -> Tuple[bool, float]:
         """
-        Check if IP is rate limited.
-        Returns: (is_limited, current_count, limit)
+        Take a token from the IP's bucket.
+        Returns: (is_limited, tokens_left)
         """
-        self._cleanup_old_entries()
+        now = time.monotonic()
+        tokens, last = self.rate_limit_store.get(ip, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last) * self.refill_rate)
 
-        now = datetime.now()
-        minute_ago = now - timedelta(minutes=1)
+        is_limited = tokens < 1
+        if not is_limited:
+            tokens -= 1
 
-        # Get requests in last minute
-        recent_requests = [
-            count for ts, count in self.rate_limit_store[ip]
-            if ts > minute_ago
-        ]
+        self.rate_limit_store.set(ip, (tokens, now))
+
+        return is_limited, tokens
 
-        current_count = sum(recent_requests)
+    async def _take_token_shared(self, ip: str) -> Tuple[bool, float]:
+        """Take a token from the IP's bucket in Redis, falling back to memory"""
+        if self._script is None:
+            return self._take_token(ip)
 
-        # Check if over limit
-        if current_count >= self.requests_per_minute:
-            return True, current_count, self.requests_per_minute
+        try:
+            allowed, tokens = await self._script(
+                keys=[f"ratelimit:{ip}"],
+                args=[self.burst, self.refill_rate]
+            )
+            return not allowed, float(tokens)
+        except Exception as e:
+            logger.warning(f"Redis rate limiting unavailable, using local limits: {e}")
+            return self._take_token(ip)
 
-        return False, current_count, self.requests_per_minute
+    def _seconds_until_token(self, tokens: float) -> int:
+        """Seconds until the bucket holds a whole token again"""
+        return max(1, math.ceil((1 - tokens) / self.refill_rate))
 
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         # Skip rate limiting for health checks
-        if request.url.path == "/health":
-            return await call_next(request)
+        if scope["type"] != "http" or scope["path"] == "/health":
+            await self.app(scope, receive, send)
+            return
 
-        ip = self._get_client_ip(request)
+        ip = _client_ip(scope)
 
         # Check rate limit
-        is_limited, current_count, limit = self._is_rate_limited(ip)
+        is_limited, tokens = await self._take_token_shared(ip)
+        limit = str(self.requests_per_minute).encode()
 
         if is_limited:
-            return JSONResponse(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                content={
+            retry_after = self._seconds_until_token(tokens)
+            await _send_json(
+                send,
+                status.HTTP_429_TOO_MANY_REQUESTS,
+                {
                     "detail": "Too many requests. Please try again later.",
-                    "retry_after": 60
+                    "retry_after": retry_after
                 },
-                headers={
-                    "Retry-After": "60",
-                    "X-RateLimit-Limit": str(limit),
-                    "X-RateLimit-Remaining": "0",
-                    "X-RateLimit-Reset": str(int(time.time()) + 60)
-                }
+                [
+                    (b"retry-after", str(retry_after).encode()),
+                    (b"x-ratelimit-limit", limit),
+                    (b"x-ratelimit-remaining", b"0"),
+                    (b"x-ratelimit-reset", str(int(time.time()) + retry_after).encode()),
+                ]
             )
-
-        # Record this request
-        self.rate_limit_store[ip].append((datetime.now(), 1))
-
-        # Process request
-        response = await call_next(request)
+            return
 
         # Add rate limit headers to response
-        remaining = max(0, limit - current_count - 1)
-        response.headers["X-RateLimit-Limit"] = str(limit)
-        response.headers["X-RateLimit-Remaining"] = str(remaining)
-        response.headers["X-RateLimit-Reset"] = str(int(time.time()) + 60)
+        rate_limit_headers = [
+            (b"x-ratelimit-limit", limit),
+            (b"x-ratelimit-remaining", str(int(tokens)).encode()),
+            (b"x-ratelimit-reset", str(int(time.time()) + self._seconds_until_token(tokens)).encode()),
+        ]
 
-        return response
+        async def send_with_headers(message: Message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), *rate_limit_headers]
+            await send(message)
 
+        await self.app(scope, receive, send_with_headers)
 
-class AuthRateLimitMiddleware(BaseHTTPMiddleware):
+
+class AuthRateLimitMiddleware:
     """
     Stricter rate limiting specifically for authentication endpoints.
     Prevents brute force attacks.
+
+    Attempts are counted in fixed windows, in Redis when ``redis_url`` is
+    given and in process memory otherwise.
     """
 
+    # Least recently seen clients are evicted past this many entries
+    max_tracked_clients = 100_000
+
+    _auth_prefixes = ("/api/v1/auth/login", "/api/v1/auth/register", "/api/v1/auth/reset-password")
+
     def __init__(
         self,
         app: ASGIApp,
         max_attempts: int = 5,
-        window_minutes: int = 15
+        window_minutes: int = 15,
+        redis_url: Optional[str] = None
     ):
-        super().__init__(app)
+        self.app = app
         self.max_attempts = max_attempts
         self.window_minutes = window_minutes
-        # Store: {ip: [(timestamp, path)]}
-        self.attempt_store: Dict[str, list] = defaultdict(list)
-
-    def _get_client_ip(self, request: Request) -> str:
-        """Get client IP address from request"""
-        forwarded = request.headers.get("X-Forwarded-For")
-        if forwarded:
-            return forwarded.split(",")[0].strip()
-        return request.client.host if request.client else "unknown"
+        self.window_seconds = window_minutes * 60
+        # Store: {ip: (attempts, window_start)}
+        self.attempt_store = _ClientStore(self.max_tracked_clients)
+        self._redis = None
+        self._script = None
+        if redis_url:
+            self._redis = aioredis.from_url(redis_url)
+            self._script = self._redis.register_script(_WINDOW_COUNTER_LUA)
 
     def _is_auth_endpoint(self, path: str) -> bool:
         """Check if path is an authentication endpoint"""
-        auth_paths = ["/api/v1/auth/login", "/api/v1/auth/register", "/api/v1/auth/reset-password"]
-        return any(path.startswith(p) for p in auth_paths)
+        return path.startswith(self._auth_prefixes)
 
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         # Only apply to auth endpoints
-        if not self._is_auth_endpoint(request.url.path):
-            return await call_next(request)
-
-        ip = self._get_client_ip(request)
-        now = datetime.now()
-        window_start = now - timedelta(minutes=self.window_minutes)
-
-        # Clean old attempts
-        self.attempt_store[ip] = [
-            (ts, path) for ts, path in self.attempt_store[ip]
-            if ts > window_start
-        ]
+        if scope["type"] != "http" or not self._is_auth_endpoint(scope["path"]):
+            await self.app(scope, receive, send)
+            return
 
-        # Count recent auth attempts
-        recent_attempts = len(self.attempt_store[ip])
+        ip = _client_ip(scope, use_real_ip=False)
 
-        if recent_attempts >= self.max_attempts:
-            return JSONResponse(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                content={
+        if not await self._record_attempt(ip):
+            await _send_json(
+                send,
+                status.HTTP_429_TOO_MANY_REQUESTS,
+                {
                     "detail": f"Too many authentication attempts. Please try again in {self.window_minutes} minutes.",
-                    "retry_after": self.window_minutes * 60
+                    "retry_after": self.window_seconds
                 },
-                headers={"Retry-After": str(self.window_minutes * 60)}
+                [(b"retry-after", str(self.window_seconds).encode())]
             )
+            return
 
-        # Record this attempt
-        self.attempt_store[ip].append((now, request.url.path))
+        response_status = None
+
+        async def send_and_capture_status(message: Message):
+            nonlocal response_status
+            if message["type"] == "http.response.start":
+                response_status = message["status"]
+            await send(message)
 
         # Process request
-        response = await call_next(request)
+        await self.app(scope, receive, send_and_capture_status)
 
         # If auth was successful (200 or 201), clear the counter
-        if response.status_code in [200, 201]:
-            self.attempt_store[ip] = []
+        if response_status in (200, 201):
+            await self._clear_attempts(ip)
+
+    async def _record_attempt(self, ip: str) -> bool:
+        """Count an attempt; False if the IP is over the limit"""
+        if self._script is not None:
+            try:
+                attempts = await self._script(
+                    keys=[f"authlimit:{ip}"],
+                    args=[self.window_seconds]
+                )
+                return attempts <= self.max_attempts
+            except Exception as e:
+                logger.warning(f"Redis auth rate limiting unavailable, using local limits: {e}")
+
+        now = time.monotonic()
+
+        # Fixed window counter; start a new window once the old one expires
+        attempts, window_start = self.attempt_store.get(ip, (0, now))
+        if now - window_start >= self.window_seconds:
+            attempts, window_start = 0, now
+
+        if attempts >= self.max_attempts:
+            return False
 
-        return response
+        # Record this attempt
+        self.attempt_store.set(ip, (attempts + 1, window_start))
+        return True
+
+    async def _clear_attempts(self, ip: str):
+        """Reset the IP's attempt counter"""
+        self.attempt_store.discard(ip)
+        if self._redis is not None:
+            try:
+                await self._redis.delete(f"authlimit:{ip}")
+            except Exception as e:
+                logger.warning(f"Failed to reset auth rate limit in Redis: {e}")
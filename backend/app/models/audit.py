@@ -2,12 +2,14 @@
 Audit logging models
 """
 from datetime import datetime
+from typing import Optional
 from enum import Enum
-from sqlalchemy import String, DateTime, Enum as SQLEnum, Text, Integer, JSON
+from sqlalchemy import String, DateTime, Text, Integer, JSON
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
 
-from app.db.base import Base
+from app.db.base import Base, utcnow
+from app.db.types import EnumString, enum_check
 
 
 class AuditAction(str, Enum):
@@ -56,19 +58,22 @@ class AuditLog(Base):
     __tablename__ = "audit_logs"
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    user_id: Mapped[int] = mapped_column(Integer, nullable=True, index=True)
-    username: Mapped[str] = mapped_column(String(50), nullable=True)
-    action: Mapped[AuditAction] = mapped_column(SQLEnum(AuditAction), index=True)
-    resource_type: Mapped[ResourceType] = mapped_column(
-        SQLEnum(ResourceType),
-        nullable=True
-    )
-    resource_id: Mapped[int] = mapped_column(Integer, nullable=True, index=True)
-    details: Mapped[dict] = mapped_column(JSON, nullable=True)
-    ip_address: Mapped[str] = mapped_column(String(45), nullable=True)  # IPv6 compatible
-    user_agent: Mapped[str] = mapped_column(String(255), nullable=True)
+    user_id: Mapped[Optional[int]] = mapped_column(Integer, index=True)
+    username: Mapped[Optional[str]] = mapped_column(String(50))
+    action: Mapped[AuditAction] = mapped_column(EnumString(AuditAction), index=True)
+    resource_type: Mapped[Optional[ResourceType]] = mapped_column(EnumString(ResourceType))
+    resource_id: Mapped[Optional[int]] = mapped_column(Integer, index=True)
+    details: Mapped[Optional[dict]] = mapped_column(JSON)
+    ip_address: Mapped[Optional[str]] = mapped_column(String(45))  # IPv6 compatible
+    user_agent: Mapped[Optional[str]] = mapped_column(String(255))
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
+        default=utcnow,
         server_default=func.now(),
         index=True
     )
+
+    __table_args__ = (
+        enum_check("action", AuditAction),
+        enum_check("resource_type", ResourceType),
+    )
@@ -2,12 +2,14 @@
 Backup management models
 """
 from datetime import datetime
+from typing import Optional
 from enum import Enum
-from sqlalchemy import String, DateTime, Enum as SQLEnum, Text, Integer, BigInteger, Boolean, ForeignKey
+from sqlalchemy import String, DateTime, Text, Integer, BigInteger, Boolean, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
 from app.db.base import Base
+from app.db.types import EnumString, enum_check
 
 
 class DatabaseType(str, Enum):
@@ -35,7 +37,7 @@ class BackupStatus(str, Enum):
 
 
 class CompressionType(str, Enum):
-    """Compression algorithms"""
+    """Compression algorithms (zstd recommended; gzip/lz4 kept for compatibility)"""
     NONE = "none"
     GZIP = "gzip"
     LZ4 = "lz4"
@@ -51,20 +53,20 @@ class Backup(Base):
 
     # Backup details
     database_name: Mapped[str] = mapped_column(String(100))
-    db_type: Mapped[DatabaseType] = mapped_column(SQLEnum(DatabaseType))
+    db_type: Mapped[DatabaseType] = mapped_column(EnumString(DatabaseType))
     backup_type: Mapped[BackupType] = mapped_column(
-        SQLEnum(BackupType),
+        EnumString(BackupType),
         default=BackupType.FULL
     )
     status: Mapped[BackupStatus] = mapped_column(
-        SQLEnum(BackupStatus),
+        EnumString(BackupStatus),
         default=BackupStatus.PENDING
     )
 
     # Storage
     storage_path: Mapped[str] = mapped_column(String(500))  # S3 key or local path
-    size_bytes: Mapped[int] = mapped_column(BigInteger, nullable=True)
-    checksum: Mapped[str] = mapped_column(String(128), nullable=True)  # SHA-256
+    size_bytes: Mapped[Optional[int]] = mapped_column(BigInteger)
+    checksum: Mapped[Optional[str]] = mapped_column(String(128))  # "<algorithm>:<hex digest>"
 
     # Security
     is_encrypted: Mapped[bool] = mapped_column(Boolean, default=True)
@@ -74,38 +76,26 @@ class Backup(Base):
     )
     is_compressed: Mapped[bool] = mapped_column(Boolean, default=True)
     compression_type: Mapped[CompressionType] = mapped_column(
-        SQLEnum(CompressionType),
-        default=CompressionType.GZIP
+        EnumString(CompressionType),
+        default=CompressionType.ZSTD
     )
 
     # Timing
-    started_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True),
-        nullable=True
-    )
-    completed_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True),
-        nullable=True
-    )
-    duration_seconds: Mapped[int] = mapped_column(Integer, nullable=True)
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    duration_seconds: Mapped[Optional[int]] = mapped_column(Integer)
 
     # Error handling
-    error_message: Mapped[str] = mapped_column(Text, nullable=True)
+    error_message: Mapped[Optional[str]] = mapped_column(Text)
     retry_count: Mapped[int] = mapped_column(Integer, default=0)
 
     # Metadata
-    parent_backup_id: Mapped[int] = mapped_column(
-        ForeignKey("backups.id"),
-        nullable=True
-    )  # For incremental/differential
+    parent_backup_id: Mapped[Optional[int]] = mapped_column(ForeignKey("backups.id"))  # For incremental/differential
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         server_default=func.now()
     )
-    deleted_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True),
-        nullable=True
-    )
+    deleted_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
 
     # Relationships
     server: Mapped["Server"] = relationship("Server", back_populates="backups")
@@ -115,6 +105,13 @@ class Backup(Base):
         cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        enum_check("db_type", DatabaseType),
+        enum_check("backup_type", BackupType),
+        enum_check("status", BackupStatus),
+        enum_check("compression_type", CompressionType),
+    )
+
 
 class BackupMetadata(Base):
     """Backup metadata (key-value pairs)"""
@@ -130,4 +127,4 @@ class BackupMetadata(Base):
     )
 
     # Relationships
-    backup: Mapped["Backup"] = relationship("Backup", back_populates="metadata_entries")
+    backup: Mapped[Backup] = relationship(Backup, back_populates="metadata_entries")
@@ -2,12 +2,16 @@
 Command automation models
 """
 from datetime import datetime
+from typing import Optional
 from enum import Enum
-from sqlalchemy import String, DateTime, Enum as SQLEnum, Text, Integer, Boolean, ForeignKey
+from sqlalchemy import String, DateTime, Text, Integer, Boolean, Computed, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
-from app.db.base import Base
+from app.db.base import Base, utcnow
+from app.db.partitions import partition_by_month
+from app.db.types import EnumString, enum_check
 
 
 class CommandType(str, Enum):
@@ -32,12 +36,12 @@ class Command(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String(100), index=True)
-    description: Mapped[str] = mapped_column(Text, nullable=True)
+    description: Mapped[Optional[str]] = mapped_column(Text)
     command_template: Mapped[str] = mapped_column(Text)
-    type: Mapped[CommandType] = mapped_column(SQLEnum(CommandType))
+    type: Mapped[CommandType] = mapped_column(EnumString(CommandType))
 
     # Metadata
-    tags: Mapped[str] = mapped_column(String(255), nullable=True)
+    tags: Mapped[Optional[list[str]]] = mapped_column(ARRAY(String(50)))  # filter with tags.overlap([...])
     is_favorite: Mapped[bool] = mapped_column(Boolean, default=False)
     created_by_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
     created_at: Mapped[datetime] = mapped_column(
@@ -59,7 +63,13 @@ class Command(Base):
     executions: Mapped[list["CommandExecution"]] = relationship(
         "CommandExecution",
         back_populates="command",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        lazy="raise_on_sql"
+    )
+
+    __table_args__ = (
+        enum_check("type", CommandType),
+        Index("ix_commands_tags", "tags", postgresql_using="gin"),
     )
 
 
@@ -67,43 +77,66 @@ class CommandExecution(Base):
     """Command execution history"""
     __tablename__ = "command_executions"
 
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    command_id: Mapped[int] = mapped_column(ForeignKey("commands.id"), index=True)
-    server_id: Mapped[int] = mapped_column(ForeignKey("servers.id"), index=True)
+    # Composite key: a partitioned table's primary key must include created_at
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    command_id: Mapped[int] = mapped_column(ForeignKey("commands.id"))
+    server_id: Mapped[int] = mapped_column(ForeignKey("servers.id"))
 
     # Execution details
     command_text: Mapped[str] = mapped_column(Text)  # Rendered command with variables
     status: Mapped[CommandStatus] = mapped_column(
-        SQLEnum(CommandStatus),
+        EnumString(CommandStatus),
         default=CommandStatus.PENDING
     )
-    exit_code: Mapped[int] = mapped_column(Integer, nullable=True)
-    stdout: Mapped[str] = mapped_column(Text, nullable=True)
-    stderr: Mapped[str] = mapped_column(Text, nullable=True)
+    exit_code: Mapped[Optional[int]] = mapped_column(Integer)
+    # Output can be large; not loaded until accessed or undefer_group("payload")
+    stdout: Mapped[Optional[str]] = mapped_column(Text, deferred=True, deferred_group="payload")
+    stderr: Mapped[Optional[str]] = mapped_column(Text, deferred=True, deferred_group="payload")
 
     # Timing
-    started_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True),
-        nullable=True
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    # Maintained by the database from started_at/completed_at
+    duration_seconds: Mapped[Optional[int]] = mapped_column(
+        Integer,
+        Computed("EXTRACT(EPOCH FROM (completed_at - started_at))::int", persisted=True)
     )
-    completed_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True),
-        nullable=True
-    )
-    duration_seconds: Mapped[int] = mapped_column(Integer, nullable=True)
 
     # Metadata
     executed_by_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
+        primary_key=True,
+        default=utcnow,
         server_default=func.now()
     )
 
-    # Relationships
-    command: Mapped["Command"] = relationship("Command", back_populates="executions")
-    server: Mapped["Server"] = relationship("Server", back_populates="command_executions")
+    # Relationships (parents are batch-loaded with one IN query per table)
+    command: Mapped[Command] = relationship(
+        Command,
+        back_populates="executions",
+        lazy="selectin"
+    )
+    server: Mapped["Server"] = relationship(
+        "Server",
+        back_populates="command_executions",
+        lazy="selectin"
+    )
     executor: Mapped["User"] = relationship(
         "User",
         back_populates="command_executions",
-        foreign_keys=[executed_by_id]
+        foreign_keys=[executed_by_id],
+        lazy="selectin"
     )
+
+    __table_args__ = (
+        enum_check("status", CommandStatus),
+        # Execution history per server / per command, newest first
+        Index("ix_command_executions_server_created", "server_id", "created_at"),
+        Index("ix_command_executions_command_created", "command_id", "created_at"),
+        # Monthly partitions (app.db.partitions); pruning drops whole months
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+
+partition_by_month(CommandExecution.__table__)
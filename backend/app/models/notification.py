@@ -2,12 +2,15 @@
 Notification models
 """
 from datetime import datetime
+from typing import Optional
 from enum import Enum
-from sqlalchemy import String, DateTime, Enum as SQLEnum, Text, Boolean
+from sqlalchemy import String, DateTime, Text, Boolean, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
-from app.db.base import Base
+from app.db.base import Base, utcnow
+from app.db.partitions import partition_by_month
+from app.db.types import EnumString, enum_check
 
 
 class NotificationType(str, Enum):
@@ -41,8 +44,12 @@ class NotificationChannel(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String(100), index=True)
-    type: Mapped[NotificationType] = mapped_column(SQLEnum(NotificationType))
-    config_encrypted: Mapped[str] = mapped_column(Text)  # Encrypted configuration
+    type: Mapped[NotificationType] = mapped_column(EnumString(NotificationType))
+    config_encrypted: Mapped[str] = mapped_column(
+        Text,
+        deferred=True,
+        deferred_group="payload"
+    )  # Encrypted configuration
     is_enabled: Mapped[bool] = mapped_column(Boolean, default=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
@@ -61,35 +68,49 @@ class NotificationChannel(Base):
         cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        enum_check("type", NotificationType),
+    )
+
 
 class Notification(Base):
     """Notification log"""
     __tablename__ = "notifications"
 
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    channel_id: Mapped[int] = mapped_column(index=True)
-    event_type: Mapped[NotificationEvent] = mapped_column(
-        SQLEnum(NotificationEvent),
-        index=True
-    )
+    # Composite key: a partitioned table's primary key must include created_at
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    channel_id: Mapped[int] = mapped_column(ForeignKey("notification_channels.id"))
+    event_type: Mapped[NotificationEvent] = mapped_column(EnumString(NotificationEvent))
     subject: Mapped[str] = mapped_column(String(255))
-    message: Mapped[str] = mapped_column(Text)
+    message: Mapped[str] = mapped_column(Text, deferred=True, deferred_group="payload")
     status: Mapped[NotificationStatus] = mapped_column(
-        SQLEnum(NotificationStatus),
+        EnumString(NotificationStatus),
         default=NotificationStatus.PENDING
     )
-    error_message: Mapped[str] = mapped_column(Text, nullable=True)
-    sent_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True),
-        nullable=True
-    )
+    error_message: Mapped[Optional[str]] = mapped_column(Text, deferred=True, deferred_group="payload")
+    sent_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
+        primary_key=True,
+        default=utcnow,
         server_default=func.now()
     )
 
     # Relationships
-    channel: Mapped["NotificationChannel"] = relationship(
-        "NotificationChannel",
+    channel: Mapped[NotificationChannel] = relationship(
+        NotificationChannel,
         back_populates="notifications"
     )
+
+    __table_args__ = (
+        enum_check("event_type", NotificationEvent),
+        enum_check("status", NotificationStatus),
+        # Notification log per channel / per event type, newest first
+        Index("ix_notifications_channel_created", "channel_id", "created_at"),
+        Index("ix_notifications_event_created", "event_type", "created_at"),
+        # Monthly partitions (app.db.partitions); pruning drops whole months
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+
+partition_by_month(Notification.__table__)
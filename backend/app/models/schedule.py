@@ -2,13 +2,16 @@
 Scheduling and retention policy models
 """
 from datetime import datetime
-from sqlalchemy import String, DateTime, Text, Integer, Boolean, ForeignKey, JSON
+from typing import Optional
+from sqlalchemy import String, DateTime, Text, Integer, Boolean, ForeignKey, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
-from sqlalchemy import Enum as SQLEnum
 from enum import Enum
 
 from app.db.base import Base
+from app.db.types import EnumString, enum_check
+from app.models.backup import DatabaseType
 
 
 class BackupType(str, Enum):
@@ -24,31 +27,33 @@ class Schedule(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String(100), index=True)
-    description: Mapped[str] = mapped_column(Text, nullable=True)
+    description: Mapped[Optional[str]] = mapped_column(Text)
 
     # Target
     server_id: Mapped[int] = mapped_column(ForeignKey("servers.id"), index=True)
     database_name: Mapped[str] = mapped_column(String(100))
+    db_type: Mapped[DatabaseType] = mapped_column(
+        EnumString(DatabaseType),
+        default=DatabaseType.POSTGRESQL,
+        server_default=DatabaseType.POSTGRESQL.value
+    )
 
     # Schedule
     cron_expression: Mapped[str] = mapped_column(String(100))
     timezone: Mapped[str] = mapped_column(String(50), default="UTC")
     backup_type: Mapped[BackupType] = mapped_column(
-        SQLEnum(BackupType),
+        EnumString(BackupType),
         default=BackupType.FULL
     )
 
     # Retention
-    retention_policy_id: Mapped[int] = mapped_column(
-        ForeignKey("retention_policies.id"),
-        nullable=True
-    )
+    retention_policy_id: Mapped[Optional[int]] = mapped_column(ForeignKey("retention_policies.id"))
 
     # Settings
     enabled: Mapped[bool] = mapped_column(Boolean, default=True)
     notify_on_success: Mapped[bool] = mapped_column(Boolean, default=False)
     notify_on_failure: Mapped[bool] = mapped_column(Boolean, default=True)
-    notification_channels: Mapped[dict] = mapped_column(JSON, nullable=True)
+    notification_channels: Mapped[Optional[dict]] = mapped_column(JSONB)
 
     # Metadata
     created_at: Mapped[datetime] = mapped_column(
@@ -60,14 +65,8 @@ class Schedule(Base):
         server_default=func.now(),
         onupdate=func.now()
     )
-    last_run: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True),
-        nullable=True
-    )
-    next_run: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True),
-        nullable=True
-    )
+    last_run: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    next_run: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
 
     # Relationships
     server: Mapped["Server"] = relationship("Server", back_populates="schedules")
@@ -76,6 +75,16 @@ class Schedule(Base):
         back_populates="schedules"
     )
 
+    __table_args__ = (
+        enum_check("db_type", DatabaseType),
+        enum_check("backup_type", BackupType),
+        # Due-schedule scan run by the beat every minute; disabled schedules
+        # are left out of the index entirely
+        Index("ix_schedules_due", "next_run", postgresql_where=text("enabled = true")),
+        # Schedules notifying a given channel
+        Index("ix_schedules_notification_channels", "notification_channels", postgresql_using="gin"),
+    )
+
 
 class RetentionPolicy(Base):
     """Retention policy model"""
@@ -83,14 +92,14 @@ class RetentionPolicy(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String(100), unique=True, index=True)
-    description: Mapped[str] = mapped_column(Text, nullable=True)
+    description: Mapped[Optional[str]] = mapped_column(Text)
 
     # Retention rules
-    keep_last_n: Mapped[int] = mapped_column(Integer, nullable=True)  # Keep last N backups
-    keep_days: Mapped[int] = mapped_column(Integer, nullable=True)  # Keep for N days
-    keep_daily: Mapped[int] = mapped_column(Integer, nullable=True)  # Keep N daily backups
-    keep_weekly: Mapped[int] = mapped_column(Integer, nullable=True)  # Keep N weekly backups
-    keep_monthly: Mapped[int] = mapped_column(Integer, nullable=True)  # Keep N monthly backups
+    keep_last_n: Mapped[Optional[int]] = mapped_column(Integer)  # Keep last N backups
+    keep_days: Mapped[Optional[int]] = mapped_column(Integer)  # Keep for N days
+    keep_daily: Mapped[Optional[int]] = mapped_column(Integer)  # Keep N daily backups
+    keep_weekly: Mapped[Optional[int]] = mapped_column(Integer)  # Keep N weekly backups
+    keep_monthly: Mapped[Optional[int]] = mapped_column(Integer)  # Keep N monthly backups
 
     # Metadata
     created_at: Mapped[datetime] = mapped_column(
@@ -104,7 +113,7 @@ class RetentionPolicy(Base):
     )
 
     # Relationships
-    schedules: Mapped[list["Schedule"]] = relationship(
-        "Schedule",
+    schedules: Mapped[list[Schedule]] = relationship(
+        Schedule,
         back_populates="retention_policy"
     )
@@ -2,13 +2,16 @@
 Server management models
 """
 from datetime import datetime
+from typing import Optional
 from enum import Enum
-from sqlalchemy import String, DateTime, Enum as SQLEnum, Text, Integer, JSON, Boolean
+from sqlalchemy import String, DateTime, Text, Integer, Boolean, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
-from sqlalchemy import ForeignKey, Table, Column
+from sqlalchemy import ForeignKey
 
 from app.db.base import Base
+from app.db.types import EnumString, enum_check
 
 
 class ServerType(str, Enum):
@@ -40,34 +43,35 @@ class Server(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String(100), unique=True, index=True)
-    description: Mapped[str] = mapped_column(Text, nullable=True)
-    type: Mapped[ServerType] = mapped_column(SQLEnum(ServerType))
+    description: Mapped[Optional[str]] = mapped_column(Text)
+    type: Mapped[ServerType] = mapped_column(EnumString(ServerType))
     environment: Mapped[ServerEnvironment] = mapped_column(
-        SQLEnum(ServerEnvironment),
+        EnumString(ServerEnvironment),
         default=ServerEnvironment.DEVELOPMENT
     )
 
     # Connection details
     host: Mapped[str] = mapped_column(String(255))
-    port: Mapped[int] = mapped_column(Integer, nullable=True)
-    credentials_encrypted: Mapped[str] = mapped_column(Text)  # Encrypted JSON
+    port: Mapped[Optional[int]] = mapped_column(Integer)
+    credentials_encrypted: Mapped[str] = mapped_column(
+        Text,
+        deferred=True,
+        deferred_group="payload"
+    )  # Encrypted JSON; undefer where a connection is opened
 
     # Health monitoring
     health_status: Mapped[HealthStatus] = mapped_column(
-        SQLEnum(HealthStatus),
+        EnumString(HealthStatus),
         default=HealthStatus.UNKNOWN
     )
-    last_heartbeat: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True),
-        nullable=True
-    )
+    last_heartbeat: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     heartbeat_interval: Mapped[int] = mapped_column(
         Integer,
         default=60  # seconds
     )
 
     # Metadata
-    tags: Mapped[dict] = mapped_column(JSON, nullable=True)
+    tags: Mapped[Optional[dict]] = mapped_column(JSONB)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
@@ -79,20 +83,38 @@ class Server(Base):
         onupdate=func.now()
     )
 
-    # Relationships
+    # Relationships (collections can grow large; load them explicitly with
+    # selectinload() where needed)
     backups: Mapped[list["Backup"]] = relationship(
         "Backup",
         back_populates="server",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        lazy="raise_on_sql"
     )
     schedules: Mapped[list["Schedule"]] = relationship(
         "Schedule",
         back_populates="server",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        lazy="raise_on_sql"
     )
     command_executions: Mapped[list["CommandExecution"]] = relationship(
         "CommandExecution",
-        back_populates="server"
+        back_populates="server",
+        lazy="raise_on_sql"
+    )
+    groups: Mapped[list["ServerGroup"]] = relationship(
+        "ServerGroup",
+        secondary="server_group_members",
+        back_populates="servers",
+        lazy="raise_on_sql"
+    )
+
+    __table_args__ = (
+        enum_check("type", ServerType),
+        enum_check("environment", ServerEnvironment),
+        enum_check("health_status", HealthStatus),
+        # Tag containment filters (tags @> '{"env": "prod"}')
+        Index("ix_servers_tags", "tags", postgresql_using="gin"),
     )
 
 
@@ -102,29 +124,27 @@ class ServerGroup(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String(100), unique=True, index=True)
-    description: Mapped[str] = mapped_column(Text, nullable=True)
+    description: Mapped[Optional[str]] = mapped_column(Text)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         server_default=func.now()
     )
 
-
-# Association table for many-to-many relationship
-server_group_members = Table(
-    "server_group_members",
-    Base.metadata,
-    Column("server_id", Integer, ForeignKey("servers.id"), primary_key=True),
-    Column("group_id", Integer, ForeignKey("server_groups.id"), primary_key=True),
-)
+    # Relationships
+    servers: Mapped[list[Server]] = relationship(
+        Server,
+        secondary="server_group_members",
+        back_populates="groups",
+        lazy="raise_on_sql"
+    )
 
 
 class ServerGroupMember(Base):
-    """Server group membership (if you need additional fields)"""
-    __tablename__ = "server_group_members_extended"
+    """Server group membership (association table for Server.groups)"""
+    __tablename__ = "server_group_members"
 
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    server_id: Mapped[int] = mapped_column(ForeignKey("servers.id"))
-    group_id: Mapped[int] = mapped_column(ForeignKey("server_groups.id"))
+    server_id: Mapped[int] = mapped_column(ForeignKey("servers.id"), primary_key=True)
+    group_id: Mapped[int] = mapped_column(ForeignKey("server_groups.id"), primary_key=True, index=True)
     added_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         server_default=func.now()
@@ -2,12 +2,14 @@
 User and authentication models
 """
 from datetime import datetime
+from typing import Optional
 from enum import Enum
-from sqlalchemy import String, DateTime, Enum as SQLEnum, Text, Boolean
+from sqlalchemy import String, DateTime, Text, Boolean, ForeignKey, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
 from app.db.base import Base
+from app.db.types import EnumString, enum_check
 
 
 class UserRole(str, Enum):
@@ -24,10 +26,10 @@ class User(Base):
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     username: Mapped[str] = mapped_column(String(50), unique=True, index=True)
     email: Mapped[str] = mapped_column(String(100), unique=True, index=True)
-    full_name: Mapped[str] = mapped_column(String(100), nullable=True)
+    full_name: Mapped[Optional[str]] = mapped_column(String(100))
     password_hash: Mapped[str] = mapped_column(String(255))
     role: Mapped[UserRole] = mapped_column(
-        SQLEnum(UserRole),
+        EnumString(UserRole),
         default=UserRole.VIEWER,
         nullable=False
     )
@@ -41,10 +43,7 @@ class User(Base):
         server_default=func.now(),
         onupdate=func.now()
     )
-    last_login: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True),
-        nullable=True
-    )
+    last_login: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
 
     # Relationships
     api_keys: Mapped[list["APIKey"]] = relationship(
@@ -55,12 +54,18 @@ class User(Base):
     commands: Mapped[list["Command"]] = relationship(
         "Command",
         back_populates="creator",
-        foreign_keys="Command.created_by_id"
+        foreign_keys="Command.created_by_id",
+        lazy="raise_on_sql"
     )
     command_executions: Mapped[list["CommandExecution"]] = relationship(
         "CommandExecution",
         back_populates="executor",
-        foreign_keys="CommandExecution.executed_by_id"
+        foreign_keys="CommandExecution.executed_by_id",
+        lazy="raise_on_sql"
+    )
+
+    __table_args__ = (
+        enum_check("role", UserRole),
     )
 
 
@@ -69,20 +74,22 @@ class APIKey(Base):
     __tablename__ = "api_keys"
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    user_id: Mapped[int] = mapped_column(index=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
     name: Mapped[str] = mapped_column(String(100))
-    key_hash: Mapped[str] = mapped_column(String(255), unique=True, index=True)
+    key_hash: Mapped[str] = mapped_column(String(255), unique=True)
     prefix: Mapped[str] = mapped_column(String(20))  # For display purposes
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
-    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+    expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         server_default=func.now()
     )
-    last_used: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True),
-        nullable=True
-    )
+    last_used: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
 
     # Relationships
-    user: Mapped["User"] = relationship("User", back_populates="api_keys")
+    user: Mapped[User] = relationship(User, back_populates="api_keys")
+
+    __table_args__ = (
+        # Auth lookup on usable keys only; key_hash stays globally unique
+        Index("ix_api_keys_active_key_hash", "key_hash", postgresql_where=text("is_active")),
+    )
@@ -2,11 +2,27 @@
 Authentication schemas
 """
 from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel, EmailStr, Field
+from functools import lru_cache
+from typing import Annotated, Optional
+from pydantic import AfterValidator, BaseModel, ConfigDict, Field, WithJsonSchema
+from pydantic.networks import validate_email
 from app.models.user import UserRole
 
 
+@lru_cache(maxsize=4096)
+def _normalize_email(value: str) -> str:
+    """EmailStr validation, cached so repeated addresses skip email-validator"""
+    return validate_email(value)[1]
+
+
+# Same checks and schema as EmailStr; invalid addresses raise and are not cached
+CachedEmailStr = Annotated[
+    str,
+    AfterValidator(_normalize_email),
+    WithJsonSchema({"type": "string", "format": "email"}),
+]
+
+
 class Token(BaseModel):
     """Token response"""
     access_token: str
@@ -28,7 +44,7 @@ class UserLogin(BaseModel):
 class UserCreate(BaseModel):
     """User creation request"""
     username: str = Field(..., min_length=3, max_length=50)
-    email: EmailStr
+    email: CachedEmailStr
     password: str = Field(..., min_length=8)
     full_name: Optional[str] = None
     role: UserRole = UserRole.VIEWER
@@ -36,7 +52,7 @@ class UserCreate(BaseModel):
 
 class UserUpdate(BaseModel):
     """User update request"""
-    email: Optional[EmailStr] = None
+    email: Optional[CachedEmailStr] = None
     full_name: Optional[str] = None
     role: Optional[UserRole] = None
     is_active: Optional[bool] = None
@@ -44,6 +60,8 @@ class UserUpdate(BaseModel):
 
 class UserResponse(BaseModel):
     """User response"""
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     username: str
     email: str
@@ -52,6 +70,3 @@ class UserResponse(BaseModel):
     is_active: bool
     created_at: datetime
     last_login: Optional[datetime]
-
-    class Config:
-        from_attributes = True
@@ -0,0 +1,129 @@
+"""
+Audit log writer
+"""
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import AsyncSessionLocal
+from app.models.audit import AuditLog, AuditAction, ResourceType
+
+logger = logging.getLogger(__name__)
+
+# Core INSERT, built once; skips the ORM unit of work and executes as a batch
+_AUDIT_INSERT = AuditLog.__table__.insert()
+
+
+def audit_entry(
+    action: AuditAction,
+    resource_type: ResourceType,
+    resource_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    username: Optional[str] = None,
+    details: Optional[Dict[str, Any]] = None,
+    ip_address: Optional[str] = None,
+    user_agent: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Build an audit row; every row has the same keys so batches execute as one statement"""
+    return {
+        "action": action,
+        "resource_type": resource_type,
+        "resource_id": resource_id,
+        "user_id": user_id,
+        "username": username,
+        "details": details,
+        "ip_address": ip_address,
+        "user_agent": user_agent,
+    }
+
+
+class AuditService:
+    """
+    Write audit logs.
+
+    ``write`` inserts rows in the caller's session, so they commit together
+    with the change they describe. ``log`` buffers rows for a background
+    writer that flushes every FLUSH_INTERVAL seconds or BATCH_SIZE rows,
+    keeping the insert off the request path.
+    """
+
+    BATCH_SIZE = 256
+    FLUSH_INTERVAL = 0.1
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+
+    @staticmethod
+    async def write(db: AsyncSession, entries: List[Dict[str, Any]]):
+        """Insert audit rows in the given session (the caller commits)"""
+        if entries:
+            await db.execute(_AUDIT_INSERT, entries)
+
+    async def start(self):
+        """Start the background writer"""
+        if self._writer:
+            return
+        self._queue = asyncio.Queue()
+        self._writer = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background writer after it flushes buffered rows"""
+        if not self._writer:
+            return
+        self._queue.put_nowait(None)
+        await self._writer
+        self._writer = None
+        self._queue = None
+
+    async def log(self, **fields):
+        """Record an audit entry; written directly if the writer is not running"""
+        entry = audit_entry(**fields)
+        if self._writer:
+            self._queue.put_nowait(entry)
+            return
+
+        async with AsyncSessionLocal() as db:
+            await self.write(db, [entry])
+            await db.commit()
+
+    def _take(self, batch: List[Dict[str, Any]]) -> bool:
+        """Move buffered entries into the batch; True once the stop marker is seen"""
+        while len(batch) < self.BATCH_SIZE and not self._queue.empty():
+            entry = self._queue.get_nowait()
+            if entry is None:
+                return True
+            batch.append(entry)
+        return False
+
+    async def _flush(self, batch: List[Dict[str, Any]]):
+        try:
+            async with AsyncSessionLocal() as db:
+                await self.write(db, batch)
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Failed to write {len(batch)} audit log entries: {e}")
+
+    async def _run(self):
+        """Flush buffered entries in batches until the stop marker arrives"""
+        while True:
+            entry = await self._queue.get()
+            if entry is None:
+                return
+
+            batch = [entry]
+            stopping = self._take(batch)
+            if not stopping and len(batch) < self.BATCH_SIZE:
+                # Give other entries a moment to join this batch
+                await asyncio.sleep(self.FLUSH_INTERVAL)
+                stopping = self._take(batch)
+
+            await self._flush(batch)
+            if stopping:
+                return
+
+
+# Global audit writer
+audit_service = AuditService()
@@ -2,13 +2,23 @@
 Database-specific backup engines
 """
 import asyncio
+import ipaddress
 import logging
 import os
+import shlex
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 from pathlib import Path
 
+import redis.asyncio as aioredis
+from redis.exceptions import (
+    ConnectionError as RedisConnectionError,
+    RedisError,
+    TimeoutError as RedisTimeoutError,
+)
+
+from app.core.config import settings
 from app.models.backup import DatabaseType, BackupType
 from app.services.executor import ExecutorFactory, ExecutionResult
 
@@ -18,10 +28,31 @@ logger = logging.getLogger(__name__)
 class BackupEngine(ABC):
     """Base class for database backup engines"""
 
+    # Stream compressor per host ("pigz -1" or "gzip -1"), detected on first use
+    _gzip_commands: Dict[str, str] = {}
+
     def __init__(self, executor, database_name: str, credentials: Dict[str, Any]):
         self.executor = executor
         self.database_name = database_name
         self.credentials = credentials
+        # Worker count for engines that dump/restore in parallel
+        self.parallel_jobs = int(
+            credentials.get("parallel_jobs")
+            or settings.BACKUP_PARALLEL_JOBS
+            or os.cpu_count()
+            or 1
+        )
+
+    async def _gzip_command(self) -> str:
+        """Fastest gzip-compatible compressor on the executor's host"""
+        host = getattr(self.executor, "host", "")
+        command = BackupEngine._gzip_commands.get(host)
+        if command is None:
+            result = await self.executor.run(["which", "pigz"])
+            # pigz uses every core by default and writes plain gzip
+            command = "pigz -1" if result.success and result.stdout.strip() else "gzip -1"
+            BackupEngine._gzip_commands[host] = command
+        return command
 
     @abstractmethod
     async def create_backup(
@@ -32,6 +63,18 @@ class BackupEngine(ABC):
         """Create a backup"""
         pass
 
+    def supports_streaming(self, backup_type: BackupType) -> bool:
+        """Whether create_backup_streaming can produce this backup type"""
+        return False
+
+    async def create_backup_streaming(self, backup_type: BackupType, sink) -> ExecutionResult:
+        """
+        Stream a backup into sink (e.g. an open BackupPipeline writer), so it
+        is compressed and encrypted as it is dumped with no intermediate
+        file. create_backup is the staged fallback.
+        """
+        raise NotImplementedError(f"{type(self).__name__} cannot stream backups")
+
     @abstractmethod
     async def restore_backup(
         self,
@@ -50,42 +93,112 @@ class BackupEngine(ABC):
 class PostgreSQLEngine(BackupEngine):
     """PostgreSQL backup engine"""
 
+    def _connection_args(self) -> List[str]:
+        """libpq connection flags (the password goes in PGPASSWORD)"""
+        return [
+            "-h", str(self.credentials.get("host", "localhost")),
+            "-p", str(self.credentials.get("port", 5432)),
+            "-U", str(self.credentials.get("username", "postgres")),
+        ]
+
+    def _env(self) -> Dict[str, str]:
+        return {"PGPASSWORD": str(self.credentials.get("password", ""))}
+
+    def _restore_conninfo(self, db_name: str) -> str:
+        """
+        pg_restore -d target with session settings for every connection (one
+        per -j worker): no waiting on WAL flushes per commit, and more memory
+        for the index and constraint builds at the end of the restore. They go
+        in the conninfo so they hold however the executor passes environment
+        """
+        def quote(value: str) -> str:
+            return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+        options = (
+            "-c synchronous_commit=off "
+            f"-c maintenance_work_mem={settings.PG_RESTORE_MAINTENANCE_WORK_MEM}"
+        )
+        return f"dbname={quote(db_name)} options={quote(options)}"
+
+    async def _alter_system(self, *statements: str) -> ExecutionResult:
+        """Run ALTER SYSTEM statements and reload the server configuration"""
+        argv = ["psql", *self._connection_args(), "-d", "postgres"]
+        for statement in (*statements, "SELECT pg_reload_conf()"):
+            argv += ["-c", statement]
+        return await self.executor.run(argv, env=self._env())
+
     async def create_backup(
         self,
         backup_type: BackupType,
         output_path: str
     ) -> ExecutionResult:
         """Create PostgreSQL backup using pg_dump"""
-        username = self.credentials.get("username", "postgres")
-        password = self.credentials.get("password", "")
-        host = self.credentials.get("host", "localhost")
-        port = self.credentials.get("port", 5432)
-
-        # Set password environment variable
-        env_vars = f"PGPASSWORD={password}"
-
         if backup_type == BackupType.FULL:
-            # Full backup with custom format
-            command = (
-                f"{env_vars} pg_dump "
-                f"-h {host} -p {port} -U {username} "
-                f"-d {self.database_name} "
-                f"-Fc "  # Custom format (compressed)
-                f"-f {output_path}"
-            )
+            return await self._dump_directory(output_path)
         elif backup_type == BackupType.INCREMENTAL:
             # Use pg_basebackup for incremental
-            command = (
-                f"{env_vars} pg_basebackup "
-                f"-h {host} -p {port} -U {username} "
-                f"-D {output_path} "
-                f"-Fp -Xs -P"
-            )
+            argv = [
+                "pg_basebackup", *self._connection_args(),
+                "-D", output_path,
+                "-Fp", "-Xs", "-P",
+            ]
         else:
             return ExecutionResult(False, stderr="Unsupported backup type for PostgreSQL")
 
         logger.info(f"Executing PostgreSQL backup: {self.database_name}")
-        result = await self.executor.execute(command)
+        result = await self.executor.run(argv, env=self._env())
+
+        if result.success:
+            logger.info(f"PostgreSQL backup completed: {output_path}")
+        else:
+            logger.error(f"PostgreSQL backup failed: {result.stderr}")
+
+        return result
+
+    def supports_streaming(self, backup_type: BackupType) -> bool:
+        return backup_type == BackupType.FULL
+
+    async def create_backup_streaming(self, backup_type: BackupType, sink) -> ExecutionResult:
+        """
+        Stream an uncompressed custom-format dump to sink. pg_dump -j needs
+        the directory format, so this path dumps with a single worker.
+        """
+        argv = [
+            "pg_dump", *self._connection_args(),
+            "-d", self.database_name,
+            "-Fc", "-Z", "0",  # Custom format; the pipeline compresses
+        ]
+
+        logger.info(f"Streaming PostgreSQL backup: {self.database_name}")
+        result = await self.executor.stream(argv, sink, env=self._env())
+
+        if result.success:
+            logger.info(f"PostgreSQL backup completed: {self.database_name}")
+        else:
+            logger.error(f"PostgreSQL backup failed: {result.stderr}")
+
+        return result
+
+    async def _dump_directory(self, output_path: str) -> ExecutionResult:
+        """
+        Dump in directory format with parallel workers, then tar the
+        directory into output_path. The tables are already compressed
+        per file, so the tar itself is not.
+        """
+        dump_dir = f"{output_path}.d"
+        argv = [
+            "pg_dump", *self._connection_args(),
+            "-d", self.database_name,
+            "-Fd", "-j", str(self.parallel_jobs),  # Directory format, one worker per table
+            "-f", dump_dir,
+        ]
+
+        logger.info(f"Executing PostgreSQL backup: {self.database_name} ({self.parallel_jobs} jobs)")
+        result = await self.executor.run(argv, env=self._env())
+
+        if result.success:
+            result = await self.executor.run(["tar", "-cf", output_path, "-C", dump_dir, "."])
+        await self.executor.run(["rm", "-rf", dump_dir])
 
         if result.success:
             logger.info(f"PostgreSQL backup completed: {output_path}")
@@ -100,26 +213,50 @@ class PostgreSQLEngine(BackupEngine):
         target_database: Optional[str] = None
     ) -> ExecutionResult:
         """Restore PostgreSQL backup using pg_restore"""
-        username = self.credentials.get("username", "postgres")
-        password = self.credentials.get("password", "")
-        host = self.credentials.get("host", "localhost")
-        port = self.credentials.get("port", 5432)
-
         db_name = target_database or self.database_name
-        env_vars = f"PGPASSWORD={password}"
+
+        # Directory-format backups are tarred; older custom-format (-Fc)
+        # archives are not, and pg_restore reads those directly
+        restore_dir = f"{backup_path}.d"
+        await self.executor.run(["mkdir", "-p", restore_dir])
+        extracted = await self.executor.run(["tar", "-xf", backup_path, "-C", restore_dir])
+        source = ["-Fd", restore_dir] if extracted.success else [backup_path]
 
         # Drop and recreate database (optional, based on requirements)
-        command = (
-            f"{env_vars} pg_restore "
-            f"-h {host} -p {port} -U {username} "
-            f"-d {db_name} "
-            f"--clean --if-exists "
-            f"--no-owner --no-acl "
-            f"{backup_path}"
-        )
+        argv = [
+            "pg_restore", *self._connection_args(),
+            "-d", self._restore_conninfo(db_name),
+            "-j", str(self.parallel_jobs),
+            "--clean", "--if-exists",
+            "--no-owner", "--no-acl",
+            *source,
+        ]
+
+        # fast_restore_mode turns off crash safety server-wide for the
+        # restore; only for servers that can be rebuilt if they crash mid-way
+        fast_restore = bool(self.credentials.get("fast_restore_mode"))
+        if fast_restore:
+            tuned = await self._alter_system(
+                "ALTER SYSTEM SET fsync = off",
+                "ALTER SYSTEM SET full_page_writes = off",
+                f"ALTER SYSTEM SET max_wal_size = '{settings.PG_RESTORE_MAX_WAL_SIZE}'",
+            )
+            if not tuned.success:
+                logger.warning(f"Could not enable fast restore mode: {tuned.stderr}")
 
         logger.info(f"Executing PostgreSQL restore to: {db_name}")
-        result = await self.executor.execute(command)
+        try:
+            result = await self.executor.run(argv, env=self._env())
+        finally:
+            if fast_restore:
+                reverted = await self._alter_system(
+                    "ALTER SYSTEM RESET fsync",
+                    "ALTER SYSTEM RESET full_page_writes",
+                    "ALTER SYSTEM RESET max_wal_size",
+                )
+                if not reverted.success:
+                    logger.error(f"Could not revert fast restore mode: {reverted.stderr}")
+            await self.executor.run(["rm", "-rf", restore_dir])
 
         if result.success:
             logger.info(f"PostgreSQL restore completed: {db_name}")
@@ -130,19 +267,12 @@ class PostgreSQLEngine(BackupEngine):
 
     async def list_databases(self) -> list:
         """List all PostgreSQL databases"""
-        username = self.credentials.get("username", "postgres")
-        password = self.credentials.get("password", "")
-        host = self.credentials.get("host", "localhost")
-        port = self.credentials.get("port", 5432)
-
-        env_vars = f"PGPASSWORD={password}"
-        command = (
-            f"{env_vars} psql "
-            f"-h {host} -p {port} -U {username} "
-            f"-t -c \"SELECT datname FROM pg_database WHERE datistemplate = false;\""
-        )
+        argv = [
+            "psql", *self._connection_args(),
+            "-t", "-c", "SELECT datname FROM pg_database WHERE datistemplate = false;",
+        ]
 
-        result = await self.executor.execute(command)
+        result = await self.executor.run(argv, env=self._env())
 
         if result.success:
             databases = [db.strip() for db in result.stdout.split('\n') if db.strip()]
@@ -153,58 +283,81 @@ class PostgreSQLEngine(BackupEngine):
 class MySQLEngine(BackupEngine):
     """MySQL/MariaDB backup engine"""
 
+    def _connection_args(self) -> List[str]:
+        """Client connection flags (the password goes in MYSQL_PWD)"""
+        return [
+            "-h", str(self.credentials.get("host", "localhost")),
+            "-P", str(self.credentials.get("port", 3306)),
+            "-u", str(self.credentials.get("username", "root")),
+        ]
+
+    def _env(self) -> Dict[str, str]:
+        return {"MYSQL_PWD": str(self.credentials.get("password", ""))}
+
     async def create_backup(
         self,
         backup_type: BackupType,
         output_path: str
     ) -> ExecutionResult:
         """Create MySQL backup using mysqldump"""
-        username = self.credentials.get("username", "root")
-        password = self.credentials.get("password", "")
-        host = self.credentials.get("host", "localhost")
-        port = self.credentials.get("port", 3306)
-
         if backup_type == BackupType.FULL:
-            command = (
-                f"mysqldump "
-                f"-h {host} -P {port} -u {username} -p{password} "
-                f"--single-transaction --quick --lock-tables=false "
-                f"{self.database_name} > {output_path}"
-            )
+            # Compress while dumping, so the plain SQL never touches disk.
+            # The pipe needs a shell, so the arguments are quoted here.
+            dump = shlex.join([
+                "mysqldump", *self._connection_args(),
+                "--single-transaction", "--quick", "--lock-tables=false",
+                self.database_name,
+            ])
+            command = f"{dump} | {await self._gzip_command()} > {shlex.quote(output_path)}"
         else:
             return ExecutionResult(False, stderr="Only full backups supported for MySQL")
 
         logger.info(f"Executing MySQL backup: {self.database_name}")
-        result = await self.executor.execute(command)
+        # pipefail, so a failed mysqldump fails the pipeline, not just gzip
+        result = await self.executor.execute(command, env=self._env(), pipefail=True)
 
         if result.success:
+            result.pre_compressed = True
             logger.info(f"MySQL backup completed: {output_path}")
         else:
             logger.error(f"MySQL backup failed: {result.stderr}")
 
         return result
 
+    def supports_streaming(self, backup_type: BackupType) -> bool:
+        return backup_type == BackupType.FULL
+
+    async def create_backup_streaming(self, backup_type: BackupType, sink) -> ExecutionResult:
+        """Stream the plain SQL dump to sink"""
+        argv = [
+            "mysqldump", *self._connection_args(),
+            "--single-transaction", "--quick", "--lock-tables=false",
+            self.database_name,
+        ]
+
+        logger.info(f"Streaming MySQL backup: {self.database_name}")
+        result = await self.executor.stream(argv, sink, env=self._env())
+
+        if result.success:
+            logger.info(f"MySQL backup completed: {self.database_name}")
+        else:
+            logger.error(f"MySQL backup failed: {result.stderr}")
+
+        return result
+
     async def restore_backup(
         self,
         backup_path: str,
         target_database: Optional[str] = None
     ) -> ExecutionResult:
         """Restore MySQL backup"""
-        username = self.credentials.get("username", "root")
-        password = self.credentials.get("password", "")
-        host = self.credentials.get("host", "localhost")
-        port = self.credentials.get("port", 3306)
-
         db_name = target_database or self.database_name
 
-        command = (
-            f"mysql "
-            f"-h {host} -P {port} -u {username} -p{password} "
-            f"{db_name} < {backup_path}"
-        )
+        # The client reads the dump itself, so no shell redirection is needed
+        argv = ["mysql", *self._connection_args(), db_name, "-e", f"source {backup_path}"]
 
         logger.info(f"Executing MySQL restore to: {db_name}")
-        result = await self.executor.execute(command)
+        result = await self.executor.run(argv, env=self._env())
 
         if result.success:
             logger.info(f"MySQL restore completed: {db_name}")
@@ -215,17 +368,9 @@ class MySQLEngine(BackupEngine):
 
     async def list_databases(self) -> list:
         """List all MySQL databases"""
-        username = self.credentials.get("username", "root")
-        password = self.credentials.get("password", "")
-        host = self.credentials.get("host", "localhost")
-        port = self.credentials.get("port", 3306)
-
-        command = (
-            f"mysql -h {host} -P {port} -u {username} -p{password} "
-            f"-e \"SHOW DATABASES;\""
-        )
+        argv = ["mysql", *self._connection_args(), "-e", "SHOW DATABASES;"]
 
-        result = await self.executor.execute(command)
+        result = await self.executor.run(argv, env=self._env())
 
         if result.success:
             databases = [
@@ -239,30 +384,35 @@ class MySQLEngine(BackupEngine):
 class MongoDBEngine(BackupEngine):
     """MongoDB backup engine"""
 
+    def _connection_args(self) -> List[str]:
+        """Host and auth flags (mongodump has no password variable)"""
+        username = self.credentials.get("username", "")
+        password = self.credentials.get("password", "")
+
+        args = [
+            "--host", str(self.credentials.get("host", "localhost")),
+            "--port", str(self.credentials.get("port", 27017)),
+        ]
+        if username and password:
+            args += ["-u", username, "-p", password, "--authenticationDatabase", "admin"]
+        return args
+
     async def create_backup(
         self,
         backup_type: BackupType,
         output_path: str
     ) -> ExecutionResult:
         """Create MongoDB backup using mongodump"""
-        username = self.credentials.get("username", "")
-        password = self.credentials.get("password", "")
-        host = self.credentials.get("host", "localhost")
-        port = self.credentials.get("port", 27017)
-
-        auth_str = ""
-        if username and password:
-            auth_str = f"-u {username} -p {password} --authenticationDatabase admin"
-
-        command = (
-            f"mongodump "
-            f"--host {host} --port {port} {auth_str} "
-            f"--db {self.database_name} "
-            f"--out {output_path}"
-        )
+        # One gzipped archive file, dumping collections in parallel
+        argv = [
+            "mongodump", *self._connection_args(),
+            "--db", self.database_name,
+            f"--archive={output_path}", "--gzip",
+            f"--numParallelCollections={self.parallel_jobs}",
+        ]
 
         logger.info(f"Executing MongoDB backup: {self.database_name}")
-        result = await self.executor.execute(command)
+        result = await self.executor.run(argv)
 
         if result.success:
             logger.info(f"MongoDB backup completed: {output_path}")
@@ -277,27 +427,18 @@ class MongoDBEngine(BackupEngine):
         target_database: Optional[str] = None
     ) -> ExecutionResult:
         """Restore MongoDB backup using mongorestore"""
-        username = self.credentials.get("username", "")
-        password = self.credentials.get("password", "")
-        host = self.credentials.get("host", "localhost")
-        port = self.credentials.get("port", 27017)
-
         db_name = target_database or self.database_name
 
-        auth_str = ""
-        if username and password:
-            auth_str = f"-u {username} -p {password} --authenticationDatabase admin"
-
-        command = (
-            f"mongorestore "
-            f"--host {host} --port {port} {auth_str} "
-            f"--db {db_name} "
-            f"--drop "
-            f"{backup_path}/{self.database_name}"
-        )
+        argv = [
+            "mongorestore", *self._connection_args(),
+            f"--archive={backup_path}", "--gzip",
+            f"--nsFrom={self.database_name}.*", f"--nsTo={db_name}.*",
+            "--drop",
+            f"--numInsertionWorkersPerCollection={self.parallel_jobs}",
+        ]
 
         logger.info(f"Executing MongoDB restore to: {db_name}")
-        result = await self.executor.execute(command)
+        result = await self.executor.run(argv)
 
         if result.success:
             logger.info(f"MongoDB restore completed: {db_name}")
@@ -308,21 +449,12 @@ class MongoDBEngine(BackupEngine):
 
     async def list_databases(self) -> list:
         """List all MongoDB databases"""
-        username = self.credentials.get("username", "")
-        password = self.credentials.get("password", "")
-        host = self.credentials.get("host", "localhost")
-        port = self.credentials.get("port", 27017)
-
-        auth_str = ""
-        if username and password:
-            auth_str = f"-u {username} -p {password} --authenticationDatabase admin"
+        argv = [
+            "mongo", *self._connection_args(),
+            "--eval", "JSON.stringify(db.adminCommand({ listDatabases: 1 }))", "--quiet",
+        ]
 
-        command = (
-            f"mongo --host {host} --port {port} {auth_str} "
-            f"--eval 'db.adminCommand({ listDatabases: 1 })' --quiet"
-        )
-
-        result = await self.executor.execute(command)
+        result = await self.executor.run(argv)
 
         if result.success:
             import json
@@ -332,54 +464,174 @@ class MongoDBEngine(BackupEngine):
         return []
 
 
+def _is_loopback(host: str) -> bool:
+    """True for localhost, 127.0.0.0/8 and ::1"""
+    if host.lower().rstrip(".") in ("localhost", "localhost.localdomain") or host.lower().endswith(".localhost"):
+        return True
+    try:
+        ip = ipaddress.ip_address(host.strip("[]"))
+    except ValueError:
+        return False
+    return ip.is_loopback or bool(getattr(ip, "ipv4_mapped", None) and ip.ipv4_mapped.is_loopback)
+
+
 class RedisEngine(BackupEngine):
     """Redis backup engine"""
 
+    # How long to wait for BGSAVE, and the LASTSAVE poll interval bounds
+    BGSAVE_TIMEOUT = 3600
+    POLL_MIN = 0.01
+    POLL_MAX = 0.2
+
+    # cp flags: reflink (XFS/btrfs) when possible, else GNU cp's copy_file_range
+    CP_FAST = ("--reflink=auto",)
+
+    # RDB directory per (executor host, redis host, port), looked up once
+    _rdb_dirs: Dict[tuple, str] = {}
+
+    def __init__(self, executor, database_name: str, credentials: Dict[str, Any]):
+        super().__init__(executor, database_name, credentials)
+        # redis-cli through the executor runs next to the server, so it is the
+        # default. Connecting from the worker instead is opt-in (redis_direct),
+        # and never for a loopback host, which would be the worker's own.
+        host = credentials.get("host", "localhost")
+        self._direct = bool(credentials.get("redis_direct")) and not _is_loopback(host)
+        self.client = aioredis.Redis(
+            host=host,
+            port=credentials.get("port", 6379),
+            password=credentials.get("password") or None,
+            db=credentials.get("db", 0),
+            socket_connect_timeout=5,
+        ) if self._direct else None
+
+    async def _direct_call(self, method: str, *args, **kwargs) -> Any:
+        """
+        Call a redis.asyncio client method. Returns None if direct access is
+        off, and sticks to redis-cli from then on if the server is not
+        reachable directly.
+        """
+        if not self._direct:
+            return None
+        try:
+            return await getattr(self.client, method)(*args, **kwargs)
+        except (RedisConnectionError, RedisTimeoutError) as e:
+            logger.info(f"Redis not reachable directly ({e}); using redis-cli")
+            self._direct = False
+            return None
+
+    async def _close(self) -> None:
+        if self.client is not None:
+            await self.client.aclose()
+
+    async def _cli(self, *args: str) -> ExecutionResult:
+        """Run redis-cli against this server (the password goes in REDISCLI_AUTH)"""
+        password = self.credentials.get("password", "")
+        argv = [
+            "redis-cli",
+            "-h", str(self.credentials.get("host", "localhost")),
+            "-p", str(self.credentials.get("port", 6379)),
+            *args,
+        ]
+        return await self.executor.run(argv, env={"REDISCLI_AUTH": password} if password else None)
+
+    async def _rdb_dir(self) -> Optional[str]:
+        """Redis data directory (CONFIG GET dir), cached per server"""
+        key = (
+            getattr(self.executor, "host", ""),
+            self.credentials.get("host", "localhost"),
+            self.credentials.get("port", 6379),
+        )
+        if key not in RedisEngine._rdb_dirs:
+            try:
+                config = await self._direct_call("config_get", "dir")
+            except RedisError as e:
+                logger.error(f"CONFIG GET dir failed: {e}")
+                return None
+
+            if config is None:
+                result = await self._cli("CONFIG", "GET", "dir")
+                if not result.success:
+                    return None
+                # Raw output is the name/value pairs, one per line
+                lines = result.stdout.split('\n')
+                config = dict(zip(lines[::2], (line.strip() for line in lines[1::2])))
+
+            RedisEngine._rdb_dirs[key] = config.get("dir") or "/var/lib/redis"
+        return RedisEngine._rdb_dirs[key]
+
+    async def _lastsave(self) -> Optional[int]:
+        """Unix time of the last successful save, or None if unavailable"""
+        lastsave = await self._direct_call("lastsave")
+        if lastsave is not None:
+            return int(lastsave.timestamp())
+
+        result = await self._cli("LASTSAVE")
+        try:
+            return int(result.stdout.strip()) if result.success else None
+        except ValueError:
+            return None
+
+    async def _wait_for_save(self, previous: Optional[int]) -> bool:
+        """Poll LASTSAVE with backoff until it moves past previous"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.BGSAVE_TIMEOUT
+        delay = self.POLL_MIN
+
+        while loop.time() < deadline:
+            lastsave = await self._lastsave()
+            if lastsave is not None and lastsave != previous:
+                return True
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.POLL_MAX)
+
+        return False
+
     async def create_backup(
         self,
         backup_type: BackupType,
         output_path: str
     ) -> ExecutionResult:
         """Create Redis backup using BGSAVE"""
-        password = self.credentials.get("password", "")
-        host = self.credentials.get("host", "localhost")
-        port = self.credentials.get("port", 6379)
+        try:
+            return await self._create_backup(output_path)
+        finally:
+            await self._close()
+
+    async def _create_backup(self, output_path: str) -> ExecutionResult:
         db_num = self.credentials.get("db", 0)
 
-        auth_str = f"-a {password}" if password else ""
+        previous = await self._lastsave()
 
         # Trigger background save
-        command = f"redis-cli -h {host} -p {port} {auth_str} -n {db_num} BGSAVE"
-
         logger.info(f"Executing Redis backup: DB {db_num}")
-        result = await self.executor.execute(command)
-
-        if not result.success:
-            return result
-
-        # Wait for BGSAVE to complete
-        await asyncio.sleep(1)
-
-        # Get RDB file location
-        command = f"redis-cli -h {host} -p {port} {auth_str} CONFIG GET dir"
-        result = await self.executor.execute(command)
-
-        if result.success:
-            lines = result.stdout.split('\n')
-            rdb_dir = lines[1] if len(lines) > 1 else "/var/lib/redis"
-
-            # Copy RDB file to output path
-            copy_cmd = f"cp {rdb_dir}/dump.rdb {output_path}"
-            copy_result = await self.executor.execute(copy_cmd)
-
-            if copy_result.success:
-                logger.info(f"Redis backup completed: {output_path}")
-            else:
-                logger.error(f"Redis backup copy failed: {copy_result.stderr}")
-
-            return copy_result
+        try:
+            started = await self._direct_call("bgsave")
+        except RedisError as e:
+            return ExecutionResult(False, stderr=str(e))
+
+        if started is None:
+            result = await self._cli("-n", str(db_num), "BGSAVE")
+            if not result.success:
+                return result
+
+        # Wait for BGSAVE while looking up the RDB file location
+        saved, rdb_dir = await asyncio.gather(self._wait_for_save(previous), self._rdb_dir())
+
+        if not saved:
+            return ExecutionResult(False, stderr="Timed out waiting for BGSAVE")
+        if rdb_dir is None:
+            return ExecutionResult(False, stderr="Could not read the Redis data directory")
+
+        # Copy RDB file to output path
+        # Clone instead of copying where the filesystem supports it
+        copy_result = await self.executor.run(["cp", *self.CP_FAST, f"{rdb_dir}/dump.rdb", output_path])
+
+        if copy_result.success:
+            logger.info(f"Redis backup completed: {output_path}")
+        else:
+            logger.error(f"Redis backup copy failed: {copy_result.stderr}")
 
-        return result
+        return copy_result
 
     async def restore_backup(
         self,
@@ -387,36 +639,29 @@ class RedisEngine(BackupEngine):
         target_database: Optional[str] = None
     ) -> ExecutionResult:
         """Restore Redis backup"""
-        password = self.credentials.get("password", "")
-        host = self.credentials.get("host", "localhost")
-        port = self.credentials.get("port", 6379)
-
-        auth_str = f"-a {password}" if password else ""
+        try:
+            return await self._restore_backup(backup_path)
+        finally:
+            await self._close()
 
+    async def _restore_backup(self, backup_path: str) -> ExecutionResult:
         # Get Redis data directory
-        command = f"redis-cli -h {host} -p {port} {auth_str} CONFIG GET dir"
-        result = await self.executor.execute(command)
+        rdb_dir = await self._rdb_dir()
 
-        if not result.success:
-            return result
-
-        lines = result.stdout.split('\n')
-        rdb_dir = lines[1] if len(lines) > 1 else "/var/lib/redis"
+        if rdb_dir is None:
+            return ExecutionResult(False, stderr="Could not read the Redis data directory")
 
         # Stop Redis (or use SHUTDOWN NOSAVE)
-        stop_cmd = f"redis-cli -h {host} -p {port} {auth_str} SHUTDOWN NOSAVE"
-        await self.executor.execute(stop_cmd)
+        await self._cli("SHUTDOWN", "NOSAVE")
 
         # Copy backup file
-        copy_cmd = f"cp {backup_path} {rdb_dir}/dump.rdb"
-        copy_result = await self.executor.execute(copy_cmd)
+        copy_result = await self.executor.run(["cp", *self.CP_FAST, backup_path, f"{rdb_dir}/dump.rdb"])
 
         if not copy_result.success:
             return copy_result
 
         # Start Redis again (platform-dependent)
-        start_cmd = "redis-server --daemonize yes"
-        start_result = await self.executor.execute(start_cmd)
+        start_result = await self.executor.run(["redis-server", "--daemonize", "yes"])
 
         logger.info(f"Redis restore completed")
         return start_result
@@ -436,7 +681,13 @@ class BackupEngineFactory:
         database_name: str,
         credentials: Dict[str, Any]
     ) -> BackupEngine:
-        """Create appropriate backup engine"""
+        """
+        Create appropriate backup engine
+
+        PostgreSQL full backups are directory-format dumps (pg_dump -Fd -j)
+        stored as an uncompressed tar; restores also accept the older
+        custom-format (-Fc) archives.
+        """
 
         if db_type == DatabaseType.POSTGRESQL:
             return PostgreSQLEngine(executor, database_name, credentials)
@@ -448,3 +699,14 @@ class BackupEngineFactory:
             return RedisEngine(executor, database_name, credentials)
         else:
             raise ValueError(f"Unsupported database type: {db_type}")
+
+    @staticmethod
+    async def list_all_databases(engines: List[BackupEngine]) -> List[Any]:
+        """
+        List databases on several servers concurrently.
+        Results are in engine order; a failed lookup yields its exception.
+        """
+        return await asyncio.gather(
+            *(engine.list_databases() for engine in engines),
+            return_exceptions=True
+        )
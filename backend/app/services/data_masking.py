@@ -4,12 +4,21 @@ Data masking service for cross-environment restores
 import hashlib
 import random
 import string
-from typing import Any, Dict, Optional
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
 
 
 class DataMaskingService:
     """Service for masking sensitive data during cross-environment restores"""
 
+    # Replacement values for names and addresses
+    _FIRST_NAMES = ('John', 'Jane', 'Alex', 'Sam', 'Chris', 'Pat', 'Jordan')
+    _LAST_NAMES = ('Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia')
+    _STREETS = ('Main St', 'Oak Ave', 'Park Rd', 'Elm Dr', 'Pine Ln')
+
     @staticmethod
     def mask_email(email: str) -> str:
         """Mask email address"""
@@ -17,7 +26,7 @@ class DataMaskingService:
             return email
 
         local, domain = email.split('@')
-        masked_local = hashlib.md5(local.encode()).hexdigest()[:8]
+        masked_local = hashlib.sha256(local.encode()).hexdigest()[:8]
         return f"{masked_local}@example.com"
 
     @staticmethod
@@ -47,24 +56,27 @@ class DataMaskingService:
         return cc[:6] + '*' * (len(cc) - 10) + cc[-4:]
 
     @staticmethod
+    @lru_cache(maxsize=100_000)
     def mask_name(name: str) -> str:
         """Mask name"""
-        # Use hash of name to generate consistent fake name
-        hash_val = int(hashlib.md5(name.encode()).hexdigest(), 16)
-        random.seed(hash_val)
+        # Index the fake names by bytes of the name's hash, so the same name
+        # always masks the same way (matches generate_sql_masking_queries)
+        digest = hashlib.md5(name.encode()).digest()
 
-        first_names = ['John', 'Jane', 'Alex', 'Sam', 'Chris', 'Pat', 'Jordan']
-        last_names = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia']
+        first_names = DataMaskingService._FIRST_NAMES
+        last_names = DataMaskingService._LAST_NAMES
 
-        return f"{random.choice(first_names)} {random.choice(last_names)}"
+        return f"{first_names[digest[0] % len(first_names)]} {last_names[digest[1] % len(last_names)]}"
 
     @staticmethod
+    @lru_cache(maxsize=100_000)
     def mask_address(address: str) -> str:
         """Mask address"""
-        # Generate fake address
-        street_nums = random.randint(100, 9999)
-        streets = ['Main St', 'Oak Ave', 'Park Rd', 'Elm Dr', 'Pine Ln']
-        return f"{street_nums} {random.choice(streets)}"
+        # Fake address picked from the address's hash, like mask_name
+        digest = hashlib.md5(address.encode()).digest()
+        street_num = int.from_bytes(digest[2:4], 'big') % 9900 + 100
+        streets = DataMaskingService._STREETS
+        return f"{street_num} {streets[digest[4] % len(streets)]}"
 
     @staticmethod
     def hash_value(value: str) -> str:
@@ -98,34 +110,101 @@ class DataMaskingService:
         Returns:
             Masked data
         """
+        return DataMaskingService.apply_compiled_rules(
+            data, DataMaskingService.compile_masking_rules(rules)
+        )
+
+    @staticmethod
+    def compile_masking_rules(rules: Dict[str, str]) -> List[Tuple[str, Callable[[str], Any]]]:
+        """
+        Resolve masking rules to (field, masker) pairs once per table.
+        Unknown mask types are dropped, as apply_masking_rules ignores them.
+        """
+        return [
+            (field, _MASKERS[mask_type])
+            for field, mask_type in rules.items()
+            if mask_type in _MASKERS
+        ]
+
+    @staticmethod
+    def apply_compiled_rules(
+        data: Dict[str, Any],
+        compiled: List[Tuple[str, Callable[[str], Any]]]
+    ) -> Dict[str, Any]:
+        """Apply rules from compile_masking_rules to one row"""
         masked_data = data.copy()
 
+        for field, masker in compiled:
+            if field in masked_data:
+                masked_data[field] = masker(str(masked_data[field]))
+
+        return masked_data
+
+    @staticmethod
+    def mask_email_series(values: pd.Series) -> pd.Series:
+        """Mask a column of email addresses (same output as mask_email)"""
+        values = values.astype(str)
+        local, at, _ = (values.str.partition('@')[i] for i in range(3))
+        # Hash each distinct local part once
+        hashed = local.map({
+            part: hashlib.sha256(part.encode()).hexdigest()[:8] for part in local.unique()
+        })
+        return values.where(at != '@', hashed + '@example.com')
+
+    @staticmethod
+    def mask_phone_series(values: pd.Series) -> pd.Series:
+        """Mask a column of phone numbers, keeping format but randomizing digits"""
+        values = values.astype(str)
+        if values.empty:
+            return values
+
+        # Randomize the digits of the whole column in one array operation
+        codes = np.frombuffer(''.join(values).encode('utf-32-le'), dtype=np.uint32).copy()
+        digits = (codes >= ord('0')) & (codes <= ord('9'))
+        codes[digits] = ord('0') + np.random.default_rng().integers(0, 10, digits.sum())
+        joined = codes.tobytes().decode('utf-32-le')
+
+        ends = values.str.len().cumsum().tolist()
+        starts = [0] + ends[:-1]
+        return pd.Series([joined[a:b] for a, b in zip(starts, ends)], index=values.index)
+
+    @staticmethod
+    def mask_ssn_series(values: pd.Series) -> pd.Series:
+        """Replace a column with random XXX-XX-XXXX values"""
+        digits = pd.Series(
+            np.random.default_rng().integers(0, 10 ** 9, len(values)), index=values.index
+        ).astype(str).str.zfill(9)
+        return digits.str[:3] + '-' + digits.str[3:5] + '-' + digits.str[5:]
+
+    @staticmethod
+    def mask_credit_card_series(values: pd.Series) -> pd.Series:
+        """Mask a column of card numbers, keeping the first 6 and last 4 digits"""
+        values = values.astype(str)
+        lengths = values.str.len()
+        stars = pd.Series('*', index=values.index).str.repeat((lengths - 10).clip(lower=0))
+        return (values.str[:6] + stars + values.str[-4:]).where(lengths >= 10, '****')
+
+    @staticmethod
+    def apply_masking_rules_df(df: pd.DataFrame, rules: Dict[str, str]) -> pd.DataFrame:
+        """
+        Apply masking rules to a whole table at once.
+        Column-wise equivalent of apply_masking_rules; mask types without a
+        vectorized form fall back to the per-value masker.
+        """
+        masked = df.copy()
+
         for field, mask_type in rules.items():
-            if field not in masked_data:
+            if field not in masked.columns or mask_type not in _MASKERS:
                 continue
 
-            value = str(masked_data[field])
-
-            if mask_type == 'email':
-                masked_data[field] = DataMaskingService.mask_email(value)
-            elif mask_type == 'phone':
-                masked_data[field] = DataMaskingService.mask_phone(value)
-            elif mask_type == 'ssn':
-                masked_data[field] = DataMaskingService.mask_ssn(value)
-            elif mask_type == 'credit_card':
-                masked_data[field] = DataMaskingService.mask_credit_card(value)
-            elif mask_type == 'name':
-                masked_data[field] = DataMaskingService.mask_name(value)
-            elif mask_type == 'address':
-                masked_data[field] = DataMaskingService.mask_address(value)
-            elif mask_type == 'hash':
-                masked_data[field] = DataMaskingService.hash_value(value)
-            elif mask_type == 'randomize':
-                masked_data[field] = DataMaskingService.randomize_string(len(value))
-            elif mask_type == 'null':
-                masked_data[field] = None
+            if mask_type == 'null':
+                masked[field] = None
+            elif mask_type in _SERIES_MASKERS:
+                masked[field] = _SERIES_MASKERS[mask_type](masked[field])
+            else:
+                masked[field] = masked[field].astype(str).map(_MASKERS[mask_type])
 
-        return masked_data
+        return masked
 
     @staticmethod
     def generate_sql_masking_queries(
@@ -144,32 +223,152 @@ class DataMaskingService:
         Returns:
             List of SQL UPDATE queries
         """
+        postgres = database_type == 'postgresql'
         queries = []
 
         for field, mask_type in rules.items():
             if mask_type == 'email':
-                if database_type == 'postgresql':
-                    query = f"UPDATE {table} SET {field} = MD5({field}::text) || '@example.com'"
+                # Same output as mask_email: first 8 hex chars of the local part's SHA-256
+                if postgres:
+                    query = (
+                        f"UPDATE {table} SET {field} = left(encode(sha256(convert_to("
+                        f"split_part({field}::text, '@', 1), 'UTF8')), 'hex'), 8) || '@example.com' "
+                        f"WHERE {field}::text LIKE '%@%'"
+                    )
                 else:
-                    query = f"UPDATE {table} SET {field} = CONCAT(MD5({field}), '@example.com')"
+                    query = (
+                        f"UPDATE {table} SET {field} = CONCAT(LEFT(SHA2(SUBSTRING_INDEX({field}, '@', 1), 256), 8), "
+                        f"'@example.com') WHERE {field} LIKE '%@%'"
+                    )
 
             elif mask_type == 'null':
                 query = f"UPDATE {table} SET {field} = NULL"
 
             elif mask_type == 'hash':
-                if database_type == 'postgresql':
-                    query = f"UPDATE {table} SET {field} = MD5({field}::text)"
+                # SHA-256 hex, as hash_value
+                if postgres:
+                    query = f"UPDATE {table} SET {field} = encode(sha256(convert_to({field}::text, 'UTF8')), 'hex')"
                 else:
-                    query = f"UPDATE {table} SET {field} = MD5({field})"
+                    query = f"UPDATE {table} SET {field} = SHA2({field}, 256)"
+
+            elif mask_type == 'phone':
+                if postgres:
+                    # A fresh random digit per character, keeping the rest of the format
+                    query = (
+                        f"UPDATE {table} SET {field} = ("
+                        f"SELECT string_agg(CASE WHEN c ~ '[0-9]' "
+                        f"THEN floor(random() * 10)::int::text ELSE c END, '' ORDER BY n) "
+                        f"FROM regexp_split_to_table({field}::text, '') WITH ORDINALITY AS chars(c, n))"
+                    )
+                else:
+                    # MySQL evaluates RAND() once per row, so digits within a value repeat
+                    query = f"UPDATE {table} SET {field} = REGEXP_REPLACE({field}, '[0-9]', FLOOR(RAND() * 10))"
+
+            elif mask_type == 'ssn':
+                if postgres:
+                    query = (
+                        f"UPDATE {table} SET {field} = "
+                        f"lpad(floor(random() * 1000)::int::text, 3, '0') || '-' || "
+                        f"lpad(floor(random() * 100)::int::text, 2, '0') || '-' || "
+                        f"lpad(floor(random() * 10000)::int::text, 4, '0')"
+                    )
+                else:
+                    query = (
+                        f"UPDATE {table} SET {field} = CONCAT("
+                        f"LPAD(FLOOR(RAND() * 1000), 3, '0'), '-', "
+                        f"LPAD(FLOOR(RAND() * 100), 2, '0'), '-', "
+                        f"LPAD(FLOOR(RAND() * 10000), 4, '0'))"
+                    )
+
+            elif mask_type == 'credit_card':
+                if postgres:
+                    query = (
+                        f"UPDATE {table} SET {field} = CASE WHEN length({field}) < 10 THEN '****' "
+                        f"ELSE left({field}, 6) || repeat('*', length({field}) - 10) || right({field}, 4) END"
+                    )
+                else:
+                    query = (
+                        f"UPDATE {table} SET {field} = CASE WHEN CHAR_LENGTH({field}) < 10 THEN '****' "
+                        f"ELSE CONCAT(LEFT({field}, 6), REPEAT('*', CHAR_LENGTH({field}) - 10), "
+                        f"RIGHT({field}, 4)) END"
+                    )
 
             elif mask_type == 'randomize':
-                # This would need a custom function in the database
-                continue
+                # Random alphanumerics (hex digits) of the same length
+                if postgres:
+                    query = (
+                        f"UPDATE {table} SET {field} = left(repeat(md5(random()::text), "
+                        f"length({field}::text) / 32 + 1), length({field}::text))"
+                    )
+                else:
+                    query = (
+                        f"UPDATE {table} SET {field} = LEFT(REPEAT(MD5(RAND()), "
+                        f"CHAR_LENGTH({field}) DIV 32 + 1), CHAR_LENGTH({field}))"
+                    )
+
+            elif mask_type == 'name':
+                # Pick the fake name from the value's hash, so equal names stay equal
+                first = ", ".join(f"'{n}'" for n in DataMaskingService._FIRST_NAMES)
+                last = ", ".join(f"'{n}'" for n in DataMaskingService._LAST_NAMES)
+                if postgres:
+                    digest = f"decode(md5({field}::text), 'hex')"
+                    query = (
+                        f"UPDATE {table} SET {field} = "
+                        f"(ARRAY[{first}])[get_byte({digest}, 0) % {len(DataMaskingService._FIRST_NAMES)} + 1] "
+                        f"|| ' ' || "
+                        f"(ARRAY[{last}])[get_byte({digest}, 1) % {len(DataMaskingService._LAST_NAMES)} + 1]"
+                    )
+                else:
+                    query = (
+                        f"UPDATE {table} SET {field} = CONCAT("
+                        f"ELT(CONV(SUBSTR(MD5({field}), 1, 2), 16, 10) % {len(DataMaskingService._FIRST_NAMES)} + 1, {first}), "
+                        f"' ', "
+                        f"ELT(CONV(SUBSTR(MD5({field}), 3, 2), 16, 10) % {len(DataMaskingService._LAST_NAMES)} + 1, {last}))"
+                    )
+
+            elif mask_type == 'address':
+                streets = ", ".join(f"'{n}'" for n in DataMaskingService._STREETS)
+                count = len(DataMaskingService._STREETS)
+                if postgres:
+                    digest = f"decode(md5({field}::text), 'hex')"
+                    query = (
+                        f"UPDATE {table} SET {field} = "
+                        f"((get_byte({digest}, 2) * 256 + get_byte({digest}, 3)) % 9900 + 100)::text || ' ' || "
+                        f"(ARRAY[{streets}])[get_byte({digest}, 4) % {count} + 1]"
+                    )
+                else:
+                    query = (
+                        f"UPDATE {table} SET {field} = CONCAT("
+                        f"CONV(SUBSTR(MD5({field}), 5, 4), 16, 10) % 9900 + 100, ' ', "
+                        f"ELT(CONV(SUBSTR(MD5({field}), 9, 2), 16, 10) % {count} + 1, {streets}))"
+                    )
 
             else:
-                # Skip complex masking that requires application logic
+                # Unknown mask type
                 continue
 
             queries.append(query)
 
         return queries
+
+
+# Mask type -> function of the field's string value
+_MASKERS: Dict[str, Callable[[str], Any]] = {
+    'email': DataMaskingService.mask_email,
+    'phone': DataMaskingService.mask_phone,
+    'ssn': DataMaskingService.mask_ssn,
+    'credit_card': DataMaskingService.mask_credit_card,
+    'name': DataMaskingService.mask_name,
+    'address': DataMaskingService.mask_address,
+    'hash': DataMaskingService.hash_value,
+    'randomize': lambda value: DataMaskingService.randomize_string(len(value)),
+    'null': lambda value: None,
+}
+
+# Mask type -> column-wise masker, for the types that vectorize
+_SERIES_MASKERS: Dict[str, Callable[[pd.Series], pd.Series]] = {
+    'email': DataMaskingService.mask_email_series,
+    'phone': DataMaskingService.mask_phone_series,
+    'ssn': DataMaskingService.mask_ssn_series,
+    'credit_card': DataMaskingService.mask_credit_card_series,
+}
@@ -2,17 +2,29 @@
 Remote execution service for SSH, Docker, and Kubernetes
 """
 import asyncio
+import base64
 import logging
-from typing import Dict, Any, Optional, List
+import os
+import re
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Union
 from enum import Enum
+import orjson
 import paramiko
+import urllib3
 import docker
 from kubernetes import client, config
 from io import StringIO
+import select
 import shlex
+import shutil
+import threading
 
 from app.models.server import ServerType
-from app.core.security import decrypt_data
+from app.core.config import settings
+from app.core.security import decrypt_credentials, decrypt_data
 from app.core.validation import (
     validate_hostname,
     validate_port,
@@ -23,19 +35,123 @@ from app.core.validation import (
 
 logger = logging.getLogger(__name__)
 
+# Validators are pure functions of their input; failures raise and so are
+# never cached
+_validate_container_name = lru_cache(maxsize=1024)(validate_container_name)
+_validate_namespace = lru_cache(maxsize=1024)(validate_namespace)
+
+# Shell chaining/substitution that no validated command may contain
+_DANGEROUS_RE = re.compile(r'[;&\n\r`]|\$\(')
+
+# Names that may be passed in a command's env
+_ENV_NAME_RE = re.compile(r'\A[A-Za-z_][A-Za-z0-9_]*\Z')
+
+# Blocking paramiko work (handshakes, channel loops, SFTP transfers) runs on
+# its own threads; long transfers would otherwise fill the default executor
+# that asyncio.to_thread shares with everything else. Module-level, so it
+# outlives the per-task event loops of Celery workers.
+_ssh_threads = ThreadPoolExecutor(
+    max_workers=settings.SSH_THREAD_POOL_SIZE,
+    thread_name_prefix="ssh"
+)
+
+
+@lru_cache(maxsize=32)
+def _load_private_key(key_data: str) -> paramiko.PKey:
+    """
+    Parse a private key once; reconnects reuse the parsed key. Accepts
+    Ed25519, ECDSA and RSA keys.
+    """
+    for key_class in (paramiko.Ed25519Key, paramiko.ECDSAKey, paramiko.RSAKey):
+        try:
+            return key_class.from_private_key(StringIO(key_data))
+        except paramiko.SSHException:
+            continue
+    raise paramiko.SSHException("Unsupported or invalid private key")
+
+
+def _in_ssh_thread(func, *args):
+    """Run a blocking SSH call on the SSH thread pool"""
+    return asyncio.get_running_loop().run_in_executor(_ssh_threads, func, *args)
+
+
+class _DecodedOutput:
+    """
+    Command output attribute that accepts str or bytes. Bytes are decoded
+    (UTF-8, invalid sequences replaced) on first read, so callers that only
+    check the exit code never pay for decoding large outputs.
+    """
+
+    def __set_name__(self, owner, name):
+        self.attr = f"_{name}"
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        value = getattr(obj, self.attr)
+        if not isinstance(value, str):
+            value = bytes(value).decode("utf-8", "replace")
+            setattr(obj, self.attr, value)
+        return value
+
+    def __set__(self, obj, value):
+        setattr(obj, self.attr, value)
+
 
 class ExecutionResult:
     """Execution result container"""
-    def __init__(self, success: bool, stdout: str = "", stderr: str = "", exit_code: int = 0):
+
+    stdout = _DecodedOutput()
+    stderr = _DecodedOutput()
+
+    def __init__(
+        self,
+        success: bool,
+        stdout: Union[str, bytes] = "",
+        stderr: Union[str, bytes] = "",
+        exit_code: int = 0
+    ):
         self.success = success
         self.stdout = stdout
         self.stderr = stderr
         self.exit_code = exit_code
+        # Set by backup engines whose output is already gzip-compressed
+        self.pre_compressed = False
+
+    @property
+    def stdout_bytes(self) -> bytes:
+        """stdout without decoding"""
+        value = self._stdout
+        return value.encode() if isinstance(value, str) else bytes(value)
 
 
 class SSHExecutor:
     """Execute commands via SSH"""
 
+    # Whitelist of allowed command prefixes for DB backup operations
+    ALLOWED_PREFIXES = (
+        'pg_dump', 'pg_restore', 'pg_basebackup', 'psql',
+        'mysqldump', 'mysql',
+        'mongodump', 'mongorestore',
+        'redis-cli',
+        'tar', 'gzip', 'gunzip', 'pigz', 'zstd', 'lz4',
+        'cat', 'ls', 'mkdir', 'rm', 'cp', 'mv',
+        'du', 'df', 'which', 'echo', 'test',
+    )
+
+    # Programs a command may pipe into, as in pg_dump | gzip
+    SAFE_PIPES = ('gzip', 'gunzip', 'pigz', 'zstd', 'lz4')
+
+    # Channel read sizes for stdout (also what stream() hands to the sink)
+    # and stderr
+    STREAM_CHUNK_SIZE = 1024 * 1024
+    READ_CHUNK_SIZE = 64 * 1024
+
+    # SFTP copy size, and the flow-control window of every channel
+    # (paramiko's 2 MiB default caps throughput on high-latency links)
+    SFTP_CHUNK_SIZE = 8 * 1024 * 1024
+    WINDOW_SIZE = 64 * 1024 * 1024
+
     def __init__(self, host: str, port: int, credentials: Dict[str, Any]):
         # Validate inputs to prevent injection attacks
         try:
@@ -48,88 +164,116 @@ class SSHExecutor:
         self.username = credentials.get("username")
         self.password = credentials.get("password")
         self.ssh_key = credentials.get("ssh_key")
+        # zlib on the transport: dumps are streamed uncompressed and shrink
+        # several times; servers on fast links can opt out per credential
+        compress = credentials.get("ssh_compression")
+        self.compress = settings.SSH_COMPRESSION if compress is None else bool(compress)
         self.client = None
+        # A threading lock: each Celery task runs its own event loop
+        self._connect_lock = threading.Lock()
+        self._sftp = None
+        self._sftp_lock = threading.Lock()
 
     async def connect(self) -> bool:
-        """Establish SSH connection"""
+        """Establish SSH connection (a no-op while the current one is alive)"""
         try:
-            self.client = paramiko.SSHClient()
-            self.client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+            await _in_ssh_thread(self._connect_blocking)
+            return True
+        except Exception as e:
+            logger.error(f"SSH connection failed to {self.host}: {e}")
+            return False
+
+    def _connect_blocking(self) -> None:
+        """
+        Connect under a lock, so commands started together on a pooled
+        executor share one handshake instead of racing to replace each
+        other's client. Every command then opens its own channel on the
+        shared transport.
+        """
+        with self._connect_lock:
+            if self.is_connected():
+                return
+
+            # Drop a stale connection before reconnecting
+            self.close()
+
+            client = paramiko.SSHClient()
+            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
 
             if self.ssh_key:
                 # Use SSH key authentication
-                key_file = StringIO(self.ssh_key)
-                pkey = paramiko.RSAKey.from_private_key(key_file)
-                await asyncio.to_thread(
-                    self.client.connect,
-                    self.host,
-                    port=self.port,
-                    username=self.username,
-                    pkey=pkey,
-                    timeout=10
+                pkey = _load_private_key(self.ssh_key)
+                client.connect(
+                    self.host, port=self.port, username=self.username, pkey=pkey,
+                    timeout=10, compress=self.compress
                 )
             else:
                 # Use password authentication
-                await asyncio.to_thread(
-                    self.client.connect,
-                    self.host,
-                    port=self.port,
-                    username=self.username,
-                    password=self.password,
-                    timeout=10
+                client.connect(
+                    self.host, port=self.port, username=self.username, password=self.password,
+                    timeout=10, compress=self.compress
                 )
 
+            transport = client.get_transport()
+            # Keep pooled connections from being dropped by idle timeouts
+            transport.set_keepalive(30)
+            # Applies to every channel (command or SFTP) opened from now on
+            transport.default_window_size = self.WINDOW_SIZE
+            self.client = client
+
             logger.info(f"SSH connection established to {self.host}")
-            return True
 
-        except Exception as e:
-            logger.error(f"SSH connection failed to {self.host}: {e}")
-            return False
+    def is_connected(self) -> bool:
+        """Check whether the SSH transport is still usable"""
+        transport = self.client.get_transport() if self.client else None
+        return transport is not None and transport.is_active()
 
-    def _validate_command(self, command: str) -> None:
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _validate_command(command: str) -> None:
         """
         Validate command for security.
-        Whitelist approach for allowed commands.
+        Whitelist approach for allowed commands. Only commands that pass
+        are cached; rejected ones raise, and are checked again every time.
         """
         if not command or not command.strip():
             raise ValidationError("Command cannot be empty")
 
-        # Whitelist of allowed command prefixes for DB backup operations
-        allowed_prefixes = [
-            'pg_dump', 'pg_restore', 'pg_basebackup', 'psql',
-            'mysqldump', 'mysql',
-            'mongodump', 'mongorestore',
-            'redis-cli',
-            'tar', 'gzip', 'gunzip', 'zstd', 'lz4',
-            'cat', 'ls', 'mkdir', 'rm', 'cp', 'mv',
-            'du', 'df', 'which', 'echo', 'test',
-        ]
-
         command_base = command.strip().split()[0]
 
         # Check if command starts with allowed prefix
-        if not any(command_base.startswith(prefix) for prefix in allowed_prefixes):
+        if not command_base.startswith(SSHExecutor.ALLOWED_PREFIXES):
             logger.warning(f"Command not in whitelist: {command_base}")
             raise ValidationError(f"Command not allowed: {command_base}")
 
         # Check for command chaining attempts
-        dangerous_patterns = [';', '|', '&', '\n', '\r', '$(', '`']
         # Allow pipes for specific safe cases like pg_dump | gzip
-        safe_pipes = ['gzip', 'gunzip', 'zstd', 'lz4']
         if '|' in command:
             parts = command.split('|')
             for part in parts[1:]:  # Check piped commands
-                piped_cmd = part.strip().split()[0]
-                if not any(piped_cmd.startswith(safe) for safe in safe_pipes):
+                piped_cmd = part.strip().split()[0] if part.strip() else ""
+                if not piped_cmd.startswith(SSHExecutor.SAFE_PIPES):
                     raise ValidationError(f"Unsafe pipe command: {piped_cmd}")
 
         # Check for other dangerous patterns
-        for pattern in [';', '&', '\n', '\r', '$(', '`']:
-            if pattern in command:
-                raise ValidationError(f"Command contains dangerous pattern: {pattern}")
+        match = _DANGEROUS_RE.search(command)
+        if match:
+            raise ValidationError(f"Command contains dangerous pattern: {match.group()}")
 
-    async def execute(self, command: str, timeout: int = 300) -> ExecutionResult:
-        """Execute command via SSH with security validation"""
+    async def execute(
+        self,
+        command: str,
+        timeout: int = 300,
+        env: Optional[Dict[str, str]] = None,
+        pipefail: bool = False
+    ) -> ExecutionResult:
+        """
+        Execute command via SSH with security validation.
+
+        With pipefail, a pipeline fails if any stage fails, rather than
+        taking the last stage's exit status. The command then runs under
+        bash, since the login shell may be one without pipefail (dash).
+        """
         # Validate command before execution
         try:
             self._validate_command(command)
@@ -137,58 +281,328 @@ class SSHExecutor:
             logger.error(f"Command validation failed: {e}")
             return ExecutionResult(False, stderr=f"Command validation failed: {e}")
 
-        if not self.client:
+        if pipefail:
+            command = f"bash -o pipefail -c {shlex.quote(command)}"
+        return await self._exec(command, timeout, env)
+
+    async def run(
+        self,
+        argv: List[str],
+        env: Optional[Dict[str, str]] = None,
+        timeout: int = 300
+    ) -> ExecutionResult:
+        """
+        Execute a program with an argument list.
+
+        Every argument is shell-quoted, so only the program itself is
+        checked against the whitelist. Secrets go in env rather than argv,
+        which keeps them out of the remote process list (see _start).
+        """
+        if not argv or not argv[0].startswith(self.ALLOWED_PREFIXES):
+            logger.error(f"Command validation failed: {argv[:1]}")
+            return ExecutionResult(False, stderr=f"Command not allowed: {argv[0] if argv else ''}")
+
+        return await self._exec(shlex.join(argv), timeout, env)
+
+    async def _exec(
+        self,
+        command: str,
+        timeout: int,
+        env: Optional[Dict[str, str]]
+    ) -> ExecutionResult:
+        """Run a validated command line on the remote host"""
+        if not self.is_connected():
             if not await self.connect():
                 return ExecutionResult(False, stderr="Connection failed")
 
         try:
             logger.info(f"Executing SSH command: {command[:100]}...")  # Log first 100 chars
 
-            stdin, stdout, stderr = await asyncio.to_thread(
-                self.client.exec_command,
-                command,
-                timeout=timeout
-            )
+            channel = await _in_ssh_thread(self._open_channel, command, env)
+            try:
+                return await self._collect(channel, timeout)
+            finally:
+                channel.close()
+
+        except Exception as e:
+            logger.error(f"SSH command execution failed: {e}")
+            return ExecutionResult(False, stderr=str(e))
+
+    def _open_channel(self, command: str, env: Optional[Dict[str, str]]) -> paramiko.Channel:
+        """Open a channel and start command on it"""
+        channel = self.client.get_transport().open_session()
+        try:
+            self._start(channel, command, env)
+        except Exception:
+            channel.close()
+            raise
+        return channel
+
+    @staticmethod
+    def _start(channel: paramiko.Channel, command: str, env: Optional[Dict[str, str]]):
+        """
+        Start command on channel with env set for it.
+
+        The values are written to the command's stdin, one line each, and
+        read into exported variables by the remote shell before the command
+        runs. SSH env requests are not used: sshd silently drops any name
+        its AcceptEnv does not list, and the command would then run without
+        its password. The command line, visible in the remote process list,
+        only carries the variable names.
+        """
+        if not env:
+            channel.exec_command(command)
+            return
+
+        for name, value in env.items():
+            if not _ENV_NAME_RE.match(name):
+                raise ValueError(f"Invalid environment variable name: {name!r}")
+            if '\n' in value or '\r' in value:
+                raise ValueError(f"Environment variable {name} contains a line break")
+
+        prefix = "".join(f"IFS= read -r {name} && export {name} && " for name in env)
+        channel.exec_command(prefix + command)
+        channel.sendall("".join(f"{value}\n" for value in env.values()).encode())
+        # None of the commands read stdin; EOF keeps them from waiting on it
+        channel.shutdown_write()
+
+    async def _collect(self, channel: paramiko.Channel, timeout: Optional[float]) -> ExecutionResult:
+        """
+        Gather a running command's output on the event loop. The channel's
+        fileno() becomes readable whenever the transport thread buffers
+        data or the channel closes, so no thread waits on the command.
+        timeout bounds how long the command may go without output.
+        """
+        loop = asyncio.get_running_loop()
+        activity = asyncio.Event()
+        stdout = bytearray()
+        stderr = bytearray()
+        finished = False
+
+        def drain():
+            nonlocal finished
+            while channel.recv_ready():
+                stdout.extend(channel.recv(self.STREAM_CHUNK_SIZE))
+            while channel.recv_stderr_ready():
+                stderr.extend(channel.recv_stderr(self.READ_CHUNK_SIZE))
+            # The exit status follows all output, which is now read
+            finished = channel.exit_status_ready() or channel.closed
+            activity.set()
+
+        fd = channel.fileno()
+        loop.add_reader(fd, drain)
+        try:
+            drain()
+            while not finished:
+                activity.clear()
+                try:
+                    await asyncio.wait_for(activity.wait(), timeout)
+                except asyncio.TimeoutError:
+                    raise TimeoutError(f"No output for {timeout}s")
+        finally:
+            loop.remove_reader(fd)
+
+        exit_code = channel.exit_status if channel.exit_status_ready() else -1
+        return ExecutionResult(
+            success=exit_code == 0,
+            stdout=stdout,
+            stderr=stderr,
+            exit_code=exit_code
+        )
+
+    async def stream(
+        self,
+        argv: List[str],
+        sink,
+        env: Optional[Dict[str, str]] = None
+    ) -> ExecutionResult:
+        """
+        Execute a program (as run() does) and write its stdout to sink as it
+        arrives, instead of collecting it in memory. stdout of the result is
+        left empty.
+        """
+        if not argv or not argv[0].startswith(self.ALLOWED_PREFIXES):
+            logger.error(f"Command validation failed: {argv[:1]}")
+            return ExecutionResult(False, stderr=f"Command not allowed: {argv[0] if argv else ''}")
 
-            stdout_text = await asyncio.to_thread(stdout.read)
-            stderr_text = await asyncio.to_thread(stderr.read)
-            exit_code = stdout.channel.recv_exit_status()
+        if not self.is_connected():
+            if not await self.connect():
+                return ExecutionResult(False, stderr="Connection failed")
 
+        command = shlex.join(argv)
+        try:
+            logger.info(f"Streaming SSH command: {command[:100]}...")
+            return await _in_ssh_thread(self._run_channel, command, sink.write, env)
+        except Exception as e:
+            logger.error(f"SSH command streaming failed: {e}")
+            return ExecutionResult(False, stderr=str(e))
+
+    async def stream_command_to_file(
+        self,
+        argv: List[str],
+        local_path: str,
+        env: Optional[Dict[str, str]] = None
+    ) -> ExecutionResult:
+        """
+        Execute a program and write its stdout straight to local_path, so a
+        dump never lands on the remote disk and needs no SFTP download.
+        The file is removed if the command fails.
+        """
+        with open(local_path, 'wb') as f:
+            result = await self.stream(argv, f, env)
+
+        if result.success:
+            logger.info(f"Streamed {argv[0]} output to {local_path} ({os.path.getsize(local_path)} bytes)")
+        elif os.path.exists(local_path):
+            os.remove(local_path)
+        return result
+
+    def _run_channel(
+        self,
+        command: str,
+        write,
+        env: Optional[Dict[str, str]],
+        timeout: Optional[float] = None
+    ) -> ExecutionResult:
+        """
+        Run a command on its own channel, passing stdout chunks to write and
+        collecting stderr (runs in a worker thread, as write may be slow). stdout and stderr are
+        drained together, so neither can fill its window and stall the
+        other. timeout bounds how long the command may go without output.
+        """
+        channel = self.client.get_transport().open_session()
+        try:
+            self._start(channel, command, env)
+
+            stderr = bytearray()
+            while True:
+                if channel.recv_ready():
+                    write(channel.recv(self.STREAM_CHUNK_SIZE))
+                elif channel.recv_stderr_ready():
+                    stderr += channel.recv_stderr(self.READ_CHUNK_SIZE)
+                elif channel.exit_status_ready():
+                    # The exit status follows all output, which is now read
+                    break
+                elif not select.select([channel], [], [], timeout)[0]:
+                    raise TimeoutError(f"No output for {timeout}s")
+
+            exit_code = channel.recv_exit_status()
             return ExecutionResult(
                 success=exit_code == 0,
-                stdout=stdout_text.decode(),
-                stderr=stderr_text.decode(),
+                stderr=stderr,
                 exit_code=exit_code
             )
-
-        except Exception as e:
-            logger.error(f"SSH command execution failed: {e}")
-            return ExecutionResult(False, stderr=str(e))
+        finally:
+            channel.close()
 
     async def upload_file(self, local_path: str, remote_path: str) -> bool:
         """Upload file via SFTP"""
+        if not self.is_connected() and not await self.connect():
+            return False
         try:
-            sftp = await asyncio.to_thread(self.client.open_sftp)
-            await asyncio.to_thread(sftp.put, local_path, remote_path)
-            await asyncio.to_thread(sftp.close)
+            await _in_ssh_thread(self._upload_blocking, local_path, remote_path)
             return True
         except Exception as e:
             logger.error(f"File upload failed: {e}")
             return False
 
     async def download_file(self, remote_path: str, local_path: str) -> bool:
-        """Download file via SFTP"""
+        """Download file via SFTP (in parallel segments when it is large)"""
+        if not self.is_connected() and not await self.connect():
+            return False
+        try:
+            size = await _in_ssh_thread(self._remote_size, remote_path)
+            if settings.SFTP_PARALLEL_STREAMS > 1 and size >= settings.SFTP_PARALLEL_MIN_SIZE:
+                await self._download_parallel(remote_path, local_path, size, settings.SFTP_PARALLEL_STREAMS)
+                return True
+            await _in_ssh_thread(self._download_blocking, remote_path, local_path)
+            return True
+        except Exception as e:
+            logger.error(f"File download failed: {e}")
+            return False
+
+    async def download_file_parallel(self, remote_path: str, local_path: str, num_streams: int = 4) -> bool:
+        """
+        Download a file as num_streams byte ranges, each over its own SFTP
+        channel on the shared transport. A single stream is bounded by
+        round trips; several together can fill a high-latency link.
+        """
+        if not self.is_connected() and not await self.connect():
+            return False
         try:
-            sftp = await asyncio.to_thread(self.client.open_sftp)
-            await asyncio.to_thread(sftp.get, remote_path, local_path)
-            await asyncio.to_thread(sftp.close)
+            size = await _in_ssh_thread(self._remote_size, remote_path)
+            await self._download_parallel(remote_path, local_path, size, num_streams)
             return True
         except Exception as e:
             logger.error(f"File download failed: {e}")
             return False
 
+    async def _download_parallel(self, remote_path: str, local_path: str, size: int, num_streams: int) -> None:
+        segment = -(-size // num_streams) if size else 0
+
+        fd = os.open(local_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            if size and hasattr(os, 'posix_fallocate'):
+                os.posix_fallocate(fd, 0, size)
+            await asyncio.gather(*(
+                _in_ssh_thread(self._download_range, remote_path, fd, start, min(start + segment, size))
+                for start in range(0, size, segment or 1)
+            ))
+        finally:
+            os.close(fd)
+
+        logger.info(f"Downloaded {remote_path} ({size} bytes, {num_streams} streams)")
+
+    def _upload_blocking(self, local_path: str, remote_path: str) -> None:
+        """
+        Pipelined upload: writes are sent without waiting for each
+        acknowledgement, so throughput is not capped at one request per RTT
+        """
+        sftp = self._sftp_session()
+        with open(local_path, 'rb') as f_in, sftp.open(remote_path, 'wb') as f_out:
+            f_out.set_pipelined(True)
+            shutil.copyfileobj(f_in, f_out, self.SFTP_CHUNK_SIZE)
+
+    def _remote_size(self, remote_path: str) -> int:
+        return self._sftp_session().stat(remote_path).st_size
+
+    def _download_range(self, remote_path: str, fd: int, start: int, end: int) -> None:
+        """Copy bytes [start, end) of a remote file to the same offsets of fd"""
+        # Each range gets its own SFTP channel (and flow-control window),
+        # which is the point of splitting the download
+        with self.client.open_sftp() as sftp, sftp.open(remote_path, 'rb') as f_in:
+            f_in.seek(start)
+            # Read-ahead up to the end of this range only
+            f_in.prefetch(end)
+            offset = start
+            while offset < end:
+                data = f_in.read(min(self.SFTP_CHUNK_SIZE, end - offset))
+                if not data:
+                    raise IOError(f"{remote_path} ended at {offset}, expected {end} bytes")
+                os.pwrite(fd, data, offset)
+                offset += len(data)
+
+    def _download_blocking(self, remote_path: str, local_path: str) -> None:
+        """Download with read-ahead: all read requests are issued up front"""
+        sftp = self._sftp_session()
+        with sftp.open(remote_path, 'rb') as f_in, open(local_path, 'wb') as f_out:
+            f_in.prefetch(sftp.stat(remote_path).st_size)
+            shutil.copyfileobj(f_in, f_out, self.SFTP_CHUNK_SIZE)
+
+    def _sftp_session(self) -> paramiko.SFTPClient:
+        """
+        SFTP session shared by transfers on this connection, opened on
+        first use; saves the channel open and SFTP handshake per file
+        """
+        with self._sftp_lock:
+            if self._sftp is None or self._sftp.sock.closed:
+                self._sftp = self.client.open_sftp()
+            return self._sftp
+
     def close(self):
         """Close SSH connection"""
+        # The SFTP session's channel closes with the transport
+        self._sftp = None
         if self.client:
             self.client.close()
 
@@ -196,6 +610,25 @@ class SSHExecutor:
 class DockerExecutor:
     """Execute commands in Docker containers"""
 
+    # Similar whitelist as SSH but for Docker context
+    ALLOWED_PREFIXES = (
+        'pg_dump', 'pg_restore', 'psql',
+        'mysqldump', 'mysql',
+        'mongodump', 'mongorestore',
+        'redis-cli',
+        'tar', 'gzip', 'gunzip', 'pigz', 'zstd', 'lz4',
+        'cat', 'ls', 'echo', 'sh', 'bash',  # sh/bash needed for Docker exec
+    )
+
+    # Read size for copy_from_container
+    COPY_CHUNK_SIZE = 4 * 1024 * 1024
+
+    # One client per daemon URL, shared by every executor for that host
+    # (the client holds no credentials, so keys that differ only in
+    # credentials still share it)
+    _clients: Dict[str, "docker.DockerClient"] = {}
+    _clients_lock = threading.Lock()
+
     def __init__(self, host: str, credentials: Dict[str, Any]):
         # Validate host
         try:
@@ -205,44 +638,59 @@ class DockerExecutor:
             raise ValueError(f"Invalid Docker host: {e}")
 
         base_url = f"tcp://{host}:2375" if host != "localhost" else "unix://var/run/docker.sock"
-        self.client = docker.DockerClient(base_url=base_url)
+        self.client = self._client_for(base_url)
+
+    @classmethod
+    def _client_for(cls, base_url: str) -> "docker.DockerClient":
+        with cls._clients_lock:
+            client = cls._clients.get(base_url)
+            if client is None:
+                client = cls._clients[base_url] = docker.DockerClient(base_url=base_url, timeout=60)
+            return client
+
+    @classmethod
+    def close_clients(cls):
+        """Close the shared Docker clients"""
+        with cls._clients_lock:
+            while cls._clients:
+                _, client = cls._clients.popitem()
+                client.close()
 
     def _validate_command(self, command: str) -> None:
         """Validate Docker exec command"""
-        if not command or not command.strip():
-            raise ValidationError("Command cannot be empty")
+        if isinstance(command, list):
+            command = tuple(command)
+        elif not isinstance(command, str):
+            raise ValidationError("Invalid command format")
+        self._check_command(command)
 
-        # Similar whitelist as SSH but for Docker context
-        allowed_prefixes = [
-            'pg_dump', 'pg_restore', 'psql',
-            'mysqldump', 'mysql',
-            'mongodump', 'mongorestore',
-            'redis-cli',
-            'tar', 'gzip', 'gunzip', 'zstd', 'lz4',
-            'cat', 'ls', 'echo', 'sh', 'bash',  # sh/bash needed for Docker exec
-        ]
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _check_command(command) -> None:
+        """Validate a str or tuple command; only passing commands are cached"""
+        if not command or (isinstance(command, str) and not command.strip()):
+            raise ValidationError("Command cannot be empty")
 
         if isinstance(command, str):
             command_base = command.strip().split()[0]
-        elif isinstance(command, list):
-            command_base = command[0] if command else ""
         else:
-            raise ValidationError("Invalid command format")
+            command_base = command[0]
 
-        if not any(command_base.startswith(prefix) for prefix in allowed_prefixes):
+        if not command_base.startswith(DockerExecutor.ALLOWED_PREFIXES):
             raise ValidationError(f"Command not allowed: {command_base}")
 
-        # Check for dangerous patterns in string commands
+        # Check for dangerous patterns in string commands (pipes are allowed
+        # for compression)
         if isinstance(command, str):
-            for pattern in [';', '&', '\n', '\r', '$(', '`']:
-                if pattern in command and pattern != '|':  # Allow pipes for compression
-                    raise ValidationError(f"Command contains dangerous pattern: {pattern}")
+            match = _DANGEROUS_RE.search(command)
+            if match:
+                raise ValidationError(f"Command contains dangerous pattern: {match.group()}")
 
     async def execute(self, container: str, command: str) -> ExecutionResult:
         """Execute command in Docker container with validation"""
         # Validate container name
         try:
-            validate_container_name(container)
+            _validate_container_name(container)
             self._validate_command(command)
         except ValidationError as e:
             logger.error(f"Docker validation failed: {e}")
@@ -263,7 +711,7 @@ class DockerExecutor:
 
             return ExecutionResult(
                 success=result.exit_code == 0,
-                stdout=result.output.decode() if result.output else "",
+                stdout=result.output or b"",
                 exit_code=result.exit_code
             )
 
@@ -276,13 +724,17 @@ class DockerExecutor:
     async def list_containers(self) -> List[Dict[str, Any]]:
         """List all containers"""
         try:
-            containers = await asyncio.to_thread(self.client.containers.list, all=True)
+            # One /containers/json call; the high-level containers.list()
+            # also inspects every container and its image separately
+            containers = await asyncio.to_thread(self.client.api.containers, all=True)
             return [
                 {
-                    "id": c.id[:12],
-                    "name": c.name,
-                    "status": c.status,
-                    "image": c.image.tags[0] if c.image.tags else c.image.id
+                    "id": c["Id"][:12],
+                    "name": c["Names"][0].lstrip("/") if c.get("Names") else "",
+                    "status": c["State"],
+                    # The image reference the container was created from
+                    # (a tag, or an image ID)
+                    "image": c["Image"]
                 }
                 for c in containers
             ]
@@ -293,58 +745,113 @@ class DockerExecutor:
     async def copy_from_container(self, container: str, src_path: str, dest_path: str) -> bool:
         """Copy file from container"""
         try:
-            container_obj = await asyncio.to_thread(self.client.containers.get, container)
-            bits, stat = await asyncio.to_thread(container_obj.get_archive, src_path)
-
-            with open(dest_path, 'wb') as f:
-                for chunk in bits:
-                    f.write(chunk)
+            await asyncio.to_thread(self._copy_from_container_blocking, container, src_path, dest_path)
             return True
         except Exception as e:
             logger.error(f"Failed to copy from container: {e}")
             return False
 
+    def _copy_from_container_blocking(self, container: str, src_path: str, dest_path: str) -> None:
+        """
+        Write the container's tar stream to dest_path in one worker thread;
+        iterating the response in the event loop would block it for the
+        whole copy
+        """
+        container_obj = self.client.containers.get(container)
+        # The response is read in COPY_CHUNK_SIZE pieces (docker-py defaults to 2 MiB)
+        bits, stat = container_obj.get_archive(src_path, chunk_size=self.COPY_CHUNK_SIZE)
+        with open(dest_path, 'wb') as f:
+            for chunk in bits:
+                f.write(chunk)
+
+    def close(self):
+        """Nothing to close; the Docker client is shared (see close_clients)"""
+
 
 class KubernetesExecutor:
     """Execute commands in Kubernetes pods"""
 
+    # Whitelist of allowed commands
+    ALLOWED_PREFIXES = (
+        'pg_dump', 'pg_restore', 'psql',
+        'mysqldump', 'mysql',
+        'mongodump', 'mongorestore',
+        'redis-cli',
+        'tar', 'gzip', 'gunzip', 'pigz', 'zstd', 'lz4',
+        'cat', 'base64', 'ls', 'echo', 'sh', 'bash',
+    )
+
+    # Pods per list request
+    LIST_PAGE_SIZE = 500
+
+    # One ApiClient (and so one urllib3 pool) per kubeconfig, shared by
+    # every executor using it; None is the in-cluster service account
+    _api_clients: Dict[Optional[str], "client.ApiClient"] = {}
+    _api_clients_lock = threading.Lock()
+    CONNECTION_POOL_SIZE = 64
+
     def __init__(self, kubeconfig_path: Optional[str] = None):
         try:
-            if kubeconfig_path:
-                config.load_kube_config(config_file=kubeconfig_path)
-            else:
-                config.load_incluster_config()
-
-            self.core_v1 = client.CoreV1Api()
-            self.apps_v1 = client.AppsV1Api()
+            api_client = self._api_client_for(kubeconfig_path)
+            self.core_v1 = client.CoreV1Api(api_client)
+            self.apps_v1 = client.AppsV1Api(api_client)
         except Exception as e:
             logger.error(f"Failed to initialize Kubernetes client: {e}")
             raise
 
+    @classmethod
+    def _api_client_for(cls, kubeconfig_path: Optional[str]) -> "client.ApiClient":
+        with cls._api_clients_lock:
+            api_client = cls._api_clients.get(kubeconfig_path)
+            if api_client is None:
+                # Load into a private Configuration rather than the global
+                # default, since executors may use different clusters
+                configuration = client.Configuration()
+                if kubeconfig_path:
+                    config.load_kube_config(config_file=kubeconfig_path, client_configuration=configuration)
+                else:
+                    config.load_incluster_config(client_configuration=configuration)
+                configuration.connection_pool_maxsize = cls.CONNECTION_POOL_SIZE
+                configuration.retries = urllib3.Retry(total=3, backoff_factor=0.2)
+                api_client = cls._api_clients[kubeconfig_path] = client.ApiClient(configuration)
+            return api_client
+
+    def _exec_api(self) -> "client.CoreV1Api":
+        """
+        API for a single exec call. kubernetes.stream.stream swaps the
+        request method on the ApiClient it is given while it runs, so exec
+        must not share the pooled client with concurrent REST calls.
+        """
+        return client.CoreV1Api(client.ApiClient(self.core_v1.api_client.configuration))
+
+    @classmethod
+    def close_clients(cls):
+        """Close the shared API clients"""
+        with cls._api_clients_lock:
+            while cls._api_clients:
+                _, api_client = cls._api_clients.popitem()
+                api_client.close()
+
     def _validate_command(self, command: List[str]) -> None:
         """Validate Kubernetes exec command"""
         if not command or not isinstance(command, list):
             raise ValidationError("Command must be a non-empty list")
+        self._check_command(tuple(command))
 
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _check_command(command: tuple) -> None:
+        """Validate a command tuple; only passing commands are cached"""
         # Whitelist allowed commands
-        allowed_prefixes = [
-            'pg_dump', 'pg_restore', 'psql',
-            'mysqldump', 'mysql',
-            'mongodump', 'mongorestore',
-            'redis-cli',
-            'tar', 'gzip', 'gunzip', 'zstd', 'lz4',
-            'cat', 'ls', 'echo', 'sh', 'bash',
-        ]
-
         command_base = command[0]
-        if not any(command_base.startswith(prefix) for prefix in allowed_prefixes):
+        if not command_base.startswith(KubernetesExecutor.ALLOWED_PREFIXES):
             raise ValidationError(f"Command not allowed: {command_base}")
 
         # Check command arguments for injection attempts
         for arg in command:
-            for pattern in [';', '&', '$(', '`', '\n', '\r']:
-                if pattern in str(arg):
-                    raise ValidationError(f"Command argument contains dangerous pattern: {pattern}")
+            match = _DANGEROUS_RE.search(str(arg))
+            if match:
+                raise ValidationError(f"Command argument contains dangerous pattern: {match.group()}")
 
     async def execute(
         self,
@@ -356,10 +863,10 @@ class KubernetesExecutor:
         """Execute command in Kubernetes pod with validation"""
         # Validate inputs
         try:
-            validate_namespace(namespace)
+            _validate_namespace(namespace)
             self._validate_command(command)
             if container:
-                validate_container_name(container)
+                _validate_container_name(container)
         except ValidationError as e:
             logger.error(f"Kubernetes validation failed: {e}")
             return ExecutionResult(False, stderr=f"Validation failed: {e}")
@@ -369,18 +876,22 @@ class KubernetesExecutor:
 
             logger.info(f"Executing K8s command in {namespace}/{pod}: {command}")
 
-            resp = await asyncio.to_thread(
-                stream,
-                self.core_v1.connect_get_namespaced_pod_exec,
-                pod,
-                namespace,
-                command=command,
-                container=container,
-                stderr=True,
-                stdin=False,
-                stdout=True,
-                tty=False
-            )
+            exec_api = self._exec_api()
+            try:
+                resp = await asyncio.to_thread(
+                    stream,
+                    exec_api.connect_get_namespaced_pod_exec,
+                    pod,
+                    namespace,
+                    command=command,
+                    container=container,
+                    stderr=True,
+                    stdin=False,
+                    stdout=True,
+                    tty=False
+                )
+            finally:
+                exec_api.api_client.close()
 
             return ExecutionResult(
                 success=True,
@@ -394,24 +905,47 @@ class KubernetesExecutor:
     async def list_pods(self, namespace: str = "default") -> List[Dict[str, Any]]:
         """List pods in namespace"""
         try:
-            pods = await asyncio.to_thread(
-                self.core_v1.list_namespaced_pod,
-                namespace
-            )
-
-            return [
-                {
-                    "name": pod.metadata.name,
-                    "namespace": pod.metadata.namespace,
-                    "status": pod.status.phase,
-                    "ip": pod.status.pod_ip
-                }
-                for pod in pods.items
-            ]
+            return await asyncio.to_thread(self._list_pods_blocking, namespace)
         except Exception as e:
             logger.error(f"Failed to list pods: {e}")
             return []
 
+    async def list_pods_multi(self, namespaces: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        List pods in several namespaces concurrently, over the shared
+        connection pool (CONNECTION_POOL_SIZE connections)
+        """
+        results = await asyncio.gather(*(self.list_pods(namespace) for namespace in namespaces))
+        return dict(zip(namespaces, results))
+
+    def _list_pods_blocking(self, namespace: str) -> List[Dict[str, Any]]:
+        """
+        Page through the namespace LIST_PAGE_SIZE pods at a time, parsing the
+        raw JSON with orjson rather than building the client's model objects
+        for the full pod specs when only four fields are used
+        """
+        pods = []
+        token = None
+        while True:
+            kwargs = {"limit": self.LIST_PAGE_SIZE, "_preload_content": False}
+            if token:
+                kwargs["_continue"] = token
+            page = orjson.loads(self.core_v1.list_namespaced_pod(namespace, **kwargs).data)
+
+            for pod in page.get("items", ()):
+                metadata = pod.get("metadata", {})
+                status = pod.get("status", {})
+                pods.append({
+                    "name": metadata.get("name"),
+                    "namespace": metadata.get("namespace"),
+                    "status": status.get("phase"),
+                    "ip": status.get("podIP")
+                })
+
+            token = page.get("metadata", {}).get("continue")
+            if not token:
+                return pods
+
     async def copy_from_pod(
         self,
         namespace: str,
@@ -421,37 +955,128 @@ class KubernetesExecutor:
         container: Optional[str] = None
     ) -> bool:
         """Copy file from pod"""
+        command = ["base64", src_path]
         try:
-            # Use kubectl cp equivalent
-            command = ["cat", src_path]
-            result = await self.execute(namespace, pod, command, container)
-
-            if result.success:
-                with open(dest_path, 'w') as f:
-                    f.write(result.stdout)
-                return True
+            _validate_namespace(namespace)
+            self._validate_command(command)
+            if container:
+                _validate_container_name(container)
+        except ValidationError as e:
+            logger.error(f"Kubernetes validation failed: {e}")
             return False
+
+        try:
+            await asyncio.to_thread(self._copy_from_pod_blocking, namespace, pod, command, dest_path, container)
+            return True
         except Exception as e:
             logger.error(f"Failed to copy from pod: {e}")
             return False
 
+    def _copy_from_pod_blocking(
+        self,
+        namespace: str,
+        pod: str,
+        command: List[str],
+        dest_path: str,
+        container: Optional[str]
+    ) -> None:
+        """
+        Stream a file out of a pod as base64 and decode it to disk as it
+        arrives. The exec websocket client decodes all output as UTF-8, so
+        raw binary (cat, tar) would be corrupted; base64 survives that, and
+        only one read's worth is held in memory.
+        """
+        from kubernetes.stream import stream
+
+        exec_api = self._exec_api()
+        try:
+            resp = stream(
+                exec_api.connect_get_namespaced_pod_exec,
+                pod,
+                namespace,
+                command=command,
+                container=container,
+                stderr=True,
+                stdin=False,
+                stdout=True,
+                tty=False,
+                _preload_content=False
+            )
+            try:
+                stderr = []
+                pending = ""
+                with open(dest_path, 'wb') as f:
+                    while resp.is_open() or pending:
+                        resp.update(timeout=1)
+                        # Whatever is buffered once the socket closes is read too
+                        pending += "".join(resp.read_stdout(timeout=0).split()) if resp.peek_stdout() else ""
+                        stderr.append(resp.read_stderr(timeout=0) if resp.peek_stderr() else "")
+
+                        # Decode whole 4-character groups, keep the remainder
+                        usable = len(pending) if not resp.is_open() else len(pending) - len(pending) % 4
+                        if usable:
+                            f.write(base64.b64decode(pending[:usable]))
+                            pending = pending[usable:]
+
+                if resp.returncode != 0:
+                    raise RuntimeError("".join(stderr).strip() or f"base64 exited with {resp.returncode}")
+            finally:
+                resp.close()
+        finally:
+            exec_api.api_client.close()
+
+    def close(self):
+        """Nothing to close; the API client is shared (see close_clients)"""
+
 
 class ExecutorFactory:
-    """Factory for creating executors based on server type"""
+    """
+    Factory for creating executors based on server type.
 
-    @staticmethod
+    Executors are pooled per process and keyed by connection target and
+    credentials, so repeated tasks against the same server reuse the open
+    SSH/Docker/Kubernetes connection instead of reconnecting.
+    """
+
+    _pool: "OrderedDict[tuple, Any]" = OrderedDict()
+
+    @classmethod
     async def create_executor(
+        cls,
         server_type: ServerType,
         host: str,
         port: Optional[int],
         credentials_encrypted: str
     ):
-        """Create appropriate executor based on server type"""
-        from app.core.security import decrypt_dict
-        import json
+        """Get a pooled executor or create one based on server type"""
+        # Changed credentials produce a new key, retiring the old connection
+        key = (server_type, host, port, credentials_encrypted)
+
+        executor = cls._pool.get(key)
+        if executor is not None:
+            cls._pool.move_to_end(key)
+            return executor
+
+        executor = cls._create(server_type, host, port, credentials_encrypted)
+
+        cls._pool[key] = executor
+        while len(cls._pool) > settings.EXECUTOR_POOL_SIZE:
+            _, evicted = cls._pool.popitem(last=False)
+            cls._close(evicted)
 
-        # Decrypt credentials
-        credentials = decrypt_dict(json.loads(credentials_encrypted))
+        return executor
+
+    @staticmethod
+    def _create(
+        server_type: ServerType,
+        host: str,
+        port: Optional[int],
+        credentials_encrypted: str
+    ):
+        """Create appropriate executor based on server type"""
+        # Decrypt credentials (cached by ciphertext, shared with the tasks'
+        # own decrypt_credentials calls for the engine)
+        credentials = decrypt_credentials(credentials_encrypted)
 
         if server_type == ServerType.BARE_METAL:
             return SSHExecutor(host, port, credentials)
@@ -462,3 +1087,20 @@ class ExecutorFactory:
             return KubernetesExecutor(kubeconfig)
         else:
             raise ValueError(f"Unsupported server type: {server_type}")
+
+    @staticmethod
+    def _close(executor):
+        """Close an executor evicted from the pool"""
+        try:
+            executor.close()
+        except Exception as e:
+            logger.warning(f"Failed to close executor: {e}")
+
+    @classmethod
+    def close_all(cls):
+        """Close all pooled executors"""
+        while cls._pool:
+            _, executor = cls._pool.popitem()
+            cls._close(executor)
+        DockerExecutor.close_clients()
+        KubernetesExecutor.close_clients()
@@ -1,12 +1,16 @@
 """
 Notification service for Slack, Email, and Webhooks
 """
+import asyncio
 import logging
-import aiohttp
+from contextlib import asynccontextmanager
+import httpx
 import aiosmtplib
+import orjson
+import redis.asyncio as aioredis
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Dict, Any, Optional
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
 from jinja2 import Template
 
 from app.core.config import settings
@@ -14,40 +18,223 @@ from app.models.notification import NotificationType, NotificationEvent
 
 logger = logging.getLogger(__name__)
 
+# Redis list of pending Slack messages, drained by the notification dispatch task
+SLACK_QUEUE_KEY = "notifications:slack"
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def _slack_payload(text: str, messages: List[str]) -> bytes:
+    """
+    Encode a Slack webhook body with one mrkdwn section per message.
+    Posted as bytes, so the body is encoded once rather than through the
+    client's stdlib JSON encoder.
+    """
+    return orjson.dumps({
+        "text": text,
+        "blocks": [{"type": "section", "text": {"type": "mrkdwn", "text": message}} for message in messages]
+    })
+
+
+class SMTPConnectionPool:
+    """
+    Connected, logged-in SMTP clients, checked out one per message.
+
+    Idle clients are health-checked with NOOP on checkout and replaced if the
+    server has dropped them (e.g. "421 Timeout"); each client is retired
+    after max_messages sends.
+    """
+
+    def __init__(self, size: int, max_messages: int):
+        self.max_messages = max_messages
+        self._slots = asyncio.Semaphore(size)
+        # Most recently used first, so idle clients past the server timeout
+        # are the ones left to expire
+        self._idle: asyncio.LifoQueue = asyncio.LifoQueue()
+
+    @staticmethod
+    async def _connect() -> aiosmtplib.SMTP:
+        smtp = aiosmtplib.SMTP(
+            hostname=settings.SMTP_HOST,
+            port=settings.SMTP_PORT,
+            use_tls=settings.SMTP_USE_TLS
+        )
+        await smtp.connect()
+        if settings.SMTP_USER:
+            await smtp.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+        return smtp
+
+    @staticmethod
+    async def _quit(smtp: aiosmtplib.SMTP):
+        try:
+            await smtp.quit()
+        except Exception:
+            smtp.close()
+
+    async def _checkout(self) -> Tuple[aiosmtplib.SMTP, int]:
+        while not self._idle.empty():
+            smtp, sent = self._idle.get_nowait()
+            try:
+                await smtp.noop()
+                return smtp, sent
+            except aiosmtplib.SMTPException:
+                smtp.close()
+        return await self._connect(), 0
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[aiosmtplib.SMTP]:
+        """Check out a client for one message"""
+        async with self._slots:
+            smtp, sent = await self._checkout()
+            try:
+                yield smtp
+            except BaseException:
+                # The session may be mid-transaction; don't hand it out again
+                smtp.close()
+                raise
+
+            sent += 1
+            if sent >= self.max_messages:
+                await self._quit(smtp)
+            else:
+                self._idle.put_nowait((smtp, sent))
+
+    async def close(self):
+        """QUIT all idle clients"""
+        while not self._idle.empty():
+            smtp, _ = self._idle.get_nowait()
+            await self._quit(smtp)
+
+
+# Shared HTTP client and SMTP pool, so notifications reuse open connections
+# instead of a new TCP + TLS handshake (and SMTP login) each; over HTTP/2,
+# concurrent posts to one host share a single connection. Both belong to
+# the event loop that created them; Celery tasks each run a fresh loop and
+# close them when they finish (see run_async).
+_session: Optional[httpx.AsyncClient] = None
+_session_loop: Optional[asyncio.AbstractEventLoop] = None
+_smtp_pool: Optional[SMTPConnectionPool] = None
+_smtp_pool_loop: Optional[asyncio.AbstractEventLoop] = None
+
 
 class NotificationService:
     """Service for sending notifications"""
 
+    @staticmethod
+    def _get_session() -> httpx.AsyncClient:
+        """The shared HTTP client, created on first use in this event loop"""
+        global _session, _session_loop
+        loop = asyncio.get_running_loop()
+        if _session is None or _session.is_closed or _session_loop is not loop:
+            _session = httpx.AsyncClient(
+                http2=True,
+                timeout=10,
+                limits=httpx.Limits(
+                    max_connections=100,
+                    max_keepalive_connections=50,
+                    keepalive_expiry=75
+                )
+            )
+            _session_loop = loop
+        return _session
+
+    @staticmethod
+    def _get_smtp_pool() -> SMTPConnectionPool:
+        """The shared SMTP pool, created on first use in this event loop"""
+        global _smtp_pool, _smtp_pool_loop
+        loop = asyncio.get_running_loop()
+        if _smtp_pool is None or _smtp_pool_loop is not loop:
+            _smtp_pool = SMTPConnectionPool(settings.SMTP_POOL_SIZE, settings.SMTP_MAX_MESSAGES_PER_CONNECTION)
+            _smtp_pool_loop = loop
+        return _smtp_pool
+
+    @staticmethod
+    async def close_connections():
+        """Close the shared HTTP client and SMTP pool, if open in this event loop"""
+        global _session, _session_loop, _smtp_pool, _smtp_pool_loop
+        running = asyncio.get_running_loop()
+
+        session, loop = _session, _session_loop
+        _session = _session_loop = None
+        if session is not None and not session.is_closed and loop is running:
+            await session.aclose()
+
+        pool, loop = _smtp_pool, _smtp_pool_loop
+        _smtp_pool = _smtp_pool_loop = None
+        if pool is not None and loop is running:
+            await pool.close()
+
     @staticmethod
     async def send_slack_notification(webhook_url: str, message: str, title: Optional[str] = None) -> bool:
         """Send Slack notification"""
         try:
-            payload = {
-                "text": title or "DB Backup Platform",
-                "blocks": [
-                    {
-                        "type": "section",
-                        "text": {
-                            "type": "mrkdwn",
-                            "text": message
-                        }
-                    }
-                ]
-            }
-
-            async with aiohttp.ClientSession() as session:
-                async with session.post(webhook_url, json=payload) as response:
-                    if response.status == 200:
-                        logger.info("Slack notification sent successfully")
-                        return True
-                    else:
-                        logger.error(f"Slack notification failed: {response.status}")
-                        return False
+            payload = _slack_payload(title or "DB Backup Platform", [message])
+
+            response = await NotificationService._get_session().post(
+                webhook_url, content=payload, headers=_JSON_HEADERS
+            )
+            if response.status_code == 200:
+                logger.info("Slack notification sent successfully")
+                return True
+            else:
+                logger.error(f"Slack notification failed: {response.status_code}")
+                return False
 
         except Exception as e:
             logger.error(f"Failed to send Slack notification: {e}")
             return False
 
+    @staticmethod
+    async def send_slack_batch(webhook_url: str, notifications: List[Dict[str, Any]]) -> bool:
+        """Send several queued notifications as one Slack message"""
+        if len(notifications) == 1:
+            return await NotificationService.send_slack_notification(
+                webhook_url, notifications[0]["message"], notifications[0].get("title")
+            )
+
+        try:
+            payload = _slack_payload(
+                f"DB Backup Platform: {len(notifications)} notifications",
+                [notification["message"] for notification in notifications]
+            )
+
+            response = await NotificationService._get_session().post(
+                webhook_url, content=payload, headers=_JSON_HEADERS
+            )
+            if response.status_code == 200:
+                logger.info(f"Slack batch of {len(notifications)} notifications sent")
+                return True
+            else:
+                logger.error(f"Slack batch notification failed: {response.status_code}")
+                return False
+
+        except Exception as e:
+            logger.error(f"Failed to send Slack batch notification: {e}")
+            return False
+
+    @staticmethod
+    async def queue_slack_notification(message: str, title: Optional[str] = None):
+        """
+        Queue a Slack message for the next batched dispatch.
+        Callers only pay for an RPUSH; the webhook call happens in the
+        notification dispatch task.
+        """
+        await NotificationService.queue_slack_notifications([{"title": title, "message": message}])
+
+    @staticmethod
+    async def queue_slack_notifications(notifications: List[Dict[str, Optional[str]]]):
+        """Queue several Slack messages (title/message dicts) with a single RPUSH"""
+        if not notifications:
+            return
+
+        client = aioredis.from_url(settings.REDIS_URL)
+        try:
+            await client.rpush(SLACK_QUEUE_KEY, *[orjson.dumps(item) for item in notifications])
+        except Exception as e:
+            logger.error(f"Failed to queue Slack notifications: {e}")
+        finally:
+            await client.aclose()
+
     @staticmethod
     async def send_email_notification(
         to_email: str,
@@ -69,14 +256,8 @@ class NotificationService:
 
             msg.attach(part)
 
-            await aiosmtplib.send(
-                msg,
-                hostname=settings.SMTP_HOST,
-                port=settings.SMTP_PORT,
-                username=settings.SMTP_USER,
-                password=settings.SMTP_PASSWORD,
-                use_tls=settings.SMTP_USE_TLS
-            )
+            async with NotificationService._get_smtp_pool().acquire() as smtp:
+                await smtp.send_message(msg)
 
             logger.info(f"Email sent to {to_email}")
             return True
@@ -89,22 +270,22 @@ class NotificationService:
     async def send_webhook_notification(url: str, payload: Dict[str, Any]) -> bool:
         """Send webhook notification"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, json=payload) as response:
-                    if 200 <= response.status < 300:
-                        logger.info(f"Webhook sent to {url}")
-                        return True
-                    else:
-                        logger.error(f"Webhook failed: {response.status}")
-                        return False
+            response = await NotificationService._get_session().post(
+                url, content=orjson.dumps(payload), headers=_JSON_HEADERS
+            )
+            if response.is_success:
+                logger.info(f"Webhook sent to {url}")
+                return True
+            else:
+                logger.error(f"Webhook failed: {response.status_code}")
+                return False
 
         except Exception as e:
             logger.error(f"Failed to send webhook: {e}")
             return False
 
     @staticmethod
-    async def send_backup_notification(backup_id: int, success: bool, message: str):
-        """Send backup completion notification"""
+    def _completion_message(operation: str, backup_id: int, success: bool, message: str) -> str:
         if success:
             emoji = "✅"
             status = "Success"
@@ -112,33 +293,50 @@ class NotificationService:
             emoji = "❌"
             status = "Failed"
 
-        slack_message = f"{emoji} *Backup {status}*\n\n{message}\n\nBackup ID: {backup_id}"
+        return f"{emoji} *{operation} {status}*\n\n{message}\n\nBackup ID: {backup_id}"
 
-        # Send to Slack if configured
+    @staticmethod
+    async def send_backup_notification(backup_id: int, success: bool, message: str):
+        """Send backup completion notification"""
+        # Queue for Slack if configured
         if settings.SLACK_WEBHOOK_URL:
-            await NotificationService.send_slack_notification(
-                settings.SLACK_WEBHOOK_URL,
-                slack_message,
+            await NotificationService.queue_slack_notification(
+                NotificationService._completion_message("Backup", backup_id, success, message),
                 "DB Backup Notification"
             )
 
     @staticmethod
-    async def send_restore_notification(backup_id: int, success: bool, message: str):
-        """Send restore completion notification"""
-        if success:
-            emoji = "✅"
-            status = "Success"
-        else:
-            emoji = "❌"
-            status = "Failed"
+    async def send_backup_notifications_batch(events: List[Dict[str, Any]]):
+        """
+        Send completion notifications for several backups at once.
+        Each event has backup_id, success and message; restore events also
+        set restore=True. All Slack messages are queued in one RPUSH.
+        """
+        if not settings.SLACK_WEBHOOK_URL:
+            return
+
+        notifications = []
+        for event in events:
+            if event.get("restore"):
+                operation, title = "Restore", "DB Restore Notification"
+            else:
+                operation, title = "Backup", "DB Backup Notification"
+            notifications.append({
+                "title": title,
+                "message": NotificationService._completion_message(
+                    operation, event["backup_id"], event["success"], event["message"]
+                )
+            })
 
-        slack_message = f"{emoji} *Restore {status}*\n\n{message}\n\nBackup ID: {backup_id}"
+        await NotificationService.queue_slack_notifications(notifications)
 
-        # Send to Slack if configured
+    @staticmethod
+    async def send_restore_notification(backup_id: int, success: bool, message: str):
+        """Send restore completion notification"""
+        # Queue for Slack if configured
         if settings.SLACK_WEBHOOK_URL:
-            await NotificationService.send_slack_notification(
-                settings.SLACK_WEBHOOK_URL,
-                slack_message,
+            await NotificationService.queue_slack_notification(
+                NotificationService._completion_message("Restore", backup_id, success, message),
                 "DB Restore Notification"
             )
 
@@ -148,8 +346,7 @@ class NotificationService:
         slack_message = f"⚠️ *Server Health Alert*\n\nServer: {server_name}\nStatus: {status}\n\n{message}"
 
         if settings.SLACK_WEBHOOK_URL:
-            await NotificationService.send_slack_notification(
-                settings.SLACK_WEBHOOK_URL,
+            await NotificationService.queue_slack_notification(
                 slack_message,
                 "Server Health Alert"
             )
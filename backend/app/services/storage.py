@@ -4,16 +4,54 @@ Storage service for S3-compatible and local storage
 import asyncio
 import logging
 import os
+import shutil
+import time
+from collections import OrderedDict
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Optional
+from typing import Awaitable, Callable, List, Optional, Set
+import aiofiles
 import aioboto3
+from aiobotocore.config import AioConfig
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError
 
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Directories this process has created or found present, so repeated
+# transfers into the same directory skip makedirs' syscalls. Transfers that
+# fail forget their directory, in case it was removed underneath us, and a
+# copy that finds it gone recreates it and retries once (_copy_into).
+_known_dirs: Set[str] = set()
+_KNOWN_DIRS_MAX = 1024
+
+
+async def _ensure_dir(path: str):
+    """Create a directory and its parents off the event loop, unless known to exist"""
+    if not path or path in _known_dirs:
+        return
+    await asyncio.to_thread(os.makedirs, path, exist_ok=True)
+    if len(_known_dirs) >= _KNOWN_DIRS_MAX:
+        _known_dirs.clear()
+    _known_dirs.add(path)
+
+
+async def _copy_into(path: str, copy: Callable[[], Awaitable[object]]):
+    """
+    Run copy into directory path, creating it first. If the directory was
+    removed since it was cached, copy fails with FileNotFoundError; make it
+    again and retry once.
+    """
+    await _ensure_dir(path)
+    try:
+        await copy()
+    except FileNotFoundError:
+        _known_dirs.discard(path)
+        await _ensure_dir(path)
+        await copy()
+
 
 class StorageBackend(ABC):
     """Base class for storage backends"""
@@ -43,10 +81,30 @@ class StorageBackend(ABC):
         """Get file size in bytes"""
         pass
 
+    async def delete_many(self, remote_paths: List[str]) -> List[bool]:
+        """Delete several files; one result per path, as delete() returns"""
+        return list(await asyncio.gather(*[self.delete(path) for path in remote_paths]))
+
+    async def download_redirect(self, remote_path: str) -> Optional[str]:
+        """
+        URL a client can fetch the file from directly, without the bytes
+        passing through this process; None if the backend has no such URL
+        and the file must be served by the API itself.
+        """
+        return None
+
+    async def close(self):
+        """Release any open connections"""
+        pass
+
 
 class S3Storage(StorageBackend):
     """S3-compatible storage backend"""
 
+    # exists() followed by get_size() is answered by one HeadObject
+    HEAD_CACHE_TTL = 5.0
+    HEAD_CACHE_SIZE = 256
+
     def __init__(self):
         self.endpoint = settings.S3_ENDPOINT
         self.access_key = settings.S3_ACCESS_KEY
@@ -55,43 +113,100 @@ class S3Storage(StorageBackend):
         self.region = settings.S3_REGION
         self.use_ssl = settings.S3_USE_SSL
 
-    async def _get_client(self):
-        """Get S3 client"""
-        session = aioboto3.Session()
-        return session.client(
-            's3',
-            endpoint_url=self.endpoint,
-            aws_access_key_id=self.access_key,
-            aws_secret_access_key=self.secret_key,
-            region_name=self.region,
-            use_ssl=self.use_ssl
+        # Large backups are split into parts transferred concurrently
+        mb = 1024 * 1024
+        self.transfer_config = TransferConfig(
+            multipart_threshold=settings.S3_MULTIPART_THRESHOLD_MB * mb,
+            multipart_chunksize=settings.S3_MULTIPART_CHUNKSIZE_MB * mb,
+            max_concurrency=settings.S3_MAX_CONCURRENCY,
+            use_threads=True
         )
 
+        self._session = aioboto3.Session()
+        self._client_cm = None
+        self._client = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client_lock: Optional[asyncio.Lock] = None
+        # Set once the bucket is known to exist; it is never deleted by us
+        self._bucket_ready = False
+        # key -> (expiry, HeadObject response), least recently used first
+        self._head_cache: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def _client_ref(self):
+        """
+        The S3 client, opened on first use and kept for reuse.
+        aiobotocore clients hold connection pools bound to the event loop
+        that opened them, and Celery tasks each run in a fresh loop, so the
+        client is reopened when the loop changes.
+        """
+        loop = asyncio.get_running_loop()
+        if self._client_loop is not loop:
+            # Anything left over belongs to a finished loop
+            self._client_cm = self._client = None
+            self._client_lock = asyncio.Lock()
+            self._client_loop = loop
+
+        if self._client is None:
+            async with self._client_lock:
+                if self._client is None:
+                    client_cm = self._session.client(
+                        's3',
+                        endpoint_url=self.endpoint,
+                        aws_access_key_id=self.access_key,
+                        aws_secret_access_key=self.secret_key,
+                        region_name=self.region,
+                        use_ssl=self.use_ssl,
+                        # Enough connections for every multipart part in flight
+                        config=AioConfig(max_pool_connections=max(settings.S3_MAX_CONCURRENCY, 10))
+                    )
+                    self._client = await client_cm.__aenter__()
+                    self._client_cm = client_cm
+        return self._client
+
+    async def close(self):
+        """Close the cached S3 client, if it was opened in this event loop"""
+        client_cm, loop = self._client_cm, self._client_loop
+        self._client_cm = self._client = self._client_loop = None
+        if client_cm is not None and loop is asyncio.get_running_loop():
+            await client_cm.__aexit__(None, None, None)
+
     async def _ensure_bucket(self):
-        """Ensure bucket exists"""
-        async with await self._get_client() as s3:
+        """Ensure bucket exists (checked once per process)"""
+        if self._bucket_ready:
+            return
+
+        s3 = await self._client_ref()
+        try:
+            await s3.head_bucket(Bucket=self.bucket)
+        except ClientError:
+            # Bucket doesn't exist, create it
             try:
-                await s3.head_bucket(Bucket=self.bucket)
-            except ClientError:
-                # Bucket doesn't exist, create it
-                try:
-                    await s3.create_bucket(Bucket=self.bucket)
-                    logger.info(f"Created S3 bucket: {self.bucket}")
-                except Exception as e:
-                    logger.error(f"Failed to create bucket: {e}")
-                    raise
+                await s3.create_bucket(Bucket=self.bucket)
+                logger.info(f"Created S3 bucket: {self.bucket}")
+            except Exception as e:
+                logger.error(f"Failed to create bucket: {e}")
+                raise
+
+        self._bucket_ready = True
 
     async def upload(self, local_path: str, remote_path: str) -> bool:
         """Upload file to S3"""
         try:
             await self._ensure_bucket()
 
-            async with await self._get_client() as s3:
-                with open(local_path, 'rb') as f:
-                    await s3.upload_fileobj(f, self.bucket, remote_path)
+            self._head_cache.pop(remote_path, None)
+            s3 = await self._client_ref()
+            # aioboto3 awaits the reads, so they run off the event loop
+            async with aiofiles.open(local_path, 'rb') as f:
+                await s3.upload_fileobj(
+                    f,
+                    self.bucket,
+                    remote_path,
+                    Config=self.transfer_config
+                )
 
-                logger.info(f"Uploaded {local_path} to s3://{self.bucket}/{remote_path}")
-                return True
+            logger.info(f"Uploaded {local_path} to s3://{self.bucket}/{remote_path}")
+            return True
 
         except Exception as e:
             logger.error(f"S3 upload failed: {e}")
@@ -100,67 +215,188 @@ class S3Storage(StorageBackend):
     async def download(self, remote_path: str, local_path: str) -> bool:
         """Download file from S3"""
         try:
-            # Ensure local directory exists
-            os.makedirs(os.path.dirname(local_path), exist_ok=True)
+            s3 = await self._client_ref()
+            await _copy_into(
+                os.path.dirname(local_path),
+                lambda: self._download_ranges(s3, remote_path, local_path)
+            )
 
-            async with await self._get_client() as s3:
-                with open(local_path, 'wb') as f:
-                    await s3.download_fileobj(self.bucket, remote_path, f)
-
-                logger.info(f"Downloaded s3://{self.bucket}/{remote_path} to {local_path}")
-                return True
+            logger.info(f"Downloaded s3://{self.bucket}/{remote_path} to {local_path}")
+            return True
 
         except Exception as e:
             logger.error(f"S3 download failed: {e}")
+            _known_dirs.discard(os.path.dirname(local_path))
             return False
 
+    async def _head(self, remote_path: str) -> dict:
+        """HeadObject, cached briefly; raises ClientError if the object is missing"""
+        cached = self._head_cache.get(remote_path)
+        if cached is not None and cached[0] > time.monotonic():
+            self._head_cache.move_to_end(remote_path)
+            return cached[1]
+
+        s3 = await self._client_ref()
+        head = await s3.head_object(Bucket=self.bucket, Key=remote_path)
+        self._head_cache[remote_path] = (time.monotonic() + self.HEAD_CACHE_TTL, head)
+        self._head_cache.move_to_end(remote_path)
+        if len(self._head_cache) > self.HEAD_CACHE_SIZE:
+            self._head_cache.popitem(last=False)
+        return head
+
+    async def _download_ranges(self, s3, remote_path: str, local_path: str):
+        """
+        Download an object as concurrent ranged GETs of multipart_chunksize,
+        each written at its offset from a worker thread.
+        aioboto3's download_fileobj is a single GET read 4 KiB at a time.
+        """
+        size = (await self._head(remote_path))['ContentLength']
+        chunk = self.transfer_config.multipart_chunksize
+        offsets = iter(range(0, size, chunk))
+        errors = []
+
+        async def worker():
+            # Workers share the offsets iterator, so each range is fetched once
+            for start in offsets:
+                if errors:
+                    return
+                try:
+                    response = await s3.get_object(
+                        Bucket=self.bucket,
+                        Key=remote_path,
+                        Range=f"bytes={start}-{min(start + chunk, size) - 1}"
+                    )
+                    async with response['Body'] as body:
+                        data = await body.read()
+                    await asyncio.to_thread(os.pwrite, fd, data, start)
+                except Exception as e:
+                    errors.append(e)
+                    return
+
+        fd = await asyncio.to_thread(os.open, local_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            # Workers stop on their own after a failure rather than being
+            # cancelled, so no write is still running when fd is closed
+            await asyncio.gather(*[worker() for _ in range(settings.S3_MAX_CONCURRENCY)])
+        finally:
+            os.close(fd)
+
+        if errors:
+            raise errors[0]
+
     async def delete(self, remote_path: str) -> bool:
         """Delete file from S3"""
         try:
-            async with await self._get_client() as s3:
-                await s3.delete_object(Bucket=self.bucket, Key=remote_path)
+            self._head_cache.pop(remote_path, None)
+            s3 = await self._client_ref()
+            await s3.delete_object(Bucket=self.bucket, Key=remote_path)
 
-                logger.info(f"Deleted s3://{self.bucket}/{remote_path}")
-                return True
+            logger.info(f"Deleted s3://{self.bucket}/{remote_path}")
+            return True
 
         except Exception as e:
             logger.error(f"S3 delete failed: {e}")
             return False
 
+    async def delete_many(self, remote_paths: List[str]) -> List[bool]:
+        """Delete files with DeleteObjects, up to 1000 keys per request"""
+        for path in remote_paths:
+            self._head_cache.pop(path, None)
+
+        results = []
+        for start in range(0, len(remote_paths), 1000):
+            batch = remote_paths[start:start + 1000]
+            try:
+                s3 = await self._client_ref()
+                response = await s3.delete_objects(
+                    Bucket=self.bucket,
+                    Delete={"Objects": [{"Key": path} for path in batch], "Quiet": True}
+                )
+                # Quiet mode lists only the keys that failed
+                failed = set()
+                for error in response.get("Errors", []):
+                    failed.add(error["Key"])
+                    logger.error(f"S3 delete failed for {error['Key']}: {error.get('Message')}")
+                results.extend(path not in failed for path in batch)
+            except Exception as e:
+                logger.error(f"S3 batch delete failed: {e}")
+                results.extend(False for _ in batch)
+
+        logger.info(f"Deleted {sum(results)} of {len(remote_paths)} objects from s3://{self.bucket}")
+        return results
+
     async def exists(self, remote_path: str) -> bool:
         """Check if file exists in S3"""
         try:
-            async with await self._get_client() as s3:
-                await s3.head_object(Bucket=self.bucket, Key=remote_path)
-                return True
+            await self._head(remote_path)
+            return True
         except ClientError:
             return False
 
     async def get_size(self, remote_path: str) -> Optional[int]:
         """Get file size from S3"""
         try:
-            async with await self._get_client() as s3:
-                response = await s3.head_object(Bucket=self.bucket, Key=remote_path)
-                return response['ContentLength']
+            return (await self._head(remote_path))['ContentLength']
         except Exception as e:
             logger.error(f"Failed to get file size: {e}")
             return None
 
+    async def download_redirect(self, remote_path: str) -> Optional[str]:
+        """Presigned GET URL, so end-user downloads go straight to S3"""
+        return await self.get_presigned_url(remote_path)
+
     async def get_presigned_url(self, remote_path: str, expiration: int = 3600) -> Optional[str]:
         """Generate presigned download URL"""
         try:
-            async with await self._get_client() as s3:
-                url = await s3.generate_presigned_url(
-                    'get_object',
-                    Params={'Bucket': self.bucket, 'Key': remote_path},
-                    ExpiresIn=expiration
-                )
-                return url
+            s3 = await self._client_ref()
+            url = await s3.generate_presigned_url(
+                'get_object',
+                Params={'Bucket': self.bucket, 'Key': remote_path},
+                ExpiresIn=expiration
+            )
+            return url
         except Exception as e:
             logger.error(f"Failed to generate presigned URL: {e}")
             return None
 
 
+def _fast_copy(src, dst):
+    """
+    Copy a file and its metadata, like shutil.copy2.
+    os.copy_file_range keeps the data in the kernel (and reflinks on
+    XFS/Btrfs); where it is unavailable or refused, e.g. across
+    filesystems, shutil.copyfile's sendfile path is used instead.
+    """
+    try:
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            remaining = os.fstat(fsrc.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+    except (AttributeError, OSError):
+        shutil.copyfile(src, dst)
+    shutil.copystat(src, dst)
+
+
+def _unlink_all(paths: List[Path]) -> List[bool]:
+    """Unlink each path; False for paths that were missing or failed"""
+    results = []
+    for path in paths:
+        try:
+            os.unlink(path)
+            logger.info(f"Deleted {path}")
+            results.append(True)
+        except FileNotFoundError:
+            logger.warning(f"File not found: {path}")
+            results.append(False)
+        except OSError as e:
+            logger.error(f"Delete failed: {e}")
+            results.append(False)
+    return results
+
+
 class LocalStorage(StorageBackend):
     """Local filesystem storage backend"""
 
@@ -176,17 +412,17 @@ class LocalStorage(StorageBackend):
         """Copy file to local storage"""
         try:
             dest_path = self._get_full_path(remote_path)
-            dest_path.parent.mkdir(parents=True, exist_ok=True)
-
-            # Use shutil for efficient copying
-            import shutil
-            await asyncio.to_thread(shutil.copy2, local_path, dest_path)
+            await _copy_into(
+                str(dest_path.parent),
+                lambda: asyncio.to_thread(_fast_copy, local_path, dest_path)
+            )
 
             logger.info(f"Copied {local_path} to {dest_path}")
             return True
 
         except Exception as e:
             logger.error(f"Local copy failed: {e}")
+            _known_dirs.discard(str(self._get_full_path(remote_path).parent))
             return False
 
     async def download(self, remote_path: str, local_path: str) -> bool:
@@ -198,17 +434,17 @@ class LocalStorage(StorageBackend):
                 logger.error(f"File not found: {src_path}")
                 return False
 
-            # Ensure destination directory exists
-            os.makedirs(os.path.dirname(local_path), exist_ok=True)
-
-            import shutil
-            await asyncio.to_thread(shutil.copy2, src_path, local_path)
+            await _copy_into(
+                os.path.dirname(local_path),
+                lambda: asyncio.to_thread(_fast_copy, src_path, local_path)
+            )
 
             logger.info(f"Copied {src_path} to {local_path}")
             return True
 
         except Exception as e:
             logger.error(f"Local copy failed: {e}")
+            _known_dirs.discard(os.path.dirname(local_path))
             return False
 
     async def delete(self, remote_path: str) -> bool:
@@ -228,6 +464,10 @@ class LocalStorage(StorageBackend):
             logger.error(f"Delete failed: {e}")
             return False
 
+    async def delete_many(self, remote_paths: List[str]) -> List[bool]:
+        """Delete several files in a single worker thread hop"""
+        return await asyncio.to_thread(_unlink_all, [self._get_full_path(path) for path in remote_paths])
+
     async def exists(self, remote_path: str) -> bool:
         """Check if file exists"""
         file_path = self._get_full_path(remote_path)
@@ -3,17 +3,75 @@ WebSocket service for real-time updates
 """
 import logging
 import asyncio
-from typing import Dict, Set, Optional
+import time
+from typing import Callable, Dict, Hashable, Set, Optional, Tuple
 from datetime import datetime
-import json
+
+import orjson
+import redis.asyncio as aioredis
+from starlette.websockets import WebSocketState
+
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Per-connection send limits, read from settings once
+_MAX_QUEUE = settings.WEBSOCKET_MAX_QUEUE
+_SEND_TIMEOUT = settings.WEBSOCKET_SEND_TIMEOUT
+_COALESCE_INTERVAL = settings.WEBSOCKET_COALESCE_INTERVAL
+
+# Message timestamps are refreshed at most every 50 ms; streamed updates
+# would otherwise format a new datetime each
+_TIMESTAMP_RESOLUTION = 0.05
+_timestamp = ""
+_timestamp_expires = 0.0
+
+
+def _iso_now() -> str:
+    """Current UTC time in ISO format, cached for _TIMESTAMP_RESOLUTION"""
+    global _timestamp, _timestamp_expires
+    now = time.time()
+    # Second test: the wall clock stepped back
+    if now >= _timestamp_expires or now < _timestamp_expires - _TIMESTAMP_RESOLUTION:
+        _timestamp = datetime.utcfromtimestamp(now).isoformat()
+        _timestamp_expires = now + _TIMESTAMP_RESOLUTION
+    return _timestamp
+
+
+async def send_json(websocket, message: dict):
+    """
+    Send a message as a JSON text frame, encoded with orjson rather than
+    Starlette's json.dumps. Text rather than binary frames, so browsers
+    still receive strings.
+    """
+    await websocket.send_text(orjson.dumps(message).decode())
+
 
 class ConnectionManager:
-    """Manage WebSocket connections"""
+    """
+    Manage WebSocket connections.
+
+    Broadcasts are published to Redis and relayed by every process to its own
+    local connections, so messages reach clients on any Uvicorn worker and can
+    be sent from Celery workers.
 
-    def __init__(self):
+    Each connection gets a bounded outbound queue drained by its own sender
+    task. When a slow client lets its queue fill up the oldest message is
+    dropped, and a send that does not complete in time closes the connection.
+    """
+
+    __slots__ = (
+        "active_connections", "user_connections", "redis_url",
+        "_redis", "_listener", "_queues", "_senders", "_users",
+    )
+
+    REDIS_CHANNEL = "websocket:broadcast"
+
+    # Broadcasts to larger channels are queued this many recipients at a
+    # time, yielding to the event loop in between
+    ENQUEUE_SLICE = 500
+
+    def __init__(self, redis_url: Optional[str] = None):
         self.active_connections: Dict[str, Set] = {
             "all": set(),
             "backups": set(),
@@ -21,21 +79,105 @@ class ConnectionManager:
             "logs": set(),
         }
         self.user_connections: Dict[int, Set] = {}
+        self.redis_url = redis_url
+        self._redis: Optional[aioredis.Redis] = None
+        self._listener: Optional[asyncio.Task] = None
+        self._queues: Dict = {}
+        self._senders: Dict = {}
+        # websocket -> user_id, so remove() need not scan every user
+        self._users: Dict = {}
+
+    async def start(self):
+        """Start relaying broadcasts published by other processes"""
+        if not self.redis_url or self._listener:
+            return
+
+        self._redis = aioredis.from_url(self.redis_url)
+        self._listener = asyncio.create_task(self._listen())
+        logger.info("WebSocket Redis relay started")
+
+    async def stop(self):
+        """Stop the Redis relay"""
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+        if self._redis:
+            await self._redis.close()
+            self._redis = None
+
+    async def _listen(self):
+        """Deliver messages from Redis to local connections"""
+        while True:
+            try:
+                async with self._redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self.REDIS_CHANNEL)
+                    async for event in pubsub.listen():
+                        if event["type"] != "message":
+                            continue
+                        await self._deliver(event["data"].decode())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"WebSocket Redis relay error: {e}")
+                await asyncio.sleep(1)
+
+    async def _deliver(self, data: str):
+        """
+        Deliver a relayed message to local connections.
+        Relayed messages are "<channel>\n<payload>", or "@<user_id>\n<payload>"
+        for a single user; the payload is sent on as-is, without re-encoding.
+        """
+        target, _, payload = data.partition("\n")
+        if target.startswith("@"):
+            await self._broadcast_to_user_local(payload, int(target[1:]))
+        else:
+            await self._broadcast_local(payload, target)
+
+    async def _publish(self, data: str) -> bool:
+        """Publish a message for all processes; False if Redis is unavailable"""
+        if not self.redis_url:
+            return False
+
+        try:
+            if self._redis:
+                await self._redis.publish(self.REDIS_CHANNEL, data)
+            else:
+                # Not running the relay (e.g. Celery worker) - publish only
+                async with aioredis.from_url(self.redis_url) as redis_client:
+                    await redis_client.publish(self.REDIS_CHANNEL, data)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to publish WebSocket message: {e}")
+            return False
 
     async def connect(self, websocket, channel: str = "all", user_id: Optional[int] = None):
         """Connect a client to a channel"""
         await websocket.accept()
 
-        if channel in self.active_connections:
-            self.active_connections[channel].add(websocket)
+        if websocket not in self._queues:
+            self._queues[websocket] = asyncio.Queue(maxsize=_MAX_QUEUE)
+            self._senders[websocket] = asyncio.create_task(self._sender(websocket))
+
+        self.subscribe(websocket, channel)
 
         if user_id:
             if user_id not in self.user_connections:
                 self.user_connections[user_id] = set()
             self.user_connections[user_id].add(websocket)
+            self._users[websocket] = user_id
 
         logger.info(f"WebSocket connected to channel: {channel}")
 
+    def subscribe(self, websocket, channel: str):
+        """Add an already-connected client to a channel"""
+        if channel in self.active_connections:
+            self.active_connections[channel].add(websocket)
+
     def disconnect(self, websocket, channel: str = "all", user_id: Optional[int] = None):
         """Disconnect a client from a channel"""
         if channel in self.active_connections:
@@ -45,54 +187,174 @@ class ConnectionManager:
             self.user_connections[user_id].discard(websocket)
             if not self.user_connections[user_id]:
                 del self.user_connections[user_id]
+            if self._users.get(websocket) == user_id:
+                del self._users[websocket]
 
         logger.info(f"WebSocket disconnected from channel: {channel}")
 
+    def remove(self, websocket):
+        """Drop a client from every channel and stop its sender"""
+        for connections in self.active_connections.values():
+            connections.discard(websocket)
+
+        user_id = self._users.pop(websocket, None)
+        if user_id is not None:
+            connections = self.user_connections.get(user_id)
+            if connections is not None:
+                connections.discard(websocket)
+                if not connections:
+                    del self.user_connections[user_id]
+
+        self._queues.pop(websocket, None)
+        sender = self._senders.pop(websocket, None)
+        if sender and sender is not asyncio.current_task():
+            sender.cancel()
+
     async def send_personal_message(self, message: dict, websocket):
         """Send message to specific client"""
         try:
-            await websocket.send_json(message)
+            await send_json(websocket, message)
         except Exception as e:
             logger.error(f"Failed to send message: {e}")
 
     async def broadcast(self, message: dict, channel: str = "all"):
         """Broadcast message to all clients in a channel"""
-        if channel not in self.active_connections:
+        # Encoded once, here; relaying processes and every recipient reuse it
+        payload = orjson.dumps(message).decode()
+        if await self._publish(f"{channel}\n{payload}"):
             return
+        await self._broadcast_local(payload, channel)
 
-        disconnected = set()
-        for connection in self.active_connections[channel]:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.error(f"Error broadcasting to client: {e}")
-                disconnected.add(connection)
-
-        # Clean up disconnected clients
-        for connection in disconnected:
-            self.disconnect(connection, channel)
+    async def _broadcast_local(self, payload: str, channel: str):
+        """Send an encoded message to this process's clients in a channel"""
+        connections = self.active_connections.get(channel)
+        if connections:
+            await self._enqueue_all(payload, connections)
 
     async def broadcast_to_user(self, message: dict, user_id: int):
         """Broadcast message to all connections of a specific user"""
-        if user_id not in self.user_connections:
+        payload = orjson.dumps(message).decode()
+        if await self._publish(f"@{user_id}\n{payload}"):
             return
+        await self._broadcast_to_user_local(payload, user_id)
 
-        disconnected = set()
-        for connection in self.user_connections[user_id]:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.error(f"Error broadcasting to user: {e}")
-                disconnected.add(connection)
+    async def _broadcast_to_user_local(self, payload: str, user_id: int):
+        """Send an encoded message to this process's connections of a specific user"""
+        connections = self.user_connections.get(user_id)
+        if connections:
+            await self._enqueue_all(payload, connections)
 
-        # Clean up disconnected clients
-        for connection in disconnected:
-            if user_id in self.user_connections:
-                self.user_connections[user_id].discard(connection)
+    async def _enqueue_all(self, payload: str, connections: Set):
+        """Queue an encoded message for each connection, in slices for large channels"""
+        if len(connections) <= self.ENQUEUE_SLICE:
+            self._enqueue_slice(payload, connections)
+            return
+
+        # Snapshot, as clients may come and go while we yield
+        recipients = list(connections)
+        for start in range(0, len(recipients), self.ENQUEUE_SLICE):
+            self._enqueue_slice(payload, recipients[start:start + self.ENQUEUE_SLICE])
+            await asyncio.sleep(0)
+
+    def _enqueue_slice(self, payload: str, connections):
+        """Queue an encoded message for each connection, dropping the oldest if full"""
+        closed = []
+        for connection in connections:
+            queue = self._queues.get(connection)
+            if queue is None:
+                continue
+            if connection.client_state is not WebSocketState.CONNECTED:
+                # Gone before its endpoint noticed; no point queueing for it
+                closed.append(connection)
+                continue
+            if queue.full():
+                # Updates supersede each other, so the stale one is the one to lose
+                queue.get_nowait()
+            queue.put_nowait(payload)
+
+        for connection in closed:
+            self.remove(connection)
+
+    async def _sender(self, websocket):
+        """Drain a connection's queue, dropping the client if a send stalls or fails"""
+        queue = self._queues[websocket]
+        try:
+            while True:
+                payload = await queue.get()
+                await asyncio.wait_for(websocket.send_text(payload), timeout=_SEND_TIMEOUT)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error sending to WebSocket client, disconnecting: {e!r}")
+            self.remove(websocket)
+            try:
+                await websocket.close()
+            except Exception:
+                pass
 
 
 # Global connection manager
-manager = ConnectionManager()
+manager = ConnectionManager(settings.REDIS_URL)
+
+
+class _Coalescer:
+    """
+    Hold high-frequency updates for a short window and broadcast only the
+    latest per key (or the merge of them, for streamed output).
+
+    The first pending update opens a window; updates for the same key replace
+    or merge into each other until it closes. A final update is sent straight
+    away and discards whatever is pending for its key, so nothing stale
+    follows it.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._pending: Dict[Hashable, Tuple[str, dict]] = {}
+        self._flusher: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def send(
+        self,
+        key: Hashable,
+        message: dict,
+        channel: str,
+        final: bool = False,
+        merge: Optional[Callable[[dict, dict], dict]] = None
+    ):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Anything left over belongs to a finished Celery task's loop
+            self._pending.clear()
+            self._flusher = None
+            self._loop = loop
+
+        if final or self.interval <= 0:
+            self._pending.pop(key, None)
+            await manager.broadcast(message, channel)
+            return
+
+        pending = self._pending.get(key)
+        if pending is not None and merge is not None:
+            message = merge(pending[1], message)
+        self._pending[key] = (channel, message)
+
+        if self._flusher is None:
+            self._flusher = loop.create_task(self._flush())
+
+    async def _flush(self):
+        await asyncio.sleep(self.interval)
+        pending, self._pending = self._pending, {}
+        self._flusher = None
+        for channel, message in pending.values():
+            await manager.broadcast(message, channel)
+
+
+def _append_output(pending: dict, message: dict) -> dict:
+    return {**message, "output": pending["output"] + message["output"]}
+
+
+_coalescer = _Coalescer(_COALESCE_INTERVAL)
 
 
 class WebSocketService:
@@ -100,27 +362,27 @@ class WebSocketService:
 
     @staticmethod
     async def send_backup_progress(backup_id: int, progress: int, status: str, message: str = ""):
-        """Send backup progress update"""
-        await manager.broadcast({
+        """Send backup progress update (intermediate updates are coalesced)"""
+        await _coalescer.send(("backup", backup_id), {
             "type": "backup_progress",
             "backup_id": backup_id,
             "progress": progress,
             "status": status,
             "message": message,
-            "timestamp": datetime.utcnow().isoformat()
-        }, channel="backups")
+            "timestamp": _iso_now()
+        }, channel="backups", final=progress >= 100)
 
     @staticmethod
     async def send_restore_progress(backup_id: int, progress: int, status: str, message: str = ""):
-        """Send restore progress update"""
-        await manager.broadcast({
+        """Send restore progress update (intermediate updates are coalesced)"""
+        await _coalescer.send(("restore", backup_id), {
             "type": "restore_progress",
             "backup_id": backup_id,
             "progress": progress,
             "status": status,
             "message": message,
-            "timestamp": datetime.utcnow().isoformat()
-        }, channel="backups")
+            "timestamp": _iso_now()
+        }, channel="backups", final=progress >= 100)
 
     @staticmethod
     async def send_server_health_update(server_id: int, status: str, last_heartbeat: str):
@@ -130,7 +392,7 @@ class WebSocketService:
             "server_id": server_id,
             "health_status": status,
             "last_heartbeat": last_heartbeat,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": _iso_now()
         }, channel="servers")
 
     @staticmethod
@@ -141,7 +403,7 @@ class WebSocketService:
             "level": level,
             "message": message,
             "source": source,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": _iso_now()
         }, channel="logs")
 
     @staticmethod
@@ -152,7 +414,7 @@ class WebSocketService:
             "level": level,
             "title": title,
             "message": message,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": _iso_now()
         }
 
         if user_id:
@@ -168,16 +430,16 @@ class WebSocketService:
             "task_id": task_id,
             "status": status,
             "result": result,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": _iso_now()
         }, channel="all")
 
     @staticmethod
     async def stream_command_output(execution_id: int, output: str, stream: str = "stdout"):
-        """Stream command execution output"""
-        await manager.broadcast({
+        """Stream command execution output, batched into one message per window"""
+        await _coalescer.send(("output", execution_id, stream), {
             "type": "command_output",
             "execution_id": execution_id,
             "output": output,
             "stream": stream,
-            "timestamp": datetime.utcnow().isoformat()
-        }, channel="logs")
+            "timestamp": _iso_now()
+        }, channel="logs", merge=_append_output)